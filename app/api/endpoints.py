@@ -1,29 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.services.fraud_detection_service import FraudDetectionService
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.crud import bulk_insert_transactions_async, get_transaction_async
+from app.db.database import get_async_db
+from app.db.stats import read_statistics
+from app.services.fraud_detection_service import inference_executor, analyze_transaction as run_analysis
+from app.services.inference_executor import InferenceOverloaded
 
 router = APIRouter()
 
 @router.post("/transactions/")
-def create_transaction(transaction: dict, db: Session = Depends(get_db)):
-    # Logic to create a new transaction in the database
-    return {"message": "Transaction created successfully"}
+async def create_transaction(transactions: Union[List[dict], dict] = Body(...),
+                             db: AsyncSession = Depends(get_async_db)):
+    # Accept one transaction, a list, or {"transactions": [...]}; all are written in bulk
+    if isinstance(transactions, dict):
+        transactions = transactions.get("transactions", [transactions])
+    try:
+        inserted = await bulk_insert_transactions_async(db, transactions)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": "Transactions created successfully", "count": inserted}
 
 @router.get("/transactions/{transaction_id}")
-def read_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    # Logic to retrieve a transaction from the database
-    return {"transaction_id": transaction_id, "details": "Transaction details"}
+async def read_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
+    transaction = await get_transaction_async(db, transaction_id)
+    if transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return {
+        "transaction_id": transaction.id,
+        "amount": transaction.amount,
+        "sender": transaction.sender,
+        "receiver": transaction.receiver,
+        "timestamp": transaction.timestamp,
+        "is_fraud": transaction.is_fraud
+    }
 
 @router.post("/analyze/")
-def analyze_transaction(transaction: dict, service: FraudDetectionService = Depends(FraudDetectionService)):
+async def analyze_transaction(transaction: dict):
     try:
-        result = service.analyze(transaction)
+        result = await inference_executor.run(run_analysis, transaction)
         return result
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/stats/")
-def get_statistics(db: Session = Depends(get_db)):
-    # Logic to retrieve general statistics
-    return {"total_transactions": 1000, "fraud_rate": 0.05}
\ No newline at end of file
+async def get_statistics(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         top: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_async_db)):
+    # Served from the materialized summary tables; the range resolves to hourly buckets
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return await read_statistics(db, start, end, top_senders=top)
\ No newline at end of file
@@ -1 +1,2 @@
-from .database import Database
\ No newline at end of file
+from .database import (AsyncSessionLocal, Base, SenderStats, SessionLocal, Transaction, TransactionStatsHourly,
+                       async_engine, create_tables, engine, get_async_db, get_db)
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from config.settings import settings
+from .database import Transaction
+from .stats import apply_increments, apply_increments_async
+
+def transaction_row(transaction: Dict) -> Dict:
+    """Map an API/pipeline transaction dict onto Transaction columns."""
+    timestamp = transaction.get("timestamp")
+    return {
+        "amount": float(transaction["amount"]),
+        "sender": transaction.get("sender", transaction.get("from")),
+        "receiver": transaction.get("receiver", transaction.get("to")),
+        "timestamp": pd.Timestamp(timestamp).to_pydatetime() if timestamp is not None else datetime.utcnow(),
+        "is_fraud": int(transaction.get("is_fraud", 0))
+    }
+
+def bulk_insert_transactions(db: Session, transactions: Iterable[Dict],
+                             chunk_size: Optional[int] = None) -> int:
+    """
+    Insert transactions with one executemany per chunk and a single commit, instead of
+    adding and committing ORM objects one by one. The materialized statistics are
+    incremented in the same commit.
+    :return: Number of rows inserted.
+    """
+    chunk_size = chunk_size or settings.DB_BULK_INSERT_CHUNK_SIZE
+    statement = Transaction.__table__.insert()
+    inserted = 0
+    try:
+        for chunk in _chunks(transactions, chunk_size):
+            db.execute(statement, chunk)
+            apply_increments(db, chunk)
+            inserted += len(chunk)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return inserted
+
+def _chunks(transactions: Iterable[Dict], chunk_size: int):
+    chunk: List[Dict] = []
+    for transaction in transactions:
+        chunk.append(transaction_row(transaction))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def bulk_insert_transactions_async(db: AsyncSession, transactions: Iterable[Dict],
+                                        chunk_size: Optional[int] = None) -> int:
+    """Async-session counterpart of bulk_insert_transactions."""
+    statement = Transaction.__table__.insert()
+    inserted = 0
+    try:
+        for chunk in _chunks(transactions, chunk_size or settings.DB_BULK_INSERT_CHUNK_SIZE):
+            await db.execute(statement, chunk)
+            await apply_increments_async(db, chunk)
+            inserted += len(chunk)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return inserted
+
+def get_transaction(db: Session, transaction_id: int) -> Optional[Transaction]:
+    return db.query(Transaction).filter(Transaction.id == transaction_id).first()
+
+async def get_transaction_async(db: AsyncSession, transaction_id: int) -> Optional[Transaction]:
+    return await db.get(Transaction, transaction_id)
@@ -1,16 +1,47 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from config.settings import settings
 
+# Async drivers used for the same database when the URL names only the backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> URL:
+    """Translate DATABASE_URL to its async-driver equivalent, e.g. sqlite:// -> sqlite+aiosqlite://."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in ASYNC_DRIVERS or parsed.get_driver_name() in ("psycopg2", "pysqlite"):
+        parsed = parsed.set(drivername=ASYNC_DRIVERS.get(backend, parsed.drivername))
+    # Returned as a URL object: str() would mask the password
+    return parsed
+
+def engine_options(url) -> dict:
+    # SQLite uses a per-file pool that takes no size/overflow settings
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+                       pool_timeout=settings.DB_POOL_TIMEOUT)
+    return options
+
 # Create SQLAlchemy engine
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions for the API routes, so DB waits do not hold worker threads
+ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
@@ -25,6 +56,29 @@ class Transaction(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     is_fraud = Column(Integer, default=0)  # 0 for not fraud, 1 for fraud
 
+    # Per-address history lookups are range scans on these instead of full table scans
+    __table_args__ = (
+        Index("ix_transactions_sender_timestamp", "sender", "timestamp"),
+        Index("ix_transactions_receiver_timestamp", "receiver", "timestamp"),
+    )
+
+# Materialized statistics, incremented in the same commit as each insert (see app.db.stats)
+class TransactionStatsHourly(Base):
+    __tablename__ = "transaction_stats_hourly"
+
+    bucket_start = Column(DateTime, primary_key=True)  # transaction timestamp floored to the hour
+    transaction_count = Column(Integer, default=0, nullable=False)
+    fraud_count = Column(Integer, default=0, nullable=False)
+    total_amount = Column(Float, default=0.0, nullable=False)
+    fraud_amount = Column(Float, default=0.0, nullable=False)
+
+class SenderStats(Base):
+    __tablename__ = "sender_stats"
+
+    sender = Column(String, primary_key=True)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    flagged_count = Column(Integer, default=0, nullable=False, index=True)
+
 # Database Dependency
 def get_db():
     db = SessionLocal()
@@ -33,5 +87,16 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def create_tables(bind=engine):
+    # create_all skips existing tables, so add indexes that an older table lacks too
+    Base.metadata.create_all(bind=bind)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
 # Create tables
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+create_tables()
\ No newline at end of file
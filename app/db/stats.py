@@ -0,0 +1,161 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .database import SenderStats, Transaction, TransactionStatsHourly
+
+SUMMED_COLUMNS = ("transaction_count", "fraud_count", "total_amount", "fraud_amount")
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+STATS_TABLES = {"hourly": (TransactionStatsHourly, "bucket_start"), "senders": (SenderStats, "sender")}
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def rollup(rows: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    Aggregate Transaction rows (as produced by crud.transaction_row) into increments
+    for the hourly buckets and the per-sender counters.
+    """
+    hourly = defaultdict(lambda: dict.fromkeys(SUMMED_COLUMNS, 0))
+    senders = defaultdict(lambda: {"transaction_count": 0, "flagged_count": 0})
+    for row in rows:
+        is_fraud = int(bool(row["is_fraud"]))
+        increment = {"transaction_count": 1, "fraud_count": is_fraud,
+                     "total_amount": row["amount"], "fraud_amount": row["amount"] * is_fraud}
+        bucket = hourly[hour_bucket(row["timestamp"])]
+        for column, value in increment.items():
+            bucket[column] += value
+        if row["sender"] is not None:
+            senders[row["sender"]]["transaction_count"] += 1
+            senders[row["sender"]]["flagged_count"] += is_fraud
+    return {
+        "hourly": [{"bucket_start": bucket, **values} for bucket, values in hourly.items()],
+        "senders": [{"sender": sender, **values} for sender, values in senders.items()]
+    }
+
+def _counter_columns(params: List[Dict], key: str) -> List[str]:
+    return [column for column in params[0] if column != key]
+
+def _upsert_statements(insert, increments: Dict[str, List[Dict]]):
+    # INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col, one executemany per table
+    for name, (model, key) in STATS_TABLES.items():
+        if not increments[name]:
+            continue
+        table = model.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={column: table.c[column] + statement.excluded[column]
+                  for column in _counter_columns(increments[name], key)}
+        )
+        yield statement, increments[name]
+
+def _existing_keys_query(model, key: str, params: List[Dict]):
+    # Row locks keep a concurrent writer from updating the same counters in between
+    column = model.__table__.c[key]
+    return select(column).where(column.in_([row[key] for row in params])).with_for_update()
+
+def _update_or_insert_statements(model, key: str, params: List[Dict], existing: Set):
+    # Generic fallback for dialects without ON CONFLICT: UPDATE known keys, INSERT the rest
+    table = model.__table__
+    counters = _counter_columns(params, key)
+    updates = [{f"_{column}": row[column] for column in [key, *counters]} for row in params if row[key] in existing]
+    inserts = [row for row in params if row[key] not in existing]
+    if updates:
+        # bindparam names must not clash with the SET columns
+        statement = (table.update().where(table.c[key] == bindparam(f"_{key}"))
+                     .values({column: table.c[column] + bindparam(f"_{column}") for column in counters}))
+        yield statement, updates
+    if inserts:
+        yield table.insert(), inserts
+
+def apply_increments(db: Session, rows: List[Dict]):
+    """
+    Add rows to the materialized statistics; the caller commits with the insert.
+    Dialects without an upsert select the existing keys and update or insert in the
+    same transaction.
+    """
+    increments = rollup(rows)
+    insert = UPSERT_DIALECTS.get(db.bind.dialect.name)
+    if insert is not None:
+        for statement, params in _upsert_statements(insert, increments):
+            db.execute(statement, params)
+        return
+    for name, (model, key) in STATS_TABLES.items():
+        if not increments[name]:
+            continue
+        existing = set(db.execute(_existing_keys_query(model, key, increments[name])).scalars())
+        for statement, params in _update_or_insert_statements(model, key, increments[name], existing):
+            db.execute(statement, params)
+
+async def apply_increments_async(db: AsyncSession, rows: List[Dict]):
+    increments = rollup(rows)
+    insert = UPSERT_DIALECTS.get(db.bind.dialect.name)
+    if insert is not None:
+        for statement, params in _upsert_statements(insert, increments):
+            await db.execute(statement, params)
+        return
+    for name, (model, key) in STATS_TABLES.items():
+        if not increments[name]:
+            continue
+        existing = set((await db.execute(_existing_keys_query(model, key, increments[name]))).scalars())
+        for statement, params in _update_or_insert_statements(model, key, increments[name], existing):
+            await db.execute(statement, params)
+
+def rebuild_statistics(db: Session, batch_size: int = 10_000):
+    """Recompute all statistics from the transactions table, e.g. after deploying onto existing data."""
+    for model in (TransactionStatsHourly, SenderStats):
+        db.query(model).delete()
+    columns = [Transaction.amount, Transaction.sender, Transaction.timestamp, Transaction.is_fraud]
+    result = db.execute(select(*columns).execution_options(yield_per=batch_size))
+    for partition in result.mappings().partitions(batch_size):
+        apply_increments(db, [dict(row) for row in partition])
+    db.commit()
+
+async def read_statistics(db: AsyncSession, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          top_senders: int = 10, recent_hours: int = 24) -> Dict:
+    """
+    Read statistics from the summary tables only.
+    Totals are summed over the hourly buckets; there is no single totals row for every
+    insert to contend on. With `start`/`end` only the buckets overlapping [start, end)
+    are summed, so the range resolves to whole hours. Top flagged senders are all-time.
+    """
+    hourly = TransactionStatsHourly.__table__
+    conditions = []
+    if start is not None:
+        conditions.append(hourly.c.bucket_start >= hour_bucket(start))
+    if end is not None:
+        conditions.append(hourly.c.bucket_start < end)
+    totals = (await db.execute(
+        select(*[func.coalesce(func.sum(hourly.c[column]), 0).label(column) for column in SUMMED_COLUMNS])
+        .where(*conditions))).mappings().first()
+    buckets_query = select(hourly).where(*conditions).order_by(hourly.c.bucket_start.desc())
+    if not conditions:
+        buckets_query = buckets_query.limit(recent_hours)
+
+    buckets = (await db.execute(buckets_query)).mappings().all()
+    senders = (await db.execute(
+        select(SenderStats.__table__).where(SenderStats.flagged_count > 0)
+        .order_by(SenderStats.flagged_count.desc()).limit(top_senders))).mappings().all()
+
+    total_transactions = totals["transaction_count"]
+    return {
+        "total_transactions": total_transactions,
+        "fraud_transactions": totals["fraud_count"],
+        "fraud_rate": totals["fraud_count"] / total_transactions if total_transactions else 0.0,
+        "total_amount": totals["total_amount"],
+        "fraud_amount": totals["fraud_amount"],
+        "hourly_volume": [
+            {"hour": bucket["bucket_start"], "transactions": bucket["transaction_count"],
+             "fraud_transactions": bucket["fraud_count"], "amount": bucket["total_amount"]}
+            for bucket in reversed(buckets)
+        ],
+        "top_flagged_senders": [
+            {"sender": sender["sender"], "flagged_transactions": sender["flagged_count"],
+             "transactions": sender["transaction_count"]}
+            for sender in senders
+        ]
+    }
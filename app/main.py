@@ -1,19 +1,37 @@
 import os
+import json
+import asyncio
 import yaml
 import logging.config
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.concurrency import run_in_threadpool
 from app.api import endpoints
-from app.db.database import engine, Base
-from app.services.fraud_detection_service import FraudDetectionService
+from app.services.fraud_detection_service import inference_batcher, inference_executor, score_batch
+from app.services.inference_executor import InferenceOverloaded
+from app.services.model_registry import model_registry
 from config.settings import settings
-from app.db.database import Base, engine
+from app.db.database import async_engine, create_tables
 
 def setup_logging():
     config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'logging_config.yaml')
     with open(config_path, 'r') as f:
         config = yaml.safe_load(f.read())
+        # File handlers fail to open when logs/ does not exist yet, e.g. in a fresh checkout
+        for handler in config.get('handlers', {}).values():
+            if 'filename' in handler:
+                os.makedirs(os.path.dirname(handler['filename']) or '.', exist_ok=True)
         logging.config.dictConfig(config)
 
+async def watch_model_artifacts(interval: float):
+    # Poll models/ and atomically swap in new artifacts when they land
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(model_registry.reload_if_changed)
+        except Exception as e:
+            logging.error(f"Error checking model artifacts: {str(e)}")
+
 def create_app() -> FastAPI:
     setup_logging()
     
@@ -22,33 +40,81 @@ def create_app() -> FastAPI:
         debug=settings.DEBUG_MODE,
     )
 
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
+    # Create database tables and indexes
+    create_tables()
 
     # Include API routes
     app.include_router(endpoints.router, prefix=settings.API_V1_STR)
 
+    @app.on_event("startup")
+    async def load_models():
+        # Load model artifacts once per worker instead of once per request
+        model_registry.load()
+        if settings.MODEL_RELOAD_INTERVAL > 0:
+            app.state.model_watcher = asyncio.create_task(watch_model_artifacts(settings.MODEL_RELOAD_INTERVAL))
+        if settings.MICRO_BATCH_ENABLED:
+            inference_batcher.start()
+
+    @app.on_event("shutdown")
+    async def stop_model_watcher():
+        watcher = getattr(app.state, "model_watcher", None)
+        if watcher is not None:
+            watcher.cancel()
+        await inference_batcher.stop()
+        inference_executor.shutdown()
+        await async_engine.dispose()
+
     return app
 
 app = create_app()
 
-# Dependency to get the fraud detection service
-def get_fraud_detection_service():
-    return FraudDetectionService()
-
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Cryptocurrency Fraud Detection API"}
 
 @app.post("/predict")
-async def predict_fraud(transaction: dict, service: FraudDetectionService = Depends(get_fraud_detection_service)):
+async def predict_fraud(transaction: dict):
     try:
-        prediction = service.predict(transaction)
+        if inference_batcher.running:
+            prediction = await inference_batcher.submit(transaction)
+        else:
+            prediction = (await inference_executor.run(score_batch, [transaction]))[0]
         return {"prediction": prediction}
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logging.error(f"Error in prediction: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/metrics")
+async def metrics():
+    # Prometheus metrics, including micro-batch queue depth and batch sizes
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+async def parse_transaction_batch(request: Request) -> list:
+    # Accept either a JSON array (or {"transactions": [...]}) or NDJSON, one transaction per line
+    body = await request.body()
+    if "ndjson" in request.headers.get("content-type", ""):
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get("transactions")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of transactions")
+    return payload
+
+@app.post("/predict/batch")
+async def predict_fraud_batch(request: Request):
+    try:
+        transactions = await parse_transaction_batch(request)
+        predictions = await inference_executor.run(score_batch, transactions)
+        return {"predictions": predictions}
+    except InferenceOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error in batch prediction: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
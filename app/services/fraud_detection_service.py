@@ -1,24 +1,42 @@
-import joblib
 import numpy as np
 import pandas as pd
-from app.models.graph_neural_network import GraphNeuralNetwork
-from app.models.ensemble_model import EnsembleModel
+from typing import Dict, List, Optional
+from config.settings import settings
+from .inference_executor import InferenceExecutor
+from .micro_batcher import MicroBatcher
+from .model_registry import ModelArtifacts, ModelRegistry, model_registry
 
 class FraudDetectionService:
-    def __init__(self):
-        self.gnn_model = GraphNeuralNetwork.load("models/gnn_model.pt")
-        self.ensemble_model = joblib.load("models/ensemble_model.joblib")
-        self.scaler = joblib.load("models/feature_scaler.joblib")
+    def __init__(self, registry: ModelRegistry = model_registry):
+        # Artifacts are owned by the registry and loaded once per process
+        self.registry = registry
 
-    def preprocess(self, transaction):
-        # Convert transaction to DataFrame
-        df = pd.DataFrame([transaction])
+    @property
+    def gnn_model(self):
+        return self.registry.artifacts.gnn_model
+
+    @property
+    def ensemble_model(self):
+        return self.registry.artifacts.ensemble_model
+
+    @property
+    def scaler(self):
+        return self.registry.artifacts.scaler
+
+    def preprocess(self, transaction, artifacts: Optional[ModelArtifacts] = None):
+        return self.preprocess_batch([transaction], artifacts)
+
+    def preprocess_batch(self, transactions: List[Dict], artifacts: Optional[ModelArtifacts] = None):
+        artifacts = artifacts or self.registry.artifacts
+
+        # Convert all transactions to one DataFrame so pandas and sklearn run once
+        df = pd.DataFrame(transactions)
         
         # Apply feature engineering
         df = self.engineer_features(df)
         
         # Scale features
-        scaled_features = self.scaler.transform(df)
+        scaled_features = artifacts.scaler.transform(df)
         
         return scaled_features
 
@@ -30,18 +48,44 @@ class FraudDetectionService:
         return df
 
     def predict(self, transaction):
-        preprocessed_data = self.preprocess(transaction)
+        return self.predict_batch([transaction])[0]
+
+    def predict_batch(self, transactions: List[Dict]) -> List[float]:
+        """
+        Score many transactions as one feature matrix.
+        :return: One prediction per transaction, in input order.
+        """
+        if not transactions:
+            return []
+
+        # Use one snapshot so a concurrent hot-reload cannot mix model versions
+        artifacts = self.registry.artifacts
+        preprocessed_data = self.preprocess_batch(transactions, artifacts)
+        
+        # Get GNN prediction from the k-hop neighborhoods of each transaction's addresses
+        senders = [tx.get('sender', tx.get('from')) for tx in transactions]
+        receivers = [tx.get('receiver', tx.get('to')) for tx in transactions]
+        gnn_prediction = artifacts.gnn_model.predict_transactions(senders, receivers).astype(float)
         
-        # Get GNN prediction
-        gnn_prediction = self.gnn_model.predict(preprocessed_data)
+        # Get ensemble fraud probability from a single pass over its members
+        n_jobs = settings.ENSEMBLE_BATCH_N_JOBS if len(transactions) >= settings.ENSEMBLE_PARALLEL_MIN_BATCH else None
+        ensemble_scores = artifacts.ensemble_model.score(preprocessed_data, n_jobs=n_jobs)
+        ensemble_prediction = np.asarray(ensemble_scores['probabilities'], dtype=float).reshape(-1)
         
-        # Get ensemble model prediction
-        ensemble_prediction = self.ensemble_model.predict(preprocessed_data)
+        # The LSTM is trained on sender histories and is not served: a single transaction
+        # scored from a zero state is not a meaningful signal. Its TorchScript export is
+        # for offline scoring with IncrementalLSTMScorer.
+        predictions = [gnn_prediction, ensemble_prediction]
         
         # Combine predictions (you can implement more sophisticated logic here)
-        final_prediction = (gnn_prediction + ensemble_prediction) / 2
+        final_prediction = sum(predictions) / len(predictions)
         
-        return float(final_prediction)
+        return final_prediction.tolist()
+
+    def neighborhood(self, address) -> Optional[Dict]:
+        """Precomputed 1-/2-hop neighborhood summary of an address, if an index is deployed."""
+        index = self.registry.artifacts.neighborhood_index
+        return index.summary(address) if index is not None and address is not None else None
 
     def analyze(self, transaction):
         prediction = self.predict(transaction)
@@ -52,5 +96,55 @@ class FraudDetectionService:
             "is_suspicious": risk_score > 70,  # Threshold can be adjusted
             "recommendation": "Further investigation required" if risk_score > 70 else "Transaction appears normal"
         }
+
+        if self.registry.artifacts.neighborhood_index is not None:
+            result["sender_neighborhood"] = self.neighborhood(transaction.get('sender', transaction.get('from')))
+            result["receiver_neighborhood"] = self.neighborhood(transaction.get('receiver', transaction.get('to')))
         
-        return result
\ No newline at end of file
+        return result
+
+
+fraud_detection_service = FraudDetectionService()
+
+# Set in process pool workers, which have no event loop running the artifact watcher
+_watch_artifacts_in_worker = False
+
+def _init_inference_worker():
+    global _watch_artifacts_in_worker
+    _watch_artifacts_in_worker = settings.MODEL_RELOAD_INTERVAL > 0
+
+def _reload_models_in_worker():
+    if _watch_artifacts_in_worker:
+        fraud_detection_service.registry.reload_if_due(settings.MODEL_RELOAD_INTERVAL)
+
+# Module-level entry points so they can also be sent to process pool workers,
+# each of which loads its own models through the registry on first use and
+# checks artifact mtimes itself between calls
+def score_batch(transactions: List[Dict]) -> List[float]:
+    _reload_models_in_worker()
+    return fraud_detection_service.predict_batch(transactions)
+
+def analyze_transaction(transaction: Dict) -> Dict:
+    _reload_models_in_worker()
+    return fraud_detection_service.analyze(transaction)
+
+# Bounded pool that keeps blocking inference off the event loop
+inference_executor = InferenceExecutor(
+    kind=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+    max_pending=settings.INFERENCE_MAX_PENDING,
+    initializer=_init_inference_worker
+)
+
+# Groups concurrent single-transaction requests into one predict_batch call
+inference_batcher = MicroBatcher(
+    score_batch,
+    max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=settings.MICRO_BATCH_MAX_WAIT_MS,
+    executor=inference_executor,
+    max_queue_size=settings.INFERENCE_MAX_PENDING
+)
+
+# Dependency to get the shared fraud detection service
+def get_fraud_detection_service() -> FraudDetectionService:
+    return fraud_detection_service
@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+
+class InferenceOverloaded(Exception):
+    """Raised when inference capacity is exhausted and the request should be shed."""
+
+
+class InferenceExecutor:
+    """
+    Bounded pool that runs blocking model inference off the event loop.
+    At most max_pending calls may be running or queued; further calls are rejected
+    with InferenceOverloaded instead of piling up latency.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_pending: int = 256,
+                 initializer: Optional[Callable[[], None]] = None):
+        """
+        :param kind: "thread" or "process". Process workers load their own copy of the models.
+        :param max_workers: Number of inference workers.
+        :param max_pending: Limit on running plus queued calls.
+        :param initializer: Called once in each process worker when it starts.
+        """
+        if kind == "process":
+            self.executor: Executor = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer)
+        elif kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        else:
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.pending >= self.max_pending
+
+    @contextmanager
+    def slot(self):
+        """
+        Count one call as pending for the duration of the block, or raise
+        InferenceOverloaded when the pool is saturated. Must be used from the event
+        loop thread, which also makes the pending counter safe without a lock.
+        """
+        if self.saturated:
+            raise InferenceOverloaded("Inference capacity exceeded, retry later")
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) in the pool within a pending slot."""
+        with self.slot():
+            return await asyncio.get_running_loop().run_in_executor(self.executor, partial(fn, *args))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
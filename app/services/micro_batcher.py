@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+from prometheus_client import Gauge, Histogram
+from .inference_executor import InferenceExecutor, InferenceOverloaded
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = Gauge(
+    'inference_queue_depth',
+    'Requests waiting in the micro-batching queue'
+)
+BATCH_SIZE = Histogram(
+    'inference_batch_size',
+    'Number of requests scored together in one micro-batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+BATCH_WAIT = Histogram(
+    'inference_batch_wait_seconds',
+    'Time the first request of a micro-batch waited for the batch to fill'
+)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests into micro-batches.
+    A batch is dispatched as soon as it holds max_batch_size items or max_wait_ms has
+    passed since its first item arrived. While a batch is being scored new requests
+    keep queueing, so batches grow on their own under load. Each caller's future is
+    resolved with its own result; if a batch fails, its items are rescored one by one
+    so only the callers whose own item fails get the error.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, executor: Optional[InferenceExecutor] = None,
+                 max_queue_size: Optional[int] = None):
+        """
+        :param batch_fn: Scores a list of items and returns results in the same order.
+        :param max_batch_size: Largest batch passed to batch_fn.
+        :param max_wait_ms: Longest time to hold a partial batch.
+        :param executor: Pool batch_fn runs in; every queued or in-flight item counts toward
+            its pending limit. None uses the loop default executor.
+        :param max_queue_size: Reject new items with InferenceOverloaded beyond this many waiting.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self._pool = executor.executor if executor is not None else None
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # (item, future) pairs taken off the queue and not yet resolved
+        self._batch: list = []
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the batching worker on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and fail every request still waiting, queued or in flight."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        pending, self._batch = self._batch, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+        QUEUE_DEPTH.set(0)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result."""
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running")
+        if self.max_queue_size is not None and self._queue.qsize() >= self.max_queue_size:
+            raise InferenceOverloaded("Inference queue is full, retry later")
+        if self.executor is None:
+            return await self._enqueue(item)
+        # Batched items share the executor's backpressure with its direct calls
+        with self.executor.slot():
+            return await self._enqueue(item)
+
+    async def _enqueue(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        # Kept on self so stop() can fail a batch cancelled while collecting or scoring
+        batch = self._batch = [await self._queue.get()]
+        started = loop.time()
+        deadline = started + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take everything already queued before waiting for more
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        QUEUE_DEPTH.set(self._queue.qsize())
+        BATCH_WAIT.observe(loop.time() - started)
+        BATCH_SIZE.observe(len(batch))
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnect) are not scored
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(self._pool, self.batch_fn, [item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.error(f"Error in micro-batch inference: {str(e)}")
+                    results = [e]
+                else:
+                    logger.error(f"Error in micro-batch inference, scoring items individually: {str(e)}")
+                    results = await self._score_individually([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self._batch = []
+
+    async def _score_individually(self, items: List[Any]) -> List[Any]:
+        """Score each item as its own batch; a failing item yields its exception."""
+        loop = asyncio.get_running_loop()
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(self._pool, self.batch_fn, [item]) for item in items),
+            return_exceptions=True
+        )
+        return [outcome if isinstance(outcome, Exception) else outcome[0] for outcome in outcomes]
@@ -0,0 +1,143 @@
+import os
+import time
+import logging
+import threading
+import joblib
+from typing import Dict, Optional
+from src.features.neighborhood_index import NeighborhoodIndex
+from src.models.compiled_ensemble import CompiledEnsemble
+from src.models.graph_neural_network import GraphNeuralNetwork
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelArtifacts:
+    """One consistent, read-only set of loaded model artifacts."""
+
+    def __init__(self, ensemble_model, scaler, gnn_model, version: Dict[str, float],
+                 neighborhood_index=None):
+        self.ensemble_model = ensemble_model
+        self.scaler = scaler
+        self.gnn_model = gnn_model
+        self.neighborhood_index = neighborhood_index
+        self.version = version
+
+
+class ModelRegistry:
+    """
+    Loads model artifacts once per process and hands the same objects to every request.
+    A reload builds a complete new ModelArtifacts before swapping the reference, so a
+    request always sees either the old or the new set, never a mix.
+    """
+
+    def __init__(self, ensemble_path: str, scaler_path: str, gnn_path: str,
+                 compiled_ensemble_path: Optional[str] = None,
+                 neighborhood_index_path: Optional[str] = None):
+        self.ensemble_path = ensemble_path
+        self.compiled_ensemble_path = compiled_ensemble_path
+        self.scaler_path = scaler_path
+        self.gnn_path = gnn_path
+        self.neighborhood_index_path = neighborhood_index_path
+        self._artifacts: Optional[ModelArtifacts] = None
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+
+    def _use_compiled_ensemble(self) -> bool:
+        return self.compiled_ensemble_path is not None and os.path.exists(self.compiled_ensemble_path)
+
+    def _paths(self) -> Dict[str, str]:
+        ensemble_path = self.compiled_ensemble_path if self._use_compiled_ensemble() else self.ensemble_path
+        paths = {'ensemble': ensemble_path, 'scaler': self.scaler_path, 'gnn': self.gnn_path}
+        if self._use_neighborhood_index():
+            # save() switches CURRENT only once a version is complete
+            paths['neighborhood_index'] = NeighborhoodIndex.version_file(self.neighborhood_index_path)
+        return paths
+
+    def _use_neighborhood_index(self) -> bool:
+        return (self.neighborhood_index_path is not None
+                and NeighborhoodIndex.version_file(self.neighborhood_index_path) is not None)
+
+    def _load_ensemble(self):
+        if self._use_compiled_ensemble():
+            # Array-only evaluator: same probabilities without sklearn in the request path
+            return CompiledEnsemble.load(self.compiled_ensemble_path)
+        return joblib.load(self.ensemble_path)
+
+    def _current_version(self) -> Dict[str, float]:
+        return {name: os.path.getmtime(path) for name, path in self._paths().items()}
+
+    def _load_artifacts(self) -> ModelArtifacts:
+        version = self._current_version()
+        # sklearn artifacts are read fully rather than memory-mapped: joblib maps arrays
+        # by reopening the path, so a map could pick up a file replaced mid-load
+        artifacts = ModelArtifacts(
+            ensemble_model=self._load_ensemble(),
+            scaler=joblib.load(self.scaler_path),
+            gnn_model=GraphNeuralNetwork.load(self.gnn_path),
+            version=version,
+            neighborhood_index=NeighborhoodIndex.load(self.neighborhood_index_path)
+            if self._use_neighborhood_index() else None
+        )
+        logger.info("Loaded model artifacts: %s", version)
+        return artifacts
+
+    def load(self) -> ModelArtifacts:
+        """Load the artifacts if they have not been loaded yet."""
+        with self._lock:
+            if self._artifacts is None:
+                self._artifacts = self._load_artifacts()
+            return self._artifacts
+
+    def reload(self) -> ModelArtifacts:
+        """Load a fresh set of artifacts and atomically swap it in."""
+        with self._lock:
+            self._artifacts = self._load_artifacts()
+            return self._artifacts
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload when any artifact file on disk is newer than the loaded version.
+        :return: True if a reload happened.
+        """
+        if self._artifacts is None:
+            self.load()
+            return True
+        try:
+            changed = self._current_version() != self._artifacts.version
+        except OSError:
+            # An artifact is mid-replacement; keep serving the current set
+            return False
+        if changed:
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Model reload failed, keeping current artifacts: {str(e)}")
+                return False
+        return changed
+
+    def reload_if_due(self, interval: float) -> bool:
+        """
+        reload_if_changed at most once every `interval` seconds, for processes that have
+        no watcher task of their own (e.g. inference process pool workers).
+        :return: True if a reload happened.
+        """
+        now = time.monotonic()
+        if now - self._last_check < interval:
+            return False
+        self._last_check = now
+        return self.reload_if_changed()
+
+    @property
+    def artifacts(self) -> ModelArtifacts:
+        artifacts = self._artifacts
+        return artifacts if artifacts is not None else self.load()
+
+
+model_registry = ModelRegistry(
+    ensemble_path=settings.ENSEMBLE_MODEL_PATH,
+    scaler_path=settings.FEATURE_SCALER_PATH,
+    gnn_path=settings.GNN_MODEL_PATH,
+    compiled_ensemble_path=settings.COMPILED_ENSEMBLE_PATH,
+    neighborhood_index_path=settings.NEIGHBORHOOD_INDEX_PATH
+)
@@ -6,11 +6,41 @@ class Settings(BaseSettings):
     DEBUG_MODE: bool = False
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./fraud_detection.db")
     API_V1_STR: str = "/api/v1"
+    # Connection pool; size/overflow/timeout apply to server databases, not SQLite.
+    # The API uses the async driver for the same URL (aiosqlite, asyncpg)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Rows per executemany when bulk-inserting transactions
+    DB_BULK_INSERT_CHUNK_SIZE: int = 1000
     
     # Model paths
     GNN_MODEL_PATH: str = "models/gnn_model.pt"
     ENSEMBLE_MODEL_PATH: str = "models/ensemble_model.joblib"
+    # Array-based export of the ensemble; used instead of the pickle when present
+    COMPILED_ENSEMBLE_PATH: str = "models/ensemble_compiled.npz"
     FEATURE_SCALER_PATH: str = "models/feature_scaler.joblib"
+    # Directory of NeighborhoodIndex arrays, memory-mapped when present; optional
+    NEIGHBORHOOD_INDEX_PATH: str = "models/neighborhood_index"
+    # Seconds between checks for new artifacts in models/; 0 disables hot-reload
+    MODEL_RELOAD_INTERVAL: float = 30.0
+
+    # Micro-batching of concurrent /predict requests
+    MICRO_BATCH_ENABLED: bool = True
+    MICRO_BATCH_MAX_SIZE: int = 64
+    MICRO_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Blocking inference runs in this pool ("thread" or "process"); requests beyond
+    # INFERENCE_MAX_PENDING running or queued calls are rejected with 503
+    INFERENCE_EXECUTOR: str = "thread"
+    INFERENCE_WORKERS: int = 4
+    INFERENCE_MAX_PENDING: int = 256
+    # Batches of at least this many transactions score the ensemble on
+    # ENSEMBLE_BATCH_N_JOBS threads; single requests and micro-batches stay single-threaded
+    ENSEMBLE_PARALLEL_MIN_BATCH: int = 5000
+    ENSEMBLE_BATCH_N_JOBS: int = 4
     
     # API Keys (replace with your actual keys)
     BLOCKCHAIN_API_KEY: str = os.getenv("BLOCKCHAIN_API_KEY", "your_blockchain_api_key")
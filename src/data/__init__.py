@@ -1,4 +1,6 @@
 from .blockchain_data_collector import BlockchainDataCollector
 from .exchange_data_collector import ExchangeDataCollector
 from .data_preprocessor import DataPreprocessor
-from .data_validator import DataValidator
\ No newline at end of file
+from .data_validator import DataValidator
+from .ingestion import ChunkedCSVReader, CSVSchema
+from .storage import read_table, write_table, write_table_chunks
\ No newline at end of file
@@ -1,13 +1,26 @@
 import pandas as pd
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
+from .ingestion import ChunkedCSVReader, TRANSACTION_SCHEMA, DEFAULT_CHUNKSIZE
+from .storage import read_table, write_table, write_table_chunks
 
 class BlockchainDataCollector:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, chunksize: int = DEFAULT_CHUNKSIZE, usecols: Optional[List[str]] = None):
         self.file_path = file_path
+        self.usecols = usecols
+        self.reader = ChunkedCSVReader(file_path, schema=TRANSACTION_SCHEMA, chunksize=chunksize, usecols=usecols)
 
-    def load_data(self) -> pd.DataFrame:
-        """Load data from the CSV file."""
-        return pd.read_csv(self.file_path)
+    def load_data(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Load data from a CSV file or a Parquet/Arrow dataset.
+        Only the configured columns and the [start, end) time range are read.
+        """
+        if self.file_path.endswith('.csv'):
+            return self.reader.read(start, end)
+        return read_table(self.file_path, columns=self.usecols, start=start, end=end)
+
+    def iter_chunks(self, start=None, end=None) -> Iterator[pd.DataFrame]:
+        """Stream the CSV file as typed DataFrame chunks."""
+        return self.reader.iter_chunks(start, end)
 
     def get_transactions(self) -> List[Dict]:
         """Get transactions as a list of dictionaries."""
@@ -20,6 +33,20 @@ class BlockchainDataCollector:
         df.to_csv(output_file, index=False)
         print(f"Saved {len(transactions)} transactions to {output_file}")
 
+    def save_transactions(self, df: pd.DataFrame, output_path: str):
+        """Save transactions as date-partitioned Parquet or Arrow, depending on the path suffix."""
+        write_table(df, output_path)
+        print(f"Saved {len(df)} transactions to {output_path}")
+
+    def save_transactions_chunked(self, output_path: str, start=None, end=None) -> int:
+        """
+        Stream the source CSV chunk by chunk into Parquet/Arrow without loading the whole
+        file. :return: Number of rows written.
+        """
+        rows = write_table_chunks(self.iter_chunks(start, end), output_path)
+        print(f"Saved {rows} transactions to {output_path}")
+        return rows
+
     def get_data(self) -> pd.DataFrame:
         """
         This method loads and returns the transaction data as a DataFrame.
@@ -28,6 +55,6 @@ class BlockchainDataCollector:
 
 if __name__ == "__main__":
     collector = BlockchainDataCollector(file_path="path/to/your/bitcoin_transactions.csv")
-    transactions = collector.get_transactions()
-    # You can save it to another CSV if needed
-    collector.save_transactions_to_csv(transactions, "data/raw/bitcoin_transactions_processed.csv")
+    # Stream into date-partitioned Parquet so later stages read only what they need,
+    # with peak memory bounded by one chunk
+    collector.save_transactions_chunked("data/raw/bitcoin_transactions.parquet")
@@ -1,25 +1,39 @@
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
+from .ingestion import ChunkedCSVReader, EXCHANGE_SCHEMA, DEFAULT_CHUNKSIZE
+from .storage import read_table, write_table
 
 class ExchangeDataCollector:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, chunksize: int = DEFAULT_CHUNKSIZE, usecols: Optional[List[str]] = None):
         self.file_path = file_path
+        self.usecols = usecols
+        self.reader = ChunkedCSVReader(file_path, schema=EXCHANGE_SCHEMA, chunksize=chunksize, usecols=usecols)
 
-    def load_data(self) -> pd.DataFrame:
-        """Load data from the CSV file."""
-        return pd.read_csv(self.file_path)
+    def load_data(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Load data from a CSV file or a Parquet/Arrow dataset.
+        Only the configured columns and the [start, end) time range are read.
+        """
+        if self.file_path.endswith('.csv'):
+            return self.reader.read(start, end)
+        return read_table(self.file_path, columns=self.usecols, start=start, end=end)
+
+    def iter_chunks(self, start=None, end=None) -> Iterator[pd.DataFrame]:
+        """Stream the CSV file as typed DataFrame chunks."""
+        return self.reader.iter_chunks(start, end)
 
-    def preprocess_data(self) -> pd.DataFrame:
-        """Preprocess the exchange data."""
-        df = self.load_data()
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+    def preprocess_data(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Preprocess the exchange data. Timestamps and numeric types are applied while reading."""
+        if df is None:
+            df = self.load_data()
         df['price'] = df['price'].astype(float)
         df['volume'] = df['volume'].astype(float)
         return df
 
-    def validate_data(self) -> Dict:
+    def validate_data(self, df: Optional[pd.DataFrame] = None) -> Dict:
         """Validate the exchange data for missing values and data types."""
-        df = self.load_data()
+        if df is None:
+            df = self.load_data()
         missing_values = df.isnull().sum().to_dict()
         data_types = df.dtypes.astype(str).to_dict()
         validation_results = {
@@ -29,9 +43,9 @@ class ExchangeDataCollector:
         return validation_results
 
     def collect_and_preprocess(self) -> Dict:
-        """Collect data from CSV, preprocess, and validate it."""
-        preprocessed_data = self.preprocess_data()
-        validation_results = self.validate_data()
+        """Collect data from CSV once, then preprocess and validate it."""
+        preprocessed_data = self.preprocess_data(self.load_data())
+        validation_results = self.validate_data(preprocessed_data)
         return {
             'preprocessed_data': preprocessed_data,
             'validation': validation_results
@@ -43,21 +57,31 @@ class ExchangeDataCollector:
         """
         return self.load_data()
 
-    def save_data_to_csv(self, output_file: str):
+    def save_data_to_csv(self, output_file: str, preprocessed_data: Optional[pd.DataFrame] = None):
         """Save the preprocessed data to a CSV file."""
-        preprocessed_data = self.preprocess_data()
+        if preprocessed_data is None:
+            preprocessed_data = self.preprocess_data()
         preprocessed_data.to_csv(output_file, index=False)
         print(f"Saved preprocessed exchange data to {output_file}")
 
+    def save_data(self, output_path: str, preprocessed_data: Optional[pd.DataFrame] = None):
+        """Save the preprocessed data as date-partitioned Parquet or Arrow, depending on the path suffix."""
+        if preprocessed_data is None:
+            preprocessed_data = self.preprocess_data()
+        write_table(preprocessed_data, output_path)
+        print(f"Saved preprocessed exchange data to {output_path}")
+
 if __name__ == "__main__":
     collector = ExchangeDataCollector(file_path="path/to/your/exchange_data.csv")
+    # Read the source once and reuse it for every step
+    results = collector.collect_and_preprocess()
+
     # Accessing the preprocessed data
-    preprocessed_data = collector.preprocess_data()
+    preprocessed_data = results['preprocessed_data']
     print(preprocessed_data.head())
     
     # Accessing validation results
-    validation_results = collector.validate_data()
-    print(validation_results)
+    print(results['validation'])
     
-    # Saving preprocessed data to another CSV if needed
-    collector.save_data_to_csv("data/raw/exchange_data_processed.csv")
+    # Saving preprocessed data as Parquet for the downstream stages
+    collector.save_data("data/raw/exchange_data_processed.parquet", preprocessed_data)
@@ -0,0 +1,123 @@
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Sequence
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class CSVSchema:
+    """
+    Column types for a CSV source, applied while parsing so no column is first
+    materialized as generic Python objects.
+    """
+
+    def __init__(self, dtypes: Dict[str, str], timestamp_columns: Sequence[str] = (),
+                 timestamp_unit: Optional[str] = None, timestamp_format: Optional[str] = None):
+        """
+        :param dtypes: pandas dtype per column, e.g. 'category' or 'float32'.
+        :param timestamp_columns: Columns converted to datetime64 after parsing.
+        :param timestamp_unit: Epoch unit for numeric timestamps (e.g. 's'); textual
+            timestamp columns are parsed as datetimes regardless.
+        :param timestamp_format: strftime format for textual timestamps.
+        """
+        self.dtypes = dtypes
+        self.timestamp_columns = list(timestamp_columns)
+        self.timestamp_unit = timestamp_unit
+        self.timestamp_format = timestamp_format
+
+    def read_csv_kwargs(self, usecols: Optional[List[str]] = None) -> Dict:
+        columns = usecols if usecols is not None else list(self.dtypes)
+        dtypes = {col: dtype for col, dtype in self.dtypes.items()
+                  if col in columns and col not in self.timestamp_columns}
+        return {'dtype': dtypes, 'usecols': usecols}
+
+    def convert(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        for col in self.timestamp_columns:
+            if col in chunk.columns:
+                # The epoch unit only applies to numeric columns; text falls back to parsing
+                if self.timestamp_unit is not None and pd.api.types.is_numeric_dtype(chunk[col]):
+                    chunk[col] = pd.to_datetime(chunk[col], unit=self.timestamp_unit)
+                else:
+                    chunk[col] = pd.to_datetime(chunk[col], format=self.timestamp_format)
+        return chunk
+
+
+# Raw on-chain transactions, as in data/external/transactions.csv
+TRANSACTION_SCHEMA = CSVSchema(
+    dtypes={
+        'tx hash': 'object',
+        'block_hash': 'object',
+        'block_height': 'int64',
+        'timestamp': 'object',
+        'from_address': 'category',
+        'to_address': 'category',
+        'amount': 'float32',
+        'fee': 'float32',
+        'status': 'category'
+    },
+    timestamp_columns=['timestamp']
+)
+
+# Exchange trades with epoch-second timestamps
+EXCHANGE_SCHEMA = CSVSchema(
+    dtypes={
+        'timestamp': 'int64',
+        'price': 'float64',
+        'volume': 'float64'
+    },
+    timestamp_columns=['timestamp'],
+    timestamp_unit='s'
+)
+
+
+class ChunkedCSVReader:
+    """Typed, chunked CSV reader shared by the data collectors."""
+
+    def __init__(self, file_path: str, schema: Optional[CSVSchema] = None,
+                 chunksize: int = DEFAULT_CHUNKSIZE, usecols: Optional[List[str]] = None):
+        """
+        :param file_path: Path to the CSV file.
+        :param schema: Column types; None lets pandas infer them.
+        :param chunksize: Rows per chunk yielded by iter_chunks().
+        :param usecols: Only parse these columns.
+        """
+        self.file_path = file_path
+        self.schema = schema
+        self.chunksize = chunksize
+        self.usecols = usecols
+
+    def _read_kwargs(self) -> Dict:
+        if self.schema is None:
+            return {'usecols': self.usecols}
+        return self.schema.read_csv_kwargs(self.usecols)
+
+    def iter_chunks(self, start=None, end=None, timestamp_col: str = 'timestamp') -> Iterator[pd.DataFrame]:
+        """
+        Stream the file one typed chunk at a time; peak memory is one chunk.
+        :param start: Keep rows with timestamp_col >= start.
+        :param end: Keep rows with timestamp_col < end.
+        """
+        with pd.read_csv(self.file_path, chunksize=self.chunksize, **self._read_kwargs()) as reader:
+            for chunk in reader:
+                if self.schema is not None:
+                    chunk = self.schema.convert(chunk)
+                if start is not None:
+                    chunk = chunk[pd.to_datetime(chunk[timestamp_col]) >= pd.Timestamp(start)]
+                if end is not None:
+                    chunk = chunk[pd.to_datetime(chunk[timestamp_col]) < pd.Timestamp(end)]
+                yield chunk
+
+    def read(self, start=None, end=None, timestamp_col: str = 'timestamp') -> pd.DataFrame:
+        """Read the whole file, concatenating typed chunks and unifying categories."""
+        chunks = list(self.iter_chunks(start, end, timestamp_col))
+        if not chunks:
+            return pd.read_csv(self.file_path, nrows=0, **self._read_kwargs())
+        if len(chunks) == 1:
+            return chunks[0].reset_index(drop=True)
+
+        categorical = [col for col in chunks[0].columns
+                       if isinstance(chunks[0][col].dtype, pd.CategoricalDtype)]
+        for col in categorical:
+            categories = pd.api.types.union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+        return pd.concat(chunks, ignore_index=True)
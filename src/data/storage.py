@@ -0,0 +1,166 @@
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+from typing import Iterable, List, Optional
+
+PARTITION_COLUMN = 'date'
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.date32())]), flavor='hive')
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+
+def _storage_format(path: str) -> str:
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(ARROW_SUFFIXES):
+        return 'arrow'
+    return 'parquet'
+
+
+def write_table(df: pd.DataFrame, path: str, partition_by: Optional[str] = 'timestamp'):
+    """
+    Write a DataFrame in the format implied by the path suffix.
+    '.csv' writes CSV, '.arrow'/'.feather'/'.ipc' writes an uncompressed Arrow IPC file
+    that can be memory-mapped, and anything else writes Parquet. Parquet is partitioned
+    by calendar date of the partition_by column when it is present. An existing table
+    at `path` is replaced as a whole.
+    """
+    storage_format = _storage_format(path)
+    if storage_format == 'csv':
+        df.to_csv(path, index=False)
+        return
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if storage_format == 'arrow':
+        feather.write_feather(table, path, compression='uncompressed')
+    else:
+        # Date partitions the new frame does not cover would otherwise survive the rewrite
+        _remove_table(path)
+        _write_parquet(table, df, path, partition_by, existing_data_behavior='overwrite_or_ignore')
+
+
+def write_table_chunks(chunks: Iterable[pd.DataFrame], path: str, partition_by: Optional[str] = 'timestamp') -> int:
+    """
+    Stream DataFrame chunks into one table at `path`, in the same formats as write_table,
+    holding one chunk in memory at a time. Any existing table at `path` is replaced.
+    :return: Number of rows written.
+    """
+    storage_format = _storage_format(path)
+    _remove_table(path)
+
+    rows, writer, schema = 0, None, None
+    try:
+        for i, chunk in enumerate(chunks):
+            if storage_format == 'csv':
+                chunk.to_csv(path, index=False, mode='a', header=i == 0)
+            elif storage_format == 'arrow':
+                # One IPC file needs one schema and one dictionary per column, so
+                # categoricals are written as plain values
+                categorical = [col for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)]
+                chunk = chunk.astype({col: object for col in categorical})
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(path, schema)
+                writer.write_table(table)
+            else:
+                # Unique file names per chunk, so later chunks of a date add to its
+                # partition instead of replacing it
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                _write_parquet(table, chunk, path, partition_by, existing_data_behavior='overwrite_or_ignore',
+                               basename_template=f'chunk-{i}-{{i}}.parquet')
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _remove_table(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _write_parquet(table: pa.Table, df: pd.DataFrame, path: str, partition_by: Optional[str], **options):
+    if partition_by is not None and partition_by in df.columns:
+        dates = pd.to_datetime(df[partition_by]).dt.date
+        table = table.append_column(PARTITION_COLUMN, pa.array(dates, type=pa.date32()))
+        ds.write_dataset(table, path, format='parquet', partitioning=PARTITIONING, **options)
+    else:
+        os.makedirs(path, exist_ok=True)
+        ds.write_dataset(table, path, format='parquet', **options)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, start=None, end=None,
+               timestamp_col: str = 'timestamp') -> pd.DataFrame:
+    """
+    Read a dataset written by write_table, loading only what is needed.
+    :param columns: Columns to load; None loads all of them.
+    :param start: Inclusive lower bound on timestamp_col.
+    :param end: Exclusive upper bound on timestamp_col.
+    Partitioned Parquet skips whole date partitions outside [start, end) and pushes the
+    timestamp predicate down to row groups. Arrow IPC files are memory-mapped, so
+    unfiltered columns are read without copying.
+    """
+    storage_format = _storage_format(path)
+    if storage_format == 'csv':
+        usecols = None if columns is None else sorted(set(columns) | ({timestamp_col} if start or end else set()))
+        df = pd.read_csv(path, usecols=usecols)
+        if start is not None or end is not None:
+            df[timestamp_col] = pd.to_datetime(df[timestamp_col])
+            df = df[_time_mask(df[timestamp_col], start, end)]
+        return df if columns is None else df[columns]
+
+    if storage_format == 'arrow':
+        # read_all() on a memory map references the file pages instead of copying them
+        dataset = ds.dataset(pa.ipc.open_file(pa.memory_map(path, 'r')).read_all())
+    else:
+        dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING
+                             if _is_partitioned(path) else None)
+
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name != PARTITION_COLUMN]
+    table = dataset.to_table(columns=columns, filter=_time_filter(dataset.schema, start, end, timestamp_col))
+    return table.to_pandas()
+
+
+def _is_partitioned(path: str) -> bool:
+    return os.path.isdir(path) and any(name.startswith(f'{PARTITION_COLUMN}=') for name in os.listdir(path))
+
+
+def _time_mask(timestamps: pd.Series, start, end) -> pd.Series:
+    mask = pd.Series(True, index=timestamps.index)
+    if start is not None:
+        mask &= timestamps >= pd.Timestamp(start)
+    if end is not None:
+        mask &= timestamps < pd.Timestamp(end)
+    return mask
+
+
+def _time_filter(schema: pa.Schema, start, end, timestamp_col: str) -> Optional[ds.Expression]:
+    expression = None
+    has_partition = PARTITION_COLUMN in schema.names
+    for bound, op in ((start, 'ge'), (end, 'lt')):
+        if bound is None:
+            continue
+        bound = pd.Timestamp(bound)
+        terms = [_compare(ds.field(timestamp_col), op, pa.scalar(bound, type=schema.field(timestamp_col).type))]
+        if has_partition:
+            # Date partitions can only be pruned with an inclusive bound on the day
+            terms.append(_compare(ds.field(PARTITION_COLUMN), 'ge' if op == 'ge' else 'le',
+                                  pa.scalar(bound.date(), type=pa.date32())))
+        for term in terms:
+            expression = term if expression is None else expression & term
+    return expression
+
+
+def _compare(field: ds.Expression, op: str, value) -> ds.Expression:
+    if op == 'ge':
+        return field >= value
+    if op == 'le':
+        return field <= value
+    return field < value
@@ -1,3 +1,7 @@
 from .graph_features import GraphFeatureExtractor
+from .transaction_graph import TransactionGraph
+from .incremental_graph import IncrementalGraphFeatures
+from .neighborhood_index import NeighborhoodIndex
 from .temporal_features import TemporalFeatureExtractor
-from .behavioral_features import BehavioralFeatureExtractor
\ No newline at end of file
+from .behavioral_features import BehavioralFeatureExtractor
+from .behavioral_profiles import BehavioralProfileStore
\ No newline at end of file
@@ -1,81 +1,113 @@
+import numpy as np
 import pandas as pd
-from typing import Dict
 
 class BehavioralFeatureExtractor:
-    def __init__(self, transaction_data: pd.DataFrame):
+    def __init__(self, transaction_data: pd.DataFrame, abnormal_quantile: float = 0.95):
         self.transaction_data = transaction_data
+        self.abnormal_quantile = abnormal_quantile
 
-    def extract_frequency_features(self) -> Dict[str, Dict[str, float]]:
+    def _sorted_transactions(self) -> pd.DataFrame:
         """
-        Extract behavioral features related to transaction frequency.
-        :return: A dictionary where keys are user IDs and values are dictionaries of behavioral features.
+        Sender, amount and timestamp sorted once by (from, timestamp), with the time
+        since the sender's previous transaction computed without a Python groupby loop.
         """
-        features = {}
-        user_transaction_counts = self.transaction_data.groupby('from').size()
+        df = pd.DataFrame({
+            'from': self.transaction_data['from'].to_numpy(),
+            'amount': self.transaction_data['amount'].to_numpy(),
+            'timestamp': pd.to_datetime(self.transaction_data['timestamp']).to_numpy()
+        })
+        df = df.sort_values(['from', 'timestamp'], kind='mergesort', ignore_index=True)
+        same_sender = df['from'].eq(df['from'].shift())
+        df['time_diff'] = df['timestamp'].diff().dt.total_seconds().where(same_sender)
+        return df
 
-        for user, count in user_transaction_counts.items():
-            total_amount = self.transaction_data[self.transaction_data['from'] == user]['amount'].sum()
-            avg_transaction_size = total_amount / count
+    def _abnormal_threshold(self) -> float:
+        # Threshold for abnormal transactions (95th percentile by default)
+        return self.transaction_data['amount'].quantile(self.abnormal_quantile)
 
-            features[user] = {
-                'transaction_count': count,
-                'total_transaction_amount': total_amount,
-                'avg_transaction_size': avg_transaction_size
-            }
-        
+    @staticmethod
+    def _finish_time_features(features: pd.DataFrame, diff_count: pd.Series) -> pd.DataFrame:
+        # Senders with a single transaction have no intervals; report 0 as before
+        no_diffs = diff_count == 0
+        features.loc[no_diffs, ['avg_time_between_transactions', 'std_time_between_transactions']] = 0.0
         return features
 
-    def extract_time_based_behavioral_features(self) -> Dict[str, Dict[str, float]]:
+    def extract_frequency_features(self) -> pd.DataFrame:
         """
-        Extract behavioral features based on time intervals between transactions.
-        :return: A dictionary where keys are user IDs and values are dictionaries of time-based behavioral features.
+        Extract behavioral features related to transaction frequency.
+        :return: A DataFrame indexed by sender address with one column per feature.
         """
-        features = {}
-        self.transaction_data['timestamp'] = pd.to_datetime(self.transaction_data['timestamp'])
-        
-        # Calculate time difference between consecutive transactions for each user
-        self.transaction_data['time_diff'] = self.transaction_data.groupby('from')['timestamp'].diff().dt.total_seconds()
-        
-        for user, group in self.transaction_data.groupby('from'):
-            time_diffs = group['time_diff'].dropna()  # Remove NaN values (first transaction has NaN)
-
-            if len(time_diffs) > 0:
-                avg_time_diff = time_diffs.mean()
-                std_time_diff = time_diffs.std()
-            else:
-                avg_time_diff = 0
-                std_time_diff = 0
-
-            features[user] = {
-                'avg_time_between_transactions': avg_time_diff,
-                'std_time_between_transactions': std_time_diff
-            }
-
+        features = self.transaction_data.groupby('from')['amount'].agg(
+            transaction_count='size',
+            total_transaction_amount='sum'
+        )
+        features['avg_transaction_size'] = features['total_transaction_amount'] / features['transaction_count']
         return features
 
-    def extract_abnormal_transaction_features(self) -> Dict[str, Dict[str, float]]:
+    def extract_time_based_behavioral_features(self) -> pd.DataFrame:
+        """
+        Extract behavioral features based on time intervals between transactions.
+        :return: A DataFrame indexed by sender address with one column per feature.
+        """
+        grouped = self._sorted_transactions().groupby('from')['time_diff']
+        features = grouped.agg(
+            avg_time_between_transactions='mean',
+            std_time_between_transactions='std'
+        )
+        return self._finish_time_features(features, grouped.count())
+
+    def extract_abnormal_transaction_features(self) -> pd.DataFrame:
         """
         Extract behavioral features related to abnormal transaction patterns.
-        :return: A dictionary where keys are user IDs and values are dictionaries of abnormal transaction features.
+        :return: A DataFrame indexed by sender address with one column per feature.
         """
-        features = {}
-        threshold = self.transaction_data['amount'].quantile(0.95)  # Define threshold for abnormal transactions (95th percentile)
+        is_abnormal = (self.transaction_data['amount'] > self._abnormal_threshold()).astype(np.int64)
+        features = is_abnormal.groupby(self.transaction_data['from']).agg(
+            abnormal_transaction_count='sum',
+            abnormal_transaction_percentage='mean'
+        )
+        features.index.name = 'from'
+        return features
 
-        for user, group in self.transaction_data.groupby('from'):
-            abnormal_transactions = group[group['amount'] > threshold]
-            abnormal_count = abnormal_transactions.shape[0]
-            abnormal_percentage = abnormal_count / group.shape[0] if group.shape[0] > 0 else 0
+    def extract_all_features(self) -> pd.DataFrame:
+        """
+        Extract frequency, time-based and abnormal transaction features together from
+        a single shared sort and groupby pass.
+        :return: A wide DataFrame indexed by sender address.
+        """
+        df = self._sorted_transactions()
+        df['is_abnormal'] = (df['amount'] > self._abnormal_threshold()).astype(np.int64)
 
-            features[user] = {
-                'abnormal_transaction_count': abnormal_count,
-                'abnormal_transaction_percentage': abnormal_percentage
-            }
+        aggregated = df.groupby('from', sort=False).agg(
+            transaction_count=('amount', 'size'),
+            total_transaction_amount=('amount', 'sum'),
+            avg_time_between_transactions=('time_diff', 'mean'),
+            std_time_between_transactions=('time_diff', 'std'),
+            time_diff_count=('time_diff', 'count'),
+            abnormal_transaction_count=('is_abnormal', 'sum')
+        )
+        aggregated['avg_transaction_size'] = aggregated['total_transaction_amount'] / aggregated['transaction_count']
+        aggregated['abnormal_transaction_percentage'] = (
+            aggregated['abnormal_transaction_count'] / aggregated['transaction_count']
+        )
+        aggregated = self._finish_time_features(aggregated, aggregated.pop('time_diff_count'))
 
-        return features
+        return aggregated[[
+            'transaction_count',
+            'total_transaction_amount',
+            'avg_transaction_size',
+            'avg_time_between_transactions',
+            'std_time_between_transactions',
+            'abnormal_transaction_count',
+            'abnormal_transaction_percentage'
+        ]]
 
 if __name__ == "__main__":
+    from src.data.storage import read_table, write_table
+
     # Load preprocessed transaction data
-    transaction_data = pd.read_csv("data/processed/preprocessed_blockchain_data.csv")
+    transaction_data = read_table("data/processed/preprocessed_blockchain_data.parquet",
+                                  columns=['from', 'amount', 'timestamp'])
     
     extractor = BehavioralFeatureExtractor(transaction_data)
     
@@ -84,6 +116,6 @@ if __name__ == "__main__":
     abnormal_features = extractor.extract_abnormal_transaction_features()
 
     # Save extracted features
-    pd.DataFrame.from_dict(frequency_features, orient='index').to_csv("data/processed/frequency_features.csv")
-    pd.DataFrame.from_dict(time_based_features, orient='index').to_csv("data/processed/time_based_behavioral_features.csv")
-    pd.DataFrame.from_dict(abnormal_features, orient='index').to_csv("data/processed/abnormal_transaction_features.csv")
+    write_table(frequency_features.reset_index(), "data/processed/frequency_features.parquet")
+    write_table(time_based_features.reset_index(), "data/processed/time_based_behavioral_features.parquet")
+    write_table(abnormal_features.reset_index(), "data/processed/abnormal_transaction_features.parquet")
@@ -0,0 +1,197 @@
+import joblib
+import math
+import numbers
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P-square algorithm (Jain & Chlamtac, 1985).
+    Keeps five markers, so memory and update cost are constant.
+    """
+
+    def __init__(self, p: float = 0.95):
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1.0 + 2 * p, 1.0 + 4 * p, 3.0 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1.0 + p) / 2, 1.0]
+
+    def update(self, x: float):
+        self.count += 1
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def value(self) -> float:
+        """Current quantile estimate; exact while fewer than five values were seen."""
+        if not self.heights:
+            return math.nan
+        if len(self.heights) < 5:
+            rank = self.p * (len(self.heights) - 1)
+            low = int(math.floor(rank))
+            high = min(low + 1, len(self.heights) - 1)
+            return self.heights[low] + (self.heights[high] - self.heights[low]) * (rank - low)
+        return self.heights[2]
+
+
+class AddressProfile:
+    """Running behavioral state for one sender address."""
+
+    __slots__ = ('transaction_count', 'total_amount', 'last_timestamp',
+                 'gap_count', 'gap_mean', 'gap_m2', 'abnormal_count')
+
+    def __init__(self):
+        self.transaction_count = 0
+        self.total_amount = 0.0
+        self.last_timestamp = None
+        self.gap_count = 0
+        self.gap_mean = 0.0
+        self.gap_m2 = 0.0
+        self.abnormal_count = 0
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class BehavioralProfileStore:
+    """
+    Streaming counterpart of BehavioralFeatureExtractor for real-time scoring.
+    Each transaction updates its sender's profile in constant time: counts and totals,
+    Welford mean/variance of the inter-arrival time, and an abnormal-transaction count
+    against a P-square estimate of the global amount quantile.
+    """
+
+    def __init__(self, abnormal_quantile: float = 0.95):
+        self.profiles: Dict[str, AddressProfile] = {}
+        self.amount_quantile = P2Quantile(abnormal_quantile)
+
+    @staticmethod
+    def _to_seconds(timestamp) -> float:
+        # numbers.Real also covers numpy scalars such as np.int64 epoch seconds
+        if isinstance(timestamp, numbers.Real):
+            return float(timestamp)
+        return pd.Timestamp(timestamp).value / 1e9
+
+    def update(self, sender: str, amount: float, timestamp):
+        """
+        Add one transaction to the sender's profile.
+        A transaction counts as abnormal if it exceeds the threshold estimated from
+        the transactions seen before it.
+        """
+        profile = self.profiles.get(sender)
+        if profile is None:
+            profile = self.profiles[sender] = AddressProfile()
+
+        threshold = self.amount_quantile.value()
+        if not math.isnan(threshold) and amount > threshold:
+            profile.abnormal_count += 1
+        self.amount_quantile.update(amount)
+
+        profile.transaction_count += 1
+        profile.total_amount += amount
+
+        ts = self._to_seconds(timestamp)
+        # A late (out-of-order) transaction has no gap to the sender's latest one;
+        # a negative gap would skew the inter-arrival mean and variance
+        if profile.last_timestamp is not None and ts >= profile.last_timestamp:
+            # Welford's online update of the inter-arrival mean and variance
+            gap = ts - profile.last_timestamp
+            profile.gap_count += 1
+            delta = gap - profile.gap_mean
+            profile.gap_mean += delta / profile.gap_count
+            profile.gap_m2 += delta * (gap - profile.gap_mean)
+        if profile.last_timestamp is None or ts > profile.last_timestamp:
+            profile.last_timestamp = ts
+
+    def update_many(self, transactions: pd.DataFrame):
+        """Replay a DataFrame of transactions in timestamp order."""
+        ordered = transactions.sort_values('timestamp', kind='mergesort')
+        for sender, amount, timestamp in zip(ordered['from'], ordered['amount'], ordered['timestamp']):
+            self.update(sender, float(amount), timestamp)
+
+    def get_features(self, sender: str) -> Optional[Dict[str, float]]:
+        """
+        Behavioral features for a sender, using the same names as
+        BehavioralFeatureExtractor. Returns None for unseen addresses.
+        """
+        profile = self.profiles.get(sender)
+        if profile is None:
+            return None
+
+        if profile.gap_count == 0:
+            std_gap = 0.0
+        elif profile.gap_count == 1:
+            std_gap = math.nan
+        else:
+            std_gap = math.sqrt(profile.gap_m2 / (profile.gap_count - 1))
+
+        return {
+            'transaction_count': profile.transaction_count,
+            'total_transaction_amount': profile.total_amount,
+            'avg_transaction_size': profile.total_amount / profile.transaction_count,
+            'avg_time_between_transactions': profile.gap_mean,
+            'std_time_between_transactions': std_gap,
+            'abnormal_transaction_count': profile.abnormal_count,
+            'abnormal_transaction_percentage': profile.abnormal_count / profile.transaction_count
+        }
+
+    def to_frame(self, senders: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Features for many senders as a DataFrame indexed by sender."""
+        senders = list(self.profiles) if senders is None else list(senders)
+        rows = [self.get_features(sender) for sender in senders]
+        return pd.DataFrame(
+            [row for row in rows if row is not None],
+            index=pd.Index([s for s, row in zip(senders, rows) if row is not None], name='from')
+        )
+
+    def save(self, path: str):
+        """Snapshot the store to disk."""
+        joblib.dump({'profiles': self.profiles, 'amount_quantile': self.amount_quantile}, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BehavioralProfileStore':
+        """Restore a store from a snapshot written by save()."""
+        state = joblib.load(path)
+        store = cls(state['amount_quantile'].p)
+        store.profiles = state['profiles']
+        store.amount_quantile = state['amount_quantile']
+        return store
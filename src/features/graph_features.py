@@ -1,45 +1,111 @@
 import networkx as nx
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
+from .transaction_graph import TransactionGraph
 
 class GraphFeatureExtractor:
     def __init__(self, transaction_data: pd.DataFrame):
         self.transaction_data = transaction_data
-        self.graph = self._create_transaction_graph()
-
-    def _create_transaction_graph(self) -> nx.Graph:
-        G = nx.Graph()
-        for _, row in self.transaction_data.iterrows():
-            G.add_edge(row['from'], row['to'], weight=row['amount'])
-        return G
-
-    def extract_node_features(self) -> Dict[str, Dict[str, float]]:
-        features = {}
-        for node in self.graph.nodes():
-            features[node] = {
-                'degree_centrality': nx.degree_centrality(self.graph)[node],
-                'betweenness_centrality': nx.betweenness_centrality(self.graph)[node],
-                'clustering_coefficient': nx.clustering(self.graph, node)
-            }
-        return features
-
-    def extract_edge_features(self) -> Dict[tuple, Dict[str, float]]:
-        features = {}
-        for edge in self.graph.edges():
-            features[edge] = {
-                'edge_betweenness': nx.edge_betweenness_centrality(self.graph)[edge],
-                'jaccard_coefficient': list(nx.jaccard_coefficient(self.graph, [edge]))[0][2]
-            }
-        return features
+        self.transaction_graph = self._create_transaction_graph()
+
+    def _create_transaction_graph(self) -> TransactionGraph:
+        return TransactionGraph.from_transactions(self.transaction_data)
+
+    @property
+    def graph(self) -> nx.Graph:
+        """Undirected NetworkX view of the transaction graph, built on first access."""
+        return self.transaction_graph.to_networkx()
+
+    def _betweenness_centrality(self, k: Optional[int], seed: int) -> Dict[str, float]:
+        """
+        Betweenness centrality over the whole graph, computed in a single pass.
+        :param k: Number of pivot nodes to sample; None computes the exact value.
+        :param seed: Random seed for pivot sampling so runs are reproducible.
+        """
+        if k is not None and k < self.graph.number_of_nodes():
+            return nx.betweenness_centrality(self.graph, k=k, seed=seed)
+        return nx.betweenness_centrality(self.graph)
+
+    def extract_node_features(self, betweenness_k: Optional[int] = None, seed: int = 42) -> pd.DataFrame:
+        """
+        Extract per-node centrality features.
+        Each centrality is computed once for the whole graph and then looked up per node.
+        :param betweenness_k: If set, approximate betweenness with k sampled pivots.
+        :param seed: Random seed for the sampled betweenness approximation.
+        :return: A DataFrame indexed by address with one column per feature.
+        """
+        nodes = list(self.graph.nodes())
+        degree = nx.degree_centrality(self.graph)
+        betweenness = self._betweenness_centrality(betweenness_k, seed)
+        clustering = nx.clustering(self.graph)
+
+        return pd.DataFrame({
+            'degree_centrality': [degree[node] for node in nodes],
+            'betweenness_centrality': [betweenness[node] for node in nodes],
+            'clustering_coefficient': [clustering[node] for node in nodes]
+        }, index=pd.Index(nodes, name='address'))
+
+    def _edge_betweenness_centrality(self, k: Optional[int], seed: int) -> Dict[tuple, float]:
+        """
+        Edge betweenness centrality over the whole graph, computed in a single pass.
+        :param k: Number of pivot nodes to sample; None computes the exact value.
+        :param seed: Random seed for pivot sampling so runs are reproducible.
+        """
+        if k is not None and k < self.graph.number_of_nodes():
+            return nx.edge_betweenness_centrality(self.graph, k=k, seed=seed)
+        return nx.edge_betweenness_centrality(self.graph)
+
+    def _jaccard_coefficients(self, sources: list, targets: list) -> np.ndarray:
+        """
+        Jaccard coefficient of the neighbor sets of every (source, target) pair.
+        Intersections are taken row-wise from the sparse adjacency matrix in one pass.
+        """
+        adjacency = self.transaction_graph.undirected_adjacency(binary=True)
+        u_idx = self.transaction_graph.node_ids(sources)
+        v_idx = self.transaction_graph.node_ids(targets)
+        degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        shared = np.asarray(adjacency[u_idx].multiply(adjacency[v_idx]).sum(axis=1)).ravel()
+        union = degree[u_idx] + degree[v_idx] - shared
+        # Match nx.common_neighbors, which never counts the endpoints themselves
+        self_loops = adjacency.diagonal()
+        common = shared - self_loops[u_idx] - np.where(u_idx != v_idx, self_loops[v_idx], 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(union > 0, common / union, 0.0)
+
+    def extract_edge_features(self, betweenness_k: Optional[int] = None, seed: int = 42) -> pd.DataFrame:
+        """
+        Extract per-edge structural features.
+        Edge betweenness is computed once for the whole graph and Jaccard coefficients
+        for all edges are computed in one sparse-matrix pass.
+        :param betweenness_k: If set, approximate edge betweenness with k sampled pivots.
+        :param seed: Random seed for the sampled betweenness approximation.
+        :return: A DataFrame indexed by (from, to) with one column per feature.
+        """
+        edges = list(self.graph.edges())
+        sources = [u for u, _ in edges]
+        targets = [v for _, v in edges]
+        betweenness = self._edge_betweenness_centrality(betweenness_k, seed)
+
+        return pd.DataFrame({
+            'edge_betweenness': [
+                betweenness[edge] if edge in betweenness else betweenness[(edge[1], edge[0])]
+                for edge in edges
+            ],
+            'jaccard_coefficient': self._jaccard_coefficients(sources, targets)
+        }, index=pd.MultiIndex.from_arrays([sources, targets], names=['from', 'to']))
 
 if __name__ == "__main__":
+    from src.data.storage import read_table, write_table
+
     # Load preprocessed transaction data
-    transaction_data = pd.read_csv("data/processed/preprocessed_blockchain_data.csv")
+    transaction_data = read_table("data/processed/preprocessed_blockchain_data.parquet",
+                                  columns=['from', 'to', 'amount', 'timestamp'])
     
     extractor = GraphFeatureExtractor(transaction_data)
     node_features = extractor.extract_node_features()
     edge_features = extractor.extract_edge_features()
     
     # Save extracted features
-    pd.DataFrame.from_dict(node_features, orient='index').to_csv("data/processed/node_features.csv")
-    pd.DataFrame.from_dict(edge_features, orient='index').to_csv("data/processed/edge_features.csv")
\ No newline at end of file
+    write_table(node_features.reset_index(), "data/processed/node_features.parquet")
+    write_table(edge_features.reset_index(), "data/processed/edge_features.parquet")
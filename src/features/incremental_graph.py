@@ -0,0 +1,209 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Iterable, List, Optional, Set
+from .transaction_graph import TransactionGraph
+
+class IncrementalGraphFeatures:
+    """
+    Graph feature state that is maintained batch by batch.
+    Local features (degree, weighted in/out flow, clustering coefficient) are updated
+    only for the nodes a batch touches and their shared neighbors. Global metrics such
+    as betweenness are marked stale and recomputed on demand via
+    recompute_global_metrics().
+    """
+
+    GLOBAL_METRICS = ('betweenness_centrality',)
+
+    def __init__(self):
+        self.addresses: List = []
+        self.address_ids = {}
+        self.neighbors: List[Set[int]] = []
+        self.self_loops: Set[int] = set()
+        self.in_flow = np.zeros(0, dtype=np.float64)
+        self.out_flow = np.zeros(0, dtype=np.float64)
+        self.in_count = np.zeros(0, dtype=np.int64)
+        self.out_count = np.zeros(0, dtype=np.int64)
+        self.triangles = np.zeros(0, dtype=np.int64)
+        self.clustering = np.zeros(0, dtype=np.float64)
+        self.betweenness = np.zeros(0, dtype=np.float64)
+        self.stale = set(self.GLOBAL_METRICS)
+
+    @classmethod
+    def from_transaction_graph(cls, transaction_graph: TransactionGraph) -> 'IncrementalGraphFeatures':
+        """
+        Initialize the state from a full TransactionGraph in one vectorized pass.
+        """
+        state = cls()
+        n = transaction_graph.num_nodes
+        state.addresses = list(transaction_graph.addresses)
+        state.address_ids = {address: i for i, address in enumerate(state.addresses)}
+        state._grow(n)
+
+        edges = transaction_graph.edges
+        src, dst = edges['src'].to_numpy(), edges['dst'].to_numpy()
+        amount, count = edges['total_amount'].to_numpy(), edges['tx_count'].to_numpy()
+        np.add.at(state.out_flow, src, amount)
+        np.add.at(state.in_flow, dst, amount)
+        np.add.at(state.out_count, src, count)
+        np.add.at(state.in_count, dst, count)
+
+        adjacency = transaction_graph.undirected_adjacency(binary=True)
+        state.self_loops = set(np.flatnonzero(adjacency.diagonal()).tolist())
+        adjacency = (adjacency - sp.diags(adjacency.diagonal())).tocsr()
+        adjacency.eliminate_zeros()
+        state.neighbors = [
+            set(adjacency.indices[adjacency.indptr[i]:adjacency.indptr[i + 1]].tolist())
+            for i in range(n)
+        ]
+        state.triangles = (
+            np.asarray((adjacency @ adjacency).multiply(adjacency).sum(axis=1)).ravel() // 2
+        ).astype(np.int64)
+        state._refresh_clustering(np.arange(n))
+        return state
+
+    @classmethod
+    def from_transactions(cls, transaction_data: pd.DataFrame) -> 'IncrementalGraphFeatures':
+        return cls.from_transaction_graph(TransactionGraph.from_transactions(transaction_data))
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.addresses)
+
+    @property
+    def is_stale(self) -> bool:
+        return bool(self.stale)
+
+    def _grow(self, n: int):
+        """Extend the per-node arrays to hold n nodes."""
+        extra = n - len(self.in_flow)
+        if extra <= 0:
+            return
+        for name in ('in_flow', 'out_flow', 'clustering', 'betweenness'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=np.float64)]))
+        for name in ('in_count', 'out_count', 'triangles'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=np.int64)]))
+        self.neighbors.extend(set() for _ in range(n - len(self.neighbors)))
+
+    def _node_ids(self, addresses: Iterable) -> np.ndarray:
+        """Map addresses to ids, registering unseen addresses in order of appearance."""
+        ids = []
+        for address in addresses:
+            node_id = self.address_ids.get(address)
+            if node_id is None:
+                node_id = len(self.addresses)
+                self.address_ids[address] = node_id
+                self.addresses.append(address)
+            ids.append(node_id)
+        return np.asarray(ids, dtype=np.int64)
+
+    def _refresh_clustering(self, node_ids: np.ndarray):
+        degree = np.fromiter((len(self.neighbors[i]) for i in node_ids), dtype=np.float64, count=len(node_ids))
+        possible = degree * (degree - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.clustering[node_ids] = np.where(possible > 0, 2 * self.triangles[node_ids] / possible, 0.0)
+
+    def update(self, batch: pd.DataFrame, source_col: str = 'from', target_col: str = 'to',
+               amount_col: str = 'amount') -> np.ndarray:
+        """
+        Append a batch of transactions to the graph state.
+        :param batch: DataFrame with one row per new transaction.
+        :return: Ids of the nodes whose local features changed.
+        """
+        n_tx = len(batch)
+        endpoints = np.empty(2 * n_tx, dtype=object)
+        endpoints[0::2] = batch[source_col].to_numpy()
+        endpoints[1::2] = batch[target_col].to_numpy()
+        ids = self._node_ids(endpoints)
+        self._grow(self.num_nodes)
+        src, dst = ids[0::2], ids[1::2]
+
+        amount = batch[amount_col].to_numpy(dtype=np.float64)
+        np.add.at(self.out_flow, src, amount)
+        np.add.at(self.in_flow, dst, amount)
+        np.add.at(self.out_count, src, 1)
+        np.add.at(self.in_count, dst, 1)
+
+        touched = set(src.tolist()) | set(dst.tolist())
+        pairs = np.unique(np.stack([np.minimum(src, dst), np.maximum(src, dst)], axis=1), axis=0)
+        new_edge = False
+        for u, v in pairs.tolist():
+            if u == v:
+                if u not in self.self_loops:
+                    self.self_loops.add(u)
+                    new_edge = True
+                continue
+            if v in self.neighbors[u]:
+                continue
+            # Every common neighbor closes one new triangle with the new edge
+            common = self.neighbors[u] & self.neighbors[v]
+            self.triangles[u] += len(common)
+            self.triangles[v] += len(common)
+            for w in common:
+                self.triangles[w] += 1
+            touched.update(common)
+            self.neighbors[u].add(v)
+            self.neighbors[v].add(u)
+            new_edge = True
+
+        touched_ids = np.fromiter(sorted(touched), dtype=np.int64, count=len(touched))
+        self._refresh_clustering(touched_ids)
+        if new_edge:
+            self.stale.update(self.GLOBAL_METRICS)
+        return touched_ids
+
+    def degree(self) -> np.ndarray:
+        """Node degree, counting self-loops twice as NetworkX does."""
+        degree = np.fromiter((len(n) for n in self.neighbors), dtype=np.float64, count=self.num_nodes)
+        if self.self_loops:
+            degree[list(self.self_loops)] += 2
+        return degree
+
+    def to_networkx(self) -> nx.Graph:
+        """Undirected, unweighted NetworkX view of the current state."""
+        G = nx.Graph()
+        G.add_nodes_from(self.addresses)
+        G.add_edges_from(
+            (self.addresses[u], self.addresses[v])
+            for u, nbrs in enumerate(self.neighbors) for v in nbrs if u < v
+        )
+        G.add_edges_from((self.addresses[u], self.addresses[u]) for u in self.self_loops)
+        return G
+
+    def recompute_global_metrics(self, betweenness_k: Optional[int] = None, seed: int = 42):
+        """
+        Recompute the global metrics over the whole graph and clear the stale flags.
+        Intended to run on a schedule rather than after every batch.
+        """
+        G = self.to_networkx()
+        if betweenness_k is not None and betweenness_k < G.number_of_nodes():
+            betweenness = nx.betweenness_centrality(G, k=betweenness_k, seed=seed)
+        else:
+            betweenness = nx.betweenness_centrality(G)
+        self.betweenness = np.array([betweenness[address] for address in self.addresses], dtype=np.float64)
+        self.stale.clear()
+
+    def node_features(self, addresses: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Current per-node features. Global metric columns hold their last computed
+        values; check is_stale to know whether they lag behind the latest batch.
+        :param addresses: Restrict the result to these addresses; defaults to all nodes.
+        """
+        if addresses is None:
+            ids = np.arange(self.num_nodes)
+        else:
+            ids = np.array([self.address_ids[address] for address in addresses], dtype=np.int64)
+        degree = self.degree()[ids]
+        scale = 1.0 / (self.num_nodes - 1) if self.num_nodes > 1 else 1.0
+
+        return pd.DataFrame({
+            'degree': degree,
+            'degree_centrality': degree * scale,
+            'in_flow': self.in_flow[ids],
+            'out_flow': self.out_flow[ids],
+            'in_count': self.in_count[ids],
+            'out_count': self.out_count[ids],
+            'clustering_coefficient': self.clustering[ids],
+            'betweenness_centrality': self.betweenness[ids]
+        }, index=pd.Index([self.addresses[i] for i in ids], name='address'))
@@ -0,0 +1,350 @@
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Dict, Optional
+from .transaction_graph import TransactionGraph
+
+class NeighborhoodIndex:
+    """
+    Precomputed 1-hop and 2-hop neighborhoods of every address, for graph-aware scoring
+    at request time without touching a NetworkX graph.
+
+    Neighborhoods are undirected and exclude the address itself. They are stored as CSR
+    arrays: 1-hop entries carry the total amount and transaction count exchanged with
+    that neighbor in both directions, and 2-hop entries carry the number of shared
+    neighbors. Per-address flow totals are kept in `node_stats`. The arrays can be saved
+    to a directory and reopened memory-mapped; each save goes to a new version
+    subdirectory, so a save never rewrites files another process has mapped.
+
+    append() records new transactions in a small in-memory overlay that queries merge
+    with the CSR arrays. compact() (also run by save()) folds the overlay back into CSR.
+    """
+
+    ARRAY_NAMES = ('indptr', 'indices', 'edge_amount', 'edge_count',
+                   'two_hop_indptr', 'two_hop_indices', 'two_hop_paths', 'node_stats', 'addresses')
+    NODE_STATS = ('out_amount', 'in_amount', 'out_count', 'in_count')
+    # Upper bound on 2-paths expanded per block of rows when building 2-hop lists
+    TWO_HOP_BLOCK_PATHS = 1 << 22
+    # Names the version subdirectory that load() opens
+    CURRENT_FILE = 'CURRENT'
+
+    def __init__(self, arrays: Dict[str, np.ndarray], max_two_hop: Optional[int] = None):
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.max_two_hop = max_two_hop
+        self.address_index = pd.Index(self.addresses)
+        self._reset_overlay()
+
+    def _reset_overlay(self):
+        self._new_addresses = []
+        self._new_ids = {}
+        # node id -> {neighbor id: [amount, count]}
+        self._delta_edges: Dict[int, Dict[int, list]] = {}
+        # node id -> additions to node_stats
+        self._delta_stats: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_transaction_graph(cls, graph: TransactionGraph, max_two_hop: Optional[int] = None) -> 'NeighborhoodIndex':
+        """
+        :param max_two_hop: Keep at most this many 2-hop neighbors per address, those with
+            the most shared neighbors first; all of them if None.
+        """
+        edges = graph.edges
+        return cls.from_edges(graph.addresses, edges['src'].to_numpy(), edges['dst'].to_numpy(),
+                              edges['total_amount'].to_numpy(), edges['tx_count'].to_numpy(), max_two_hop)
+
+    @classmethod
+    def from_transactions(cls, transaction_data: pd.DataFrame, max_two_hop: Optional[int] = None,
+                          **columns) -> 'NeighborhoodIndex':
+        return cls.from_transaction_graph(TransactionGraph.from_transactions(transaction_data, **columns), max_two_hop)
+
+    @classmethod
+    def from_edges(cls, addresses: np.ndarray, src: np.ndarray, dst: np.ndarray, amount: np.ndarray,
+                   count: np.ndarray, max_two_hop: Optional[int] = None) -> 'NeighborhoodIndex':
+        """Build every array from directed, per-pair aggregated edges in one vectorized pass."""
+        n = len(addresses)
+        src, dst = src.astype(np.int64), dst.astype(np.int64)
+        node_stats = np.column_stack([
+            np.bincount(src, weights=amount, minlength=n), np.bincount(dst, weights=amount, minlength=n),
+            np.bincount(src, weights=count, minlength=n), np.bincount(dst, weights=count, minlength=n)
+        ])
+
+        # Both directions of each pair are merged into one undirected entry per endpoint
+        not_loop = src != dst
+        pairs = pd.DataFrame({
+            'node': np.concatenate([src[not_loop], dst[not_loop]]),
+            'neighbor': np.concatenate([dst[not_loop], src[not_loop]]),
+            'amount': np.concatenate([amount[not_loop], amount[not_loop]]),
+            'count': np.concatenate([count[not_loop], count[not_loop]])
+        }).groupby(['node', 'neighbor'], sort=True).sum().reset_index()
+        node = pairs['node'].to_numpy()
+        indices = pairs['neighbor'].to_numpy()
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(node, minlength=n))])
+
+        adjacency = sp.csr_matrix((np.ones(len(indices), dtype=np.int64), indices, indptr), shape=(n, n))
+        two_hop_indptr, two_hop_indices, two_hop_paths = cls._two_hop(adjacency, max_two_hop)
+
+        return cls({
+            'indptr': indptr.astype(np.int64),
+            'indices': indices.astype(np.int64),
+            'edge_amount': pairs['amount'].to_numpy(dtype=np.float64),
+            'edge_count': pairs['count'].to_numpy(dtype=np.int64),
+            'two_hop_indptr': two_hop_indptr.astype(np.int64),
+            'two_hop_indices': two_hop_indices.astype(np.int64),
+            'two_hop_paths': two_hop_paths.astype(np.int64),
+            'node_stats': node_stats,
+            'addresses': np.asarray(addresses).astype(str)
+        }, max_two_hop)
+
+    @classmethod
+    def _two_hop(cls, adjacency: sp.csr_matrix, max_two_hop: Optional[int], block_paths: Optional[int] = None):
+        """
+        2-hop CSR arrays with shared-neighbor counts, computed one block of rows at a
+        time. Each block's share of adjacency @ adjacency expands at most block_paths
+        2-paths (a single hub row may exceed it), and is filtered and truncated to
+        max_two_hop before the next block, so the full product is never held in memory.
+        """
+        block_paths = block_paths or cls.TWO_HOP_BLOCK_PATHS
+        n = adjacency.shape[0]
+        # 2-paths starting at each row: the sum of its neighbors' degrees
+        work = np.cumsum(adjacency @ np.diff(adjacency.indptr))
+        total = int(work[-1]) if n else 0
+        bounds = np.unique(np.concatenate([[0], np.searchsorted(work, np.arange(block_paths, total, block_paths),
+                                                                side='right'), [n]]))
+
+        row_counts, indices, paths = [], [], []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            block = adjacency[start:end]
+            # Drop 1-hop neighbors: subtracting their path counts leaves explicit zeros
+            two_hop = (block @ adjacency).tocsr()
+            two_hop = (two_hop - two_hop.multiply(block)).tocsr()
+            rows = np.repeat(np.arange(end - start), np.diff(two_hop.indptr))
+            two_hop.data[two_hop.indices == rows + start] = 0
+            two_hop.eliminate_zeros()
+            two_hop.sort_indices()
+            arrays = two_hop.indptr, two_hop.indices, two_hop.data
+            if max_two_hop is not None:
+                arrays = cls._truncate(*arrays, max_two_hop)
+            row_counts.append(np.diff(arrays[0]))
+            indices.append(arrays[1])
+            paths.append(arrays[2])
+
+        two_hop_indptr = np.concatenate([[0], np.cumsum(np.concatenate(row_counts + [np.zeros(0, np.int64)]))])
+        return (two_hop_indptr, np.concatenate(indices + [np.zeros(0, np.int64)]),
+                np.concatenate(paths + [np.zeros(0, np.int64)]))
+
+    @staticmethod
+    def _truncate(indptr: np.ndarray, indices: np.ndarray, paths: np.ndarray, limit: int):
+        """
+        Keep the `limit` entries with the most paths in each row, ties by lowest id.
+        Only rows longer than the limit are sorted; indices must be sorted within rows.
+        """
+        counts = np.diff(indptr)
+        rows = np.repeat(np.arange(len(counts)), counts)
+        keep = counts[rows] <= limit
+        long_entries = np.flatnonzero(~keep)
+        if len(long_entries):
+            # A stable sort on (row, -paths) leaves equal-path entries in ascending id order
+            key = rows[long_entries] * (int(paths.max()) + 1) - paths[long_entries]
+            order = long_entries[np.argsort(key, kind='stable')]
+            sorted_rows = rows[order]
+            is_start = np.ones(len(order), dtype=bool)
+            is_start[1:] = sorted_rows[1:] != sorted_rows[:-1]
+            positions = np.arange(len(order))
+            rank = positions - np.maximum.accumulate(np.where(is_start, positions, 0))
+            keep[order[rank < limit]] = True
+        new_indptr = np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=len(counts)))])
+        return new_indptr, indices[keep], paths[keep]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.addresses) + len(self._new_addresses)
+
+    def node_id(self, address) -> int:
+        """Id of an address, or -1 if it has never been seen."""
+        node = self.address_index.get_indexer([address])[0]
+        if node < 0:
+            node = self._new_ids.get(address, -1)
+        return int(node)
+
+    def address(self, node: int):
+        base = len(self.addresses)
+        return self.addresses[node] if node < base else self._new_addresses[node - base]
+
+    def _base_slice(self, indptr: np.ndarray, node: int):
+        if node >= len(indptr) - 1:
+            return slice(0, 0)
+        return slice(indptr[node], indptr[node + 1])
+
+    def neighbors(self, node: int):
+        """
+        :return: (neighbor ids, total amount, transaction count) for one node id.
+        """
+        span = self._base_slice(self.indptr, node)
+        ids, amount, count = self.indices[span], self.edge_amount[span], self.edge_count[span]
+        delta = self._delta_edges.get(node)
+        if not delta:
+            return ids, amount, count
+
+        merged = dict(zip(ids.tolist(), zip(amount.tolist(), count.tolist())))
+        for neighbor, (delta_amount, delta_count) in delta.items():
+            old_amount, old_count = merged.get(neighbor, (0.0, 0))
+            merged[neighbor] = (old_amount + delta_amount, old_count + delta_count)
+        ids = np.fromiter(sorted(merged), dtype=np.int64, count=len(merged))
+        amount = np.array([merged[i][0] for i in ids.tolist()], dtype=np.float64)
+        count = np.array([merged[i][1] for i in ids.tolist()], dtype=np.int64)
+        return ids, amount, count
+
+    def two_hop(self, node: int) -> np.ndarray:
+        """Ids of nodes exactly two hops away."""
+        one_hop = self.neighbors(node)[0]
+        if not self._delta_edges or (node not in self._delta_edges
+                                      and not any(n in self._delta_edges for n in one_hop.tolist())):
+            return self.two_hop_indices[self._base_slice(self.two_hop_indptr, node)]
+
+        # The overlay changed this neighborhood: derive it from current 1-hop lists
+        reached, paths = np.unique(np.concatenate([self.neighbors(n)[0] for n in one_hop.tolist()] + [one_hop[:0]]),
+                                   return_counts=True)
+        keep = ~np.isin(reached, one_hop) & (reached != node)
+        reached, paths = reached[keep], paths[keep]
+        if self.max_two_hop is not None and len(reached) > self.max_two_hop:
+            reached = np.sort(reached[np.lexsort((reached, -paths))[:self.max_two_hop]])
+        return reached
+
+    def node_statistics(self, node: int) -> np.ndarray:
+        stats = self.node_stats[node] if node < len(self.node_stats) else np.zeros(len(self.NODE_STATS))
+        delta = self._delta_stats.get(node)
+        return stats + delta if delta is not None else stats
+
+    def summary(self, address) -> Dict[str, float]:
+        """Aggregate neighborhood features of one address; zeros if it is unknown."""
+        node = self.node_id(address)
+        if node < 0:
+            return {'degree': 0, 'two_hop_count': 0, 'neighbor_amount': 0.0, 'neighbor_tx_count': 0,
+                    **{name: 0.0 for name in self.NODE_STATS}}
+        ids, amount, count = self.neighbors(node)
+        stats = self.node_statistics(node)
+        return {
+            'degree': len(ids),
+            'two_hop_count': len(self.two_hop(node)),
+            'neighbor_amount': float(amount.sum()),
+            'neighbor_tx_count': int(count.sum()),
+            **{name: float(value) for name, value in zip(self.NODE_STATS, stats)}
+        }
+
+    def _get_or_add(self, address) -> int:
+        node = self.node_id(address)
+        if node < 0:
+            node = self.num_nodes
+            self._new_ids[address] = node
+            self._new_addresses.append(address)
+        return node
+
+    def append(self, transaction_data: pd.DataFrame, source_col: str = 'from', target_col: str = 'to',
+               amount_col: str = 'amount'):
+        """Add new transactions to the overlay; the stored arrays are left untouched."""
+        for sender, receiver, amount in zip(transaction_data[source_col], transaction_data[target_col],
+                                            transaction_data[amount_col].astype(float)):
+            u, v = self._get_or_add(sender), self._get_or_add(receiver)
+            self._delta_stats.setdefault(u, np.zeros(len(self.NODE_STATS)))[[0, 2]] += (amount, 1)
+            self._delta_stats.setdefault(v, np.zeros(len(self.NODE_STATS)))[[1, 3]] += (amount, 1)
+            if u == v:
+                continue
+            for a, b in ((u, v), (v, u)):
+                entry = self._delta_edges.setdefault(a, {}).setdefault(b, [0.0, 0])
+                entry[0] += amount
+                entry[1] += 1
+
+    def compact(self):
+        """Merge the overlay into new CSR arrays and recompute the 2-hop lists."""
+        if not self._delta_edges and not self._delta_stats:
+            return
+        n = self.num_nodes
+        base_rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        delta = [(a, b, amount, count) for a, nbrs in self._delta_edges.items()
+                 for b, (amount, count) in nbrs.items()]
+        delta = np.asarray(delta, dtype=np.float64).reshape(-1, 4)
+        delta_rows, delta_cols, delta_amount, delta_count = delta.T
+
+        # Undirected entries are stored in both directions; keep one of each pair.
+        # Flow totals come from node_stats, not from these edges
+        src = np.concatenate([base_rows, delta_rows]).astype(np.int64)
+        dst = np.concatenate([self.indices, delta_cols]).astype(np.int64)
+        amount = np.concatenate([self.edge_amount, delta_amount]).astype(np.float64)
+        count = np.concatenate([self.edge_count, delta_count]).astype(np.int64)
+        keep = src < dst
+        addresses = np.concatenate([np.asarray(self.addresses), np.asarray(self._new_addresses, dtype=str)])
+        node_stats = np.vstack([self.node_stats, np.zeros((n - len(self.node_stats), len(self.NODE_STATS)))])
+        for node, stats in self._delta_stats.items():
+            node_stats[node] += stats
+
+        rebuilt = self.from_edges(addresses, src[keep], dst[keep], amount[keep], count[keep], self.max_two_hop)
+        rebuilt.node_stats = node_stats
+        self.__dict__.update(rebuilt.__dict__)
+
+    def save(self, directory: str):
+        """
+        Write the arrays to a new version subdirectory, then point CURRENT at it with one
+        atomic rename. Processes that memory-mapped an earlier version keep reading it
+        unchanged. The previous version is kept so a load in progress can finish; older
+        ones are removed.
+        """
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        version = f'v{time.time_ns():020d}'
+        version_dir = os.path.join(directory, version)
+        os.makedirs(version_dir)
+        for name in self.ARRAY_NAMES:
+            np.save(os.path.join(version_dir, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(version_dir, 'metadata.json'), 'w') as f:
+            json.dump({'num_nodes': self.num_nodes, 'max_two_hop': self.max_two_hop}, f)
+
+        pointer = os.path.join(directory, f'.{self.CURRENT_FILE}.{version}')
+        with open(pointer, 'w') as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(directory, self.CURRENT_FILE))
+
+        versions = sorted(name for name in os.listdir(directory)
+                          if name.startswith('v') and os.path.isdir(os.path.join(directory, name)))
+        for old_version in versions[:-2]:
+            shutil.rmtree(os.path.join(directory, old_version), ignore_errors=True)
+        # Arrays of the flat layout used before versioned saves
+        for name in [f'{name}.npy' for name in self.ARRAY_NAMES] + ['metadata.json']:
+            if os.path.exists(os.path.join(directory, name)):
+                os.remove(os.path.join(directory, name))
+
+    @classmethod
+    def resolve(cls, directory: str) -> Optional[str]:
+        """
+        Directory holding the current arrays: the version CURRENT names, or `directory`
+        itself for a flat layout; None if no index has been saved there.
+        """
+        current = os.path.join(directory, cls.CURRENT_FILE)
+        if os.path.exists(current):
+            with open(current) as f:
+                return os.path.join(directory, f.read().strip())
+        return directory if os.path.exists(os.path.join(directory, 'metadata.json')) else None
+
+    @classmethod
+    def version_file(cls, directory: str) -> Optional[str]:
+        """File whose mtime changes with every completed save, for hot-reload checks."""
+        current = os.path.join(directory, cls.CURRENT_FILE)
+        if os.path.exists(current):
+            return current
+        metadata = os.path.join(directory, 'metadata.json')
+        return metadata if os.path.exists(metadata) else None
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'NeighborhoodIndex':
+        version_dir = cls.resolve(directory)
+        if version_dir is None:
+            raise FileNotFoundError(f"No neighborhood index saved in {directory}")
+        arrays = {name: np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in cls.ARRAY_NAMES}
+        with open(os.path.join(version_dir, 'metadata.json')) as f:
+            metadata = json.load(f)
+        return cls(arrays, metadata['max_two_hop'])
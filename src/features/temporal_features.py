@@ -1,8 +1,12 @@
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import Sequence, Tuple, Union
+
+Window = Union[int, str]
 
 class TemporalFeatureExtractor:
+    ROLLING_STATISTICS = ('mean', 'std', 'min', 'max', 'count')
+
     def __init__(self, transaction_data: pd.DataFrame):
         self.transaction_data = transaction_data
         self.transaction_data['timestamp'] = pd.to_datetime(self.transaction_data['timestamp'])
@@ -13,10 +17,116 @@ class TemporalFeatureExtractor:
         self.transaction_data['is_weekend'] = self.transaction_data['day_of_week'].isin([5, 6]).astype(int)
         return self.transaction_data
 
-    def calculate_rolling_statistics(self, column: str, windows: List[int]) -> pd.DataFrame:
+    def _sort_by_sender(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sort rows once by (from, timestamp).
+        :return: Row order, start position of each row's sender group in sorted order,
+            and the sorted timestamps as int64 nanoseconds.
+        """
+        codes, _ = pd.factorize(self.transaction_data['from'])
+        timestamps = self.transaction_data['timestamp'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        order = np.lexsort((timestamps, codes))
+        sorted_codes = codes[order]
+
+        n = len(order)
+        is_start = np.ones(n, dtype=bool)
+        is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        group_start = np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+        return order, group_start, timestamps[order]
+
+    @staticmethod
+    def _time_window_start(timestamps: np.ndarray, group_start: np.ndarray, window: pd.Timedelta) -> np.ndarray:
+        """
+        First row of each (t - window, t] window, found with a binary search that is
+        vectorized over all rows and bounded by the sender's group.
+        """
+        cutoff = timestamps - window.value
+        lo = group_start.copy()
+        hi = np.arange(len(timestamps))
+        while True:
+            active = lo < hi
+            if not active.any():
+                return lo
+            mid = (lo + hi) // 2
+            inside = timestamps[mid] > cutoff
+            hi = np.where(active & inside, mid, hi)
+            lo = np.where(active & ~inside, mid + 1, lo)
+
+    @staticmethod
+    def _range_extreme(values: np.ndarray, start: np.ndarray, ufunc) -> np.ndarray:
+        """
+        Range min/max over [start[i], i] for every row, built level by level like a
+        sparse table so only one level is held in memory at a time.
+        """
+        end = np.arange(len(values))
+        length = end - start + 1
+        level = np.floor(np.log2(length)).astype(np.int64)
+        result = np.empty(len(values), dtype=np.float64)
+
+        table = values.astype(np.float64)
+        span = 1
+        for k in range(int(level.max()) + 1 if len(values) else 0):
+            query = level == k
+            result[query] = ufunc(table[start[query]], table[end[query] - span + 1])
+            table = ufunc(table[:-span], table[span:]) if len(table) > span else table
+            span *= 2
+        return result
+
+    def calculate_rolling_statistics(self, column: str, windows: Sequence[Window],
+                                     statistics: Sequence[str] = ROLLING_STATISTICS) -> pd.DataFrame:
+        """
+        Per-sender rolling statistics for every window in a single pass.
+        Rows are sorted once by (from, timestamp); sums come from cumulative sums and
+        min/max from range queries, and results are written back in the original row
+        order.
+        :param column: Column to aggregate.
+        :param windows: Count windows (e.g. 10) and/or time windows (e.g. '1h', '24h').
+        :param statistics: Any of 'mean', 'std', 'min', 'max', 'count'.
+        """
+        order, group_start, timestamps = self._sort_by_sender()
+        values = self.transaction_data[column].to_numpy(dtype=np.float64)[order]
+        valid = ~np.isnan(values)
+
+        # Shift by the column mean so the running sum of squares keeps its precision
+        shift = np.nanmean(values) if valid.any() else 0.0
+        centered = np.where(valid, values - shift, 0.0)
+        cum_valid = np.concatenate(([0], np.cumsum(valid)))
+        cum_sum = np.concatenate(([0.0], np.cumsum(centered)))
+        cum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        positions = np.arange(len(values))
+
         for window in windows:
-            self.transaction_data[f'{column}_rolling_mean_{window}'] = self.transaction_data.groupby('from')[column].rolling(window=window).mean().reset_index(0, drop=True)
-            self.transaction_data[f'{column}_rolling_std_{window}'] = self.transaction_data.groupby('from')[column].rolling(window=window).std().reset_index(0, drop=True)
+            if isinstance(window, (int, np.integer)):
+                start = np.maximum(group_start, positions - window + 1)
+                min_periods = window
+            else:
+                start = self._time_window_start(timestamps, group_start, pd.Timedelta(window))
+                min_periods = 1
+
+            count = cum_valid[positions + 1] - cum_valid[start]
+            enough = count >= min_periods
+            window_stats = {}
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if 'count' in statistics:
+                    window_stats['count'] = count.astype(np.float64)
+                if 'mean' in statistics or 'std' in statistics:
+                    total = cum_sum[positions + 1] - cum_sum[start]
+                    window_stats['mean'] = np.where(enough, total / count + shift, np.nan)
+                if 'std' in statistics:
+                    squares = cum_sq[positions + 1] - cum_sq[start]
+                    variance = np.maximum(squares - total * total / count, 0.0) / (count - 1)
+                    window_stats['std'] = np.where(enough & (count > 1), np.sqrt(variance), np.nan)
+            if 'min' in statistics:
+                extreme = self._range_extreme(np.where(valid, values, np.inf), start, np.minimum)
+                window_stats['min'] = np.where(enough, extreme, np.nan)
+            if 'max' in statistics:
+                extreme = self._range_extreme(np.where(valid, values, -np.inf), start, np.maximum)
+                window_stats['max'] = np.where(enough, extreme, np.nan)
+
+            for stat in statistics:
+                result = np.empty(len(values), dtype=np.float64)
+                result[order] = window_stats[stat]
+                self.transaction_data[f'{column}_rolling_{stat}_{window}'] = result
         return self.transaction_data
 
     def calculate_time_since_last_transaction(self) -> pd.DataFrame:
@@ -24,13 +134,15 @@ class TemporalFeatureExtractor:
         return self.transaction_data
 
 if __name__ == "__main__":
+    from src.data.storage import read_table, write_table
+
     # Load preprocessed transaction data
-    transaction_data = pd.read_csv("data/processed/preprocessed_blockchain_data.csv")
+    transaction_data = read_table("data/processed/preprocessed_blockchain_data.parquet")
     
     extractor = TemporalFeatureExtractor(transaction_data)
     transaction_data = extractor.extract_time_based_features()
-    transaction_data = extractor.calculate_rolling_statistics('amount', [10, 50, 100])
+    transaction_data = extractor.calculate_rolling_statistics('amount', [10, 50, 100, '1h', '24h'])
     transaction_data = extractor.calculate_time_since_last_transaction()
     
     # Save extracted features
-    transaction_data.to_csv("data/processed/temporal_features.csv", index=False)
\ No newline at end of file
+    write_table(transaction_data, "data/processed/temporal_features.parquet")
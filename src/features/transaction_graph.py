@@ -0,0 +1,136 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+class TransactionGraph:
+    """
+    Compact array-backed transaction graph.
+    Addresses are factorized to integer ids and parallel (from, to) transactions are
+    aggregated into a single edge, so the graph is stored as an edge table and a CSR
+    adjacency instead of per-node Python dicts.
+    """
+
+    def __init__(self, addresses: np.ndarray, edges: pd.DataFrame):
+        """
+        :param addresses: Array mapping node id to address.
+        :param edges: Aggregated edge table with integer 'src' and 'dst' columns.
+        """
+        self.addresses = addresses
+        self.address_index = pd.Index(addresses)
+        self.edges = edges
+        self._adjacency = None
+        self._graphs = {}
+
+    @classmethod
+    def from_transactions(cls, transaction_data: pd.DataFrame, source_col: str = 'from',
+                          target_col: str = 'to', amount_col: str = 'amount',
+                          timestamp_col: str = 'timestamp') -> 'TransactionGraph':
+        """
+        Build the graph from transaction columns without iterating over rows.
+        :param transaction_data: DataFrame with one row per transaction.
+        :return: A TransactionGraph with one edge per distinct (from, to) pair.
+        """
+        n_tx = len(transaction_data)
+        # Interleave endpoints so ids follow first appearance, row by row
+        endpoints = np.empty(2 * n_tx, dtype=object)
+        endpoints[0::2] = transaction_data[source_col].to_numpy()
+        endpoints[1::2] = transaction_data[target_col].to_numpy()
+        codes, addresses = pd.factorize(endpoints)
+        id_dtype = np.int32 if len(addresses) < np.iinfo(np.int32).max else np.int64
+        codes = codes.astype(id_dtype)
+
+        columns = {
+            'src': codes[0::2],
+            'dst': codes[1::2],
+            'amount': transaction_data[amount_col].to_numpy(dtype=np.float64)
+        }
+        aggregations = {
+            'total_amount': ('amount', 'sum'),
+            'tx_count': ('amount', 'size')
+        }
+        if timestamp_col in transaction_data.columns:
+            columns['timestamp'] = pd.to_datetime(transaction_data[timestamp_col]).to_numpy()
+            aggregations['first_timestamp'] = ('timestamp', 'min')
+            aggregations['last_timestamp'] = ('timestamp', 'max')
+
+        edges = (
+            pd.DataFrame(columns)
+            .groupby(['src', 'dst'], sort=True)
+            .agg(**aggregations)
+            .reset_index()
+        )
+        return cls(np.asarray(addresses, dtype=object), edges)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.addresses)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    @property
+    def adjacency(self) -> sp.csr_matrix:
+        """Directed CSR adjacency weighted by total transferred amount."""
+        if self._adjacency is None:
+            self._adjacency = sp.csr_matrix(
+                (self.edges['total_amount'].to_numpy(),
+                 (self.edges['src'].to_numpy(), self.edges['dst'].to_numpy())),
+                shape=(self.num_nodes, self.num_nodes)
+            )
+        return self._adjacency
+
+    def undirected_adjacency(self, binary: bool = False) -> sp.csr_matrix:
+        """
+        Symmetric adjacency where flows in both directions between a pair are summed.
+        Built straight from the edge table, so pairs whose amounts are zero (or sum to
+        zero) keep a structural entry.
+        :param binary: If True, store 1.0 for every neighbor instead of the amount.
+        """
+        src = self.edges['src'].to_numpy()
+        dst = self.edges['dst'].to_numpy()
+        amount = self.edges['total_amount'].to_numpy(dtype=np.float64)
+        # Mirror every edge except self-loops, which would otherwise be counted twice
+        mirror = src != dst
+        rows = np.concatenate([src, dst[mirror]])
+        cols = np.concatenate([dst, src[mirror]])
+        data = np.ones(len(rows)) if binary else np.concatenate([amount, amount[mirror]])
+        # COO -> CSR sums duplicate pairs and keeps explicit zeros
+        undirected = sp.coo_matrix((data, (rows, cols)), shape=(self.num_nodes, self.num_nodes)).tocsr()
+        undirected.sort_indices()
+        if binary:
+            undirected.data[:] = 1.0
+        return undirected
+
+    def node_ids(self, addresses) -> np.ndarray:
+        """Map addresses to node ids; unknown addresses map to -1."""
+        return self.address_index.get_indexer(addresses)
+
+    def to_networkx(self, directed: bool = False) -> nx.Graph:
+        """
+        Materialize a NetworkX view of the graph. Only built on request and cached.
+        Edges carry the aggregated 'weight' (total amount) and 'count' attributes.
+        """
+        if directed in self._graphs:
+            return self._graphs[directed]
+
+        src = self.edges['src'].to_numpy()
+        dst = self.edges['dst'].to_numpy()
+        weight = self.edges['total_amount'].to_numpy()
+        count = self.edges['tx_count'].to_numpy()
+        if not directed:
+            low, high = np.minimum(src, dst), np.maximum(src, dst)
+            pairs = pd.DataFrame({'src': low, 'dst': high, 'weight': weight, 'count': count})
+            pairs = pairs.groupby(['src', 'dst'], sort=False).sum().reset_index()
+            src, dst = pairs['src'].to_numpy(), pairs['dst'].to_numpy()
+            weight, count = pairs['weight'].to_numpy(), pairs['count'].to_numpy()
+
+        G = nx.DiGraph() if directed else nx.Graph()
+        G.add_nodes_from(self.addresses)
+        G.add_edges_from(
+            (self.addresses[u], self.addresses[v], {'weight': w, 'count': int(c)})
+            for u, v, w, c in zip(src, dst, weight, count)
+        )
+        self._graphs[directed] = G
+        return G
@@ -1,4 +1,9 @@
 from .deep_learning_model import LSTMModel, train_lstm_model, predict_lstm
+from .sequence_dataset import TransactionSequenceDataset, collate_sequences
+from .lstm_state_cache import LSTMStateCache, IncrementalLSTMScorer
+from .lstm_export import ExportedLSTM, export_lstm, load_lstm, benchmark_lstm
 from .ensemble_model import EnsembleModel
-from .graph_neural_network import TemporalFeatureExtractor
+from .compiled_ensemble import CompiledEnsemble
+from .dataset_splits import DatasetSplits
+from .graph_neural_network import GraphNeuralNetwork, GraphContext, build_graph_data, train_gnn
 from .model_trainer import ModelTrainer
\ No newline at end of file
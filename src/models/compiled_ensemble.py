@@ -0,0 +1,237 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from joblib import effective_n_jobs
+from scipy.special import expit
+from typing import Dict, List, Optional
+
+class CompiledTrees:
+    """
+    A set of decision trees flattened into contiguous arrays with global node ids.
+    All trees are evaluated together, one depth level per step, for every row at once.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, trees: List, leaf_value) -> 'CompiledTrees':
+        """
+        :param trees: Fitted sklearn tree estimators.
+        :param leaf_value: Maps a tree_ to the per-node value stored for its leaves.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for tree in trees:
+            t = tree.tree_
+            is_leaf = t.children_left == -1
+            roots.append(offset)
+            # Leaves keep a valid feature index so gathers never go out of range
+            features.append(np.where(is_leaf, 0, t.feature))
+            thresholds.append(t.threshold)
+            lefts.append(np.where(is_leaf, -1, t.children_left + offset))
+            rights.append(np.where(is_leaf, -1, t.children_right + offset))
+            values.append(leaf_value(t))
+            offset += t.node_count
+            max_depth = max(max_depth, t.max_depth)
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth
+        )
+
+    def leaf_values(self, X32: np.ndarray) -> np.ndarray:
+        """
+        :param X32: Feature matrix as float32, which is what sklearn trees compare.
+        :return: Leaf value of every tree for every row, shape (n_trees, n_rows).
+        """
+        n_rows = X32.shape[0]
+        rows = np.arange(n_rows)[np.newaxis, :]
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            left = self.left[nodes]
+            go_left = X32[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(left == -1, nodes, np.where(go_left, left, self.right[nodes]))
+        return self.value[nodes]
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            f'{prefix}_feature': self.feature,
+            f'{prefix}_threshold': self.threshold,
+            f'{prefix}_left': self.left,
+            f'{prefix}_right': self.right,
+            f'{prefix}_value': self.value,
+            f'{prefix}_roots': self.roots,
+            f'{prefix}_max_depth': np.asarray(self.max_depth)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> 'CompiledTrees':
+        return cls(
+            feature=arrays[f'{prefix}_feature'],
+            threshold=arrays[f'{prefix}_threshold'],
+            left=arrays[f'{prefix}_left'],
+            right=arrays[f'{prefix}_right'],
+            value=arrays[f'{prefix}_value'],
+            roots=arrays[f'{prefix}_roots'],
+            max_depth=int(arrays[f'{prefix}_max_depth'])
+        )
+
+
+def _positive_class_fraction(t) -> np.ndarray:
+    # Same normalization as DecisionTreeClassifier.predict_proba
+    value = t.value[:, 0, :]
+    normalizer = value.sum(axis=1)
+    normalizer[normalizer == 0.0] = 1.0
+    return value[:, 1] / normalizer
+
+
+class CompiledEnsemble:
+    """
+    Array-only evaluator for a trained EnsembleModel. It scores rows without sklearn
+    and gives the same probabilities as EnsembleModel.score.
+    """
+
+    def __init__(self, rf: CompiledTrees, gb: CompiledTrees, gb_baseline: float,
+                 lr_coef: np.ndarray, lr_intercept: float, weights: Dict[str, float],
+                 active: List[str], stacker_coef: np.ndarray = None,
+                 stacker_intercept: float = 0.0, threshold: float = 0.5):
+        self.rf = rf
+        self.gb = gb
+        self.gb_baseline = gb_baseline
+        self.lr_coef = lr_coef
+        self.lr_intercept = lr_intercept
+        self.weights = weights
+        self.active = active
+        self.stacker_coef = stacker_coef
+        self.stacker_intercept = stacker_intercept
+        self.threshold = threshold
+
+    @classmethod
+    def from_ensemble(cls, ensemble) -> 'CompiledEnsemble':
+        """Flatten the members of a trained EnsembleModel into NumPy arrays."""
+        # Only needed at export time; scoring a compiled model never touches sklearn
+        from sklearn.dummy import DummyClassifier
+        from sklearn.ensemble import GradientBoostingClassifier
+
+        gb = ensemble.gb_model
+        if not isinstance(gb, GradientBoostingClassifier):
+            raise ValueError("Only GradientBoostingClassifier members can be compiled")
+        if gb.init_ != 'zero' and not isinstance(gb.init_, DummyClassifier):
+            raise ValueError("Only constant gradient boosting init estimators can be compiled")
+        if len(ensemble.rf_model.classes_) != 2:
+            raise ValueError("Only binary classifiers can be compiled")
+
+        n_features = ensemble.lr_model.coef_.shape[1]
+        gb_baseline = float(gb._raw_predict_init(np.zeros((1, n_features)))[0, 0])
+        learning_rate = gb.learning_rate
+
+        stacked = ensemble.combination == 'stacked'
+        return cls(
+            rf=CompiledTrees.from_sklearn(ensemble.rf_model.estimators_, _positive_class_fraction),
+            gb=CompiledTrees.from_sklearn(gb.estimators_[:, 0], lambda t: learning_rate * t.value[:, 0, 0]),
+            gb_baseline=gb_baseline,
+            lr_coef=np.ascontiguousarray(ensemble.lr_model.coef_[0], dtype=np.float64),
+            lr_intercept=float(ensemble.lr_model.intercept_[0]),
+            weights=dict(ensemble.weights),
+            active=list(ensemble._active_models()),
+            stacker_coef=ensemble.stacker.coef_[0].copy() if stacked else None,
+            stacker_intercept=float(ensemble.stacker.intercept_[0]) if stacked else 0.0,
+            threshold=ensemble.threshold
+        )
+
+    def _member_proba(self, name: str, X: np.ndarray, X32: np.ndarray) -> np.ndarray:
+        if name == 'rf':
+            # Accumulate tree by tree, then divide, as the forest does
+            proba = np.zeros(X.shape[0])
+            for tree_proba in self.rf.leaf_values(X32):
+                proba += tree_proba
+            return proba / len(self.rf.roots)
+        if name == 'gb':
+            raw = np.full(X.shape[0], self.gb_baseline)
+            for stage_value in self.gb.leaf_values(X32):
+                raw += stage_value
+            return expit(raw)
+        return expit(X @ self.lr_coef + self.lr_intercept)
+
+    def _contributions(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        X32 = X.astype(np.float32)
+        return {name: self._member_proba(name, X, X32) for name in self.active}
+
+    def score(self, X, n_jobs: Optional[int] = None) -> Dict[str, object]:
+        """Same arguments and result layout as EnsembleModel.score."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        n_jobs = 1 if n_jobs is None else effective_n_jobs(n_jobs)
+        if n_jobs > 1 and X.shape[0] > n_jobs:
+            # numpy releases the GIL in the gathers and comparisons, so threads overlap
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                parts = list(executor.map(self._contributions, np.array_split(X, n_jobs)))
+            contributions = {name: np.concatenate([part[name] for part in parts]) for name in self.active}
+        else:
+            contributions = self._contributions(X)
+
+        if self.stacker_coef is not None:
+            stacked = np.column_stack([contributions[name] for name in ('rf', 'gb', 'lr')])
+            probabilities = expit(stacked @ self.stacker_coef + self.stacker_intercept)
+        else:
+            total = sum(self.weights[name] * proba for name, proba in contributions.items())
+            probabilities = total / sum(self.weights[name] for name in contributions)
+
+        return {
+            'probabilities': probabilities,
+            'labels': (probabilities > self.threshold).astype(int),
+            'contributions': contributions
+        }
+
+    def predict(self, X):
+        return self.score(X)['labels']
+
+    def predict_proba(self, X):
+        return self.score(X)['probabilities']
+
+    def save(self, path: str):
+        """Write all arrays to a single uncompressed .npz file."""
+        np.savez(
+            path,
+            **self.rf.arrays('rf'),
+            **self.gb.arrays('gb'),
+            gb_baseline=np.asarray(self.gb_baseline),
+            lr_coef=self.lr_coef,
+            lr_intercept=np.asarray(self.lr_intercept),
+            weight_names=np.asarray(list(self.weights)),
+            weight_values=np.asarray(list(self.weights.values()), dtype=np.float64),
+            active=np.asarray(self.active),
+            stacker_coef=self.stacker_coef if self.stacker_coef is not None else np.zeros(0),
+            stacker_intercept=np.asarray(self.stacker_intercept),
+            threshold=np.asarray(self.threshold)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledEnsemble':
+        with np.load(path) as arrays:
+            arrays = dict(arrays)
+        stacker_coef = arrays['stacker_coef']
+        return cls(
+            rf=CompiledTrees.from_arrays(arrays, 'rf'),
+            gb=CompiledTrees.from_arrays(arrays, 'gb'),
+            gb_baseline=float(arrays['gb_baseline']),
+            lr_coef=arrays['lr_coef'],
+            lr_intercept=float(arrays['lr_intercept']),
+            weights=dict(zip(arrays['weight_names'].tolist(), arrays['weight_values'].tolist())),
+            active=arrays['active'].tolist(),
+            stacker_coef=stacker_coef if len(stacker_coef) else None,
+            stacker_intercept=float(arrays['stacker_intercept']),
+            threshold=float(arrays['threshold'])
+        )
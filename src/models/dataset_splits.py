@@ -0,0 +1,110 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+from sklearn.model_selection import train_test_split
+
+class DatasetSplits:
+    """
+    Train/validation/test arrays materialized once as float32, C-contiguous NumPy
+    arrays and shared by every model. They can be saved to a directory and reopened
+    memory-mapped, so worker processes share them through the page cache instead of
+    each holding a copy. A fingerprint of the source frame is saved alongside, so a
+    cache built from different data is detected rather than reused.
+    """
+
+    ARRAY_NAMES = ('X_train', 'y_train', 'X_val', 'y_val', 'X_test', 'y_test',
+                   'train_index', 'val_index', 'test_index')
+
+    def __init__(self, X_train, y_train, X_val, y_val, X_test, y_test, feature_names: List[str],
+                 train_index=None, val_index=None, test_index=None, fingerprint: Optional[str] = None):
+        self.X_train = X_train
+        self.y_train = y_train
+        self.X_val = X_val
+        self.y_val = y_val
+        self.X_test = X_test
+        self.y_test = y_test
+        self.feature_names = feature_names
+        # Source row positions of each split, for models that need row context (e.g. sequences)
+        self.train_index = train_index
+        self.val_index = val_index
+        self.test_index = test_index
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def fingerprint_of(data: pd.DataFrame, target: str = 'is_fraud', exclude: Sequence[str] = ()) -> str:
+        """Digest of the frame's shape, column names, dtypes and values, and of the target and excluded columns."""
+        digest = hashlib.sha256()
+        digest.update(repr((data.shape, [(str(col), str(dtype)) for col, dtype in data.dtypes.items()],
+                            target, sorted(exclude))).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, target: str = 'is_fraud', test_size: float = 0.2,
+                   val_size: float = 0.2, random_state: int = 42,
+                   exclude: Sequence[str] = ()) -> 'DatasetSplits':
+        """
+        Split row indices first, then gather each split straight into float32, so the
+        full feature matrix is never copied.
+        :param val_size: Fraction of the non-test rows held out for validation.
+        :param exclude: Non-feature columns to leave out, such as sender or timestamp keys.
+        """
+        feature_names = [col for col in data.columns if col != target and col not in exclude]
+        indices = np.arange(len(data))
+        train_idx, test_idx = train_test_split(indices, test_size=test_size, random_state=random_state)
+        train_idx, val_idx = train_test_split(train_idx, test_size=val_size, random_state=random_state)
+
+        features = data[feature_names]
+        labels = data[target].to_numpy()
+
+        def gather(idx):
+            X = np.ascontiguousarray(features.iloc[idx].to_numpy(dtype=np.float32))
+            y = np.ascontiguousarray(labels[idx], dtype=np.float32)
+            return X, y
+
+        X_train, y_train = gather(train_idx)
+        X_val, y_val = gather(val_idx)
+        X_test, y_test = gather(test_idx)
+        return cls(X_train, y_train, X_val, y_val, X_test, y_test, feature_names,
+                   train_idx, val_idx, test_idx, cls.fingerprint_of(data, target, exclude))
+
+    @property
+    def n_features(self) -> int:
+        return self.X_train.shape[1]
+
+    @staticmethod
+    def exists(directory: str, fingerprint: Optional[str] = None) -> bool:
+        """
+        Whether saved splits are present and, if `fingerprint` is given, were built from
+        data with that fingerprint.
+        """
+        if not all(os.path.exists(os.path.join(directory, f'{name}.npy')) for name in DatasetSplits.ARRAY_NAMES):
+            return False
+        return fingerprint is None or DatasetSplits._read_fingerprint(directory) == fingerprint
+
+    @staticmethod
+    def _read_fingerprint(directory: str) -> Optional[str]:
+        path = os.path.join(directory, 'fingerprint.txt')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip() or None
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAY_NAMES:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(directory, 'feature_names.txt'), 'w') as f:
+            f.write('\n'.join(self.feature_names))
+        with open(os.path.join(directory, 'fingerprint.txt'), 'w') as f:
+            f.write(self.fingerprint or '')
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'DatasetSplits':
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in cls.ARRAY_NAMES}
+        with open(os.path.join(directory, 'feature_names.txt')) as f:
+            feature_names = f.read().splitlines()
+        return cls(feature_names=feature_names, fingerprint=cls._read_fingerprint(directory), **arrays)
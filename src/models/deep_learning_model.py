@@ -1,8 +1,11 @@
+import copy
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, TensorDataset
+from torch.nn.utils.rnn import pack_padded_sequence
+from torch.utils.data import DataLoader, Dataset, TensorDataset
 import numpy as np
+from .sequence_dataset import collate_sequences
 
 class LSTMModel(nn.Module):
     def __init__(self, input_dim, hidden_dim, num_layers, output_dim):
@@ -13,39 +16,115 @@ class LSTMModel(nn.Module):
         self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True)
         self.fc = nn.Linear(hidden_dim, output_dim)
         
-    def forward(self, x):
+    def forward(self, x, lengths=None):
+        """
+        :param x: (batch, seq_len, input_dim) sequences, left-aligned when padded.
+        :param lengths: Real length of each padded sequence; None if all are full length.
+        """
         h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_dim).to(x.device)
         c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_dim).to(x.device)
-        
-        out, _ = self.lstm(x, (h0, c0))
-        out = self.fc(out[:, -1, :])
+
+        if lengths is not None:
+            # Packing skips the padding, so h_n is the state after each real last step
+            packed = pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            _, (h_n, _) = self.lstm(packed, (h0, c0))
+            out = self.fc(h_n[-1])
+        else:
+            out, _ = self.lstm(x, (h0, c0))
+            out = self.fc(out[:, -1, :])
         return torch.sigmoid(out)
 
+    def step(self, x, state=None):
+        """
+        Advance the LSTM by one transaction per sequence.
+        :param x: (batch, input_dim) features of the next transaction.
+        :param state: (h, c), each (num_layers, batch, hidden_dim); zeros if None.
+        :return: (probabilities [batch, output_dim], new (h, c))
+        """
+        out, state = self.lstm(x.unsqueeze(1), state)
+        return torch.sigmoid(self.fc(out[:, -1, :])), state
+
+def _as_sequences(X):
+    # Plain feature rows become sequences of length one
+    X = torch.as_tensor(np.asarray(X, dtype=np.float32))
+    return X.unsqueeze(1) if X.dim() == 2 else X
+
+def _make_loader(X, y, batch_size, shuffle, num_workers=0):
+    if isinstance(X, Dataset):
+        return DataLoader(X, batch_size=batch_size, shuffle=shuffle, num_workers=num_workers,
+                          collate_fn=collate_sequences, persistent_workers=num_workers > 0)
+    data = TensorDataset(_as_sequences(X), torch.as_tensor(np.asarray(y, dtype=np.float32)))
+    return DataLoader(data, batch_size=batch_size, shuffle=shuffle, num_workers=num_workers)
+
+def _forward_batch(model, batch):
+    if len(batch) == 3:
+        batch_X, lengths, batch_y = batch
+        return model(batch_X, lengths), batch_y
+    batch_X, batch_y = batch
+    return model(batch_X), batch_y
+
 def train_lstm_model(X_train, y_train, input_dim, hidden_dim=64, num_layers=2, output_dim=1, 
-                     batch_size=32, num_epochs=100, learning_rate=0.001):
+                     batch_size=32, num_epochs=100, learning_rate=0.001,
+                     X_val=None, y_val=None, patience=None, num_workers=0):
+    """
+    Train an LSTMModel. If validation data and patience are given, training stops once
+    the validation loss has not improved for `patience` epochs and the best weights
+    are restored.
+    X_train/X_val may be feature arrays (each row is a length-one sequence) or a
+    TransactionSequenceDataset of per-sender windows, in which case y is ignored and
+    batches are packed to each window's real length.
+    """
     model = LSTMModel(input_dim, hidden_dim, num_layers, output_dim)
     criterion = nn.BCELoss()
     optimizer = optim.Adam(model.parameters(), lr=learning_rate)
     
-    train_data = TensorDataset(torch.FloatTensor(X_train), torch.FloatTensor(y_train))
-    train_loader = DataLoader(train_data, batch_size=batch_size, shuffle=True)
+    train_loader = _make_loader(X_train, y_train, batch_size, shuffle=True, num_workers=num_workers)
+
+    early_stopping = X_val is not None and patience is not None
+    if early_stopping:
+        val_loader = _make_loader(X_val, y_val, batch_size, shuffle=False, num_workers=num_workers)
+        best_loss, best_state, epochs_without_improvement = float('inf'), None, 0
     
     for epoch in range(num_epochs):
         model.train()
-        for batch_X, batch_y in train_loader:
+        for batch in train_loader:
             optimizer.zero_grad()
-            outputs = model(batch_X)
-            loss = criterion(outputs.squeeze(), batch_y)
+            outputs, batch_y = _forward_batch(model, batch)
+            loss = criterion(outputs.view(-1), batch_y)
             loss.backward()
             optimizer.step()
         
         if (epoch + 1) % 10 == 0:
             print(f'Epoch [{epoch+1}/{num_epochs}], Loss: {loss.item():.4f}')
+
+        if early_stopping:
+            model.eval()
+            total_loss, total_count = 0.0, 0
+            with torch.no_grad():
+                for batch in val_loader:
+                    outputs, batch_y = _forward_batch(model, batch)
+                    total_loss += criterion(outputs.view(-1), batch_y).item() * len(batch_y)
+                    total_count += len(batch_y)
+            val_loss = total_loss / max(total_count, 1)
+            if val_loss < best_loss:
+                best_loss, best_state, epochs_without_improvement = val_loss, copy.deepcopy(model.state_dict()), 0
+            else:
+                epochs_without_improvement += 1
+                if epochs_without_improvement >= patience:
+                    print(f'Early stopping at epoch {epoch+1}, best validation loss: {best_loss:.4f}')
+                    break
+
+    if early_stopping and best_state is not None:
+        model.load_state_dict(best_state)
     
     return model
 
-def predict_lstm(model, X_test):
+def predict_lstm(model, X_test, batch_size=1024):
     model.eval()
     with torch.no_grad():
-        predictions = model(torch.FloatTensor(X_test))
-    return predictions.numpy()
\ No newline at end of file
+        if isinstance(X_test, Dataset):
+            loader = DataLoader(X_test, batch_size=batch_size, shuffle=False, collate_fn=collate_sequences)
+            predictions = torch.cat([model(batch_X, lengths) for batch_X, lengths, _ in loader])
+        else:
+            predictions = model(_as_sequences(X_test))
+    return predictions.numpy()
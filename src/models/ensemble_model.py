@@ -1,46 +1,172 @@
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
+from sklearn.utils import gen_even_slices
+from joblib import effective_n_jobs
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+import time
 import numpy as np
 
 class EnsembleModel:
-    def __init__(self):
-        self.rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.gb_model = GradientBoostingClassifier(n_estimators=100, random_state=42)
+    MODEL_NAMES = ('rf', 'gb', 'lr')
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, combination: str = 'weighted',
+                 min_weight: float = 0.0, n_jobs: int = -1, gb_estimator: str = 'gb',
+                 early_stopping: bool = False, parallel_fit: bool = True):
+        """
+        :param weights: Weight per member ('rf', 'gb', 'lr'); equal weights by default.
+        :param combination: 'weighted' averages member probabilities with the weights,
+            'stacked' feeds them to a logistic regression fitted on the validation split.
+        :param min_weight: Members with weight at or below this are not evaluated in
+            weighted mode.
+        :param n_jobs: Parallel jobs for fitting the random forest. Scoring uses one job
+            unless score() is given n_jobs, since serving already runs many requests
+            concurrently.
+        :param gb_estimator: 'gb' for GradientBoostingClassifier or 'hist' for the much
+            faster HistGradientBoostingClassifier.
+        :param early_stopping: Stop boosting once a held-out 10% of the training data
+            stops improving.
+        :param parallel_fit: Fit the three members concurrently instead of one by one.
+        """
+        if combination not in ('weighted', 'stacked'):
+            raise ValueError(f"Unknown combination: {combination}")
+        self.rf_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
+        if gb_estimator == 'hist':
+            self.gb_model = HistGradientBoostingClassifier(
+                max_iter=100, random_state=42, early_stopping=early_stopping,
+                validation_fraction=0.1, n_iter_no_change=10
+            )
+        elif gb_estimator == 'gb':
+            self.gb_model = GradientBoostingClassifier(
+                n_estimators=100, random_state=42,
+                validation_fraction=0.1, n_iter_no_change=10 if early_stopping else None
+            )
+        else:
+            raise ValueError(f"Unknown gradient boosting estimator: {gb_estimator}")
         self.lr_model = LogisticRegression(random_state=42)
-    
-    def train(self, X, y):
-        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        self.rf_model.fit(X_train, y_train)
-        self.gb_model.fit(X_train, y_train)
-        self.lr_model.fit(X_train, y_train)
+        self.n_jobs = n_jobs
+        self.parallel_fit = parallel_fit
+        self.fit_times = {}
+        self.weights = dict(weights) if weights is not None else {name: 1.0 for name in self.MODEL_NAMES}
+        self.combination = combination
+        self.min_weight = min_weight
+        self.stacker = None
+        self.threshold = 0.5
+
+    def __setstate__(self, state):
+        # Models pickled before weighted/stacked combination existed
+        self.__dict__.update(state)
+        self.__dict__.setdefault('weights', {name: 1.0 for name in self.MODEL_NAMES})
+        self.__dict__.setdefault('combination', 'weighted')
+        self.__dict__.setdefault('min_weight', 0.0)
+        self.__dict__.setdefault('stacker', None)
+        self.__dict__.setdefault('threshold', 0.5)
+        self.__dict__.setdefault('parallel_fit', False)
+        self.__dict__.setdefault('fit_times', {})
+        self.__dict__.setdefault('n_jobs', self.rf_model.n_jobs)
+        self.rf_model.set_params(n_jobs=1)
+
+    @property
+    def models(self) -> Dict[str, object]:
+        return {'rf': self.rf_model, 'gb': self.gb_model, 'lr': self.lr_model}
+
+    def _active_models(self) -> Dict[str, object]:
+        if self.combination == 'stacked':
+            return self.models
+        return {name: model for name, model in self.models.items()
+                if self.weights.get(name, 0.0) > self.min_weight}
+
+    def _fit_member(self, name: str, X, y) -> float:
+        start = time.perf_counter()
+        self.models[name].fit(X, y)
+        return time.perf_counter() - start
+
+    def train(self, X, y, X_val=None, y_val=None):
+        """
+        Fit all members. Without an explicit validation set, 20% of X is held out.
+        """
+        if X_val is None or y_val is None:
+            X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+        else:
+            X_train, y_train = X, y
+
+        self.rf_model.set_params(n_jobs=self.n_jobs)
+        # sklearn releases the GIL inside tree building, so threads overlap the fits
+        if self.parallel_fit:
+            with ThreadPoolExecutor(max_workers=len(self.MODEL_NAMES)) as executor:
+                futures = {name: executor.submit(self._fit_member, name, X_train, y_train)
+                           for name in self.MODEL_NAMES}
+                self.fit_times = {name: future.result() for name, future in futures.items()}
+        else:
+            self.fit_times = {name: self._fit_member(name, X_train, y_train) for name in self.MODEL_NAMES}
+        print("Fit times (s): " + ", ".join(f"{name}={seconds:.2f}" for name, seconds in self.fit_times.items()))
+
+        # Score the validation split once per model and reuse it for reports and stacking
+        val_proba = {name: model.predict_proba(X_val)[:, 1] for name, model in self.models.items()}
         
         print("Random Forest Performance:")
-        print(classification_report(y_val, self.rf_model.predict(X_val)))
+        print(classification_report(y_val, (val_proba['rf'] > 0.5).astype(int)))
         
         print("\nGradient Boosting Performance:")
-        print(classification_report(y_val, self.gb_model.predict(X_val)))
+        print(classification_report(y_val, (val_proba['gb'] > 0.5).astype(int)))
         
         print("\nLogistic Regression Performance:")
-        print(classification_report(y_val, self.lr_model.predict(X_val)))
-    
+        print(classification_report(y_val, (val_proba['lr'] > 0.5).astype(int)))
+
+        if self.combination == 'stacked':
+            self.stacker = LogisticRegression(random_state=42)
+            self.stacker.fit(np.column_stack([val_proba[name] for name in self.MODEL_NAMES]), y_val)
+
+        # A joblib pool per predict_proba call only adds overhead to small serving batches
+        self.rf_model.set_params(n_jobs=1)
+
+    def _contributions(self, X) -> Dict[str, np.ndarray]:
+        return {name: model.predict_proba(X)[:, 1] for name, model in self._active_models().items()}
+
+    def score(self, X, n_jobs: Optional[int] = None) -> Dict[str, object]:
+        """
+        Evaluate every active member once and derive everything callers need from it.
+        :param n_jobs: Score row chunks on this many threads, for large batches. By
+            default a single thread is used, which suits per-request scoring.
+        :return: A dict with 'probabilities' (ensemble fraud probability), 'labels'
+            (probabilities above the threshold) and 'contributions' (each member's
+            fraud probability, keyed by member name).
+        """
+        n_jobs = 1 if n_jobs is None else effective_n_jobs(n_jobs)
+        if n_jobs > 1 and len(X) > n_jobs:
+            # Members are shared with concurrent requests, so chunk the rows rather
+            # than changing the forest's own n_jobs
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                parts = list(executor.map(lambda rows: self._contributions(X[rows]),
+                                          gen_even_slices(len(X), n_jobs)))
+            contributions = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        else:
+            contributions = self._contributions(X)
+        if not contributions:
+            raise ValueError("No ensemble members above min_weight")
+
+        if self.combination == 'stacked':
+            if self.stacker is None:
+                raise ValueError("Stacked combination requires a trained model")
+            stacked = np.column_stack([contributions[name] for name in self.MODEL_NAMES])
+            probabilities = self.stacker.predict_proba(stacked)[:, 1]
+        else:
+            total = sum(self.weights[name] * proba for name, proba in contributions.items())
+            probabilities = total / sum(self.weights[name] for name in contributions)
+
+        return {
+            'probabilities': probabilities,
+            'labels': (probabilities > self.threshold).astype(int),
+            'contributions': contributions
+        }
+
     def predict(self, X):
-        rf_pred = self.rf_model.predict_proba(X)[:, 1]
-        gb_pred = self.gb_model.predict_proba(X)[:, 1]
-        lr_pred = self.lr_model.predict_proba(X)[:, 1]
-        
-        # Simple averaging of probabilities
-        ensemble_pred = (rf_pred + gb_pred + lr_pred) / 3
-        return (ensemble_pred > 0.5).astype(int)
+        return self.score(X)['labels']
     
     def predict_proba(self, X):
-        rf_pred = self.rf_model.predict_proba(X)[:, 1]
-        gb_pred = self.gb_model.predict_proba(X)[:, 1]
-        lr_pred = self.lr_model.predict_proba(X)[:, 1]
-        
-        return (rf_pred + gb_pred + lr_pred) / 3
+        return self.score(X)['probabilities']
 
 if __name__ == "__main__":
     # Example usage
@@ -52,12 +178,11 @@ if __name__ == "__main__":
     ensemble = EnsembleModel()
     ensemble.train(X, y)
     
-    # Make predictions
+    # Make predictions and probabilities from a single pass over the members
     test_sample = X[:10]
-    predictions = ensemble.predict(test_sample)
-    probabilities = ensemble.predict_proba(test_sample)
+    scores = ensemble.score(test_sample)
     
     print("\nEnsemble Predictions:")
-    print(predictions)
+    print(scores['labels'])
     print("\nEnsemble Probabilities:")
-    print(probabilities)
\ No newline at end of file
+    print(scores['probabilities'])
@@ -1,58 +1,337 @@
-import pandas as pd
+import importlib
 import numpy as np
-from typing import List
+import pandas as pd
+import scipy.sparse as sp
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
-from torch_geometric.data import DataLoader
-
-class TemporalFeatureExtractor:
-    def __init__(self, transaction_data: pd.DataFrame):
-        self.transaction_data = transaction_data
-        self.transaction_data['timestamp'] = pd.to_datetime(self.transaction_data['timestamp'])
-
-    def extract_time_based_features(self) -> pd.DataFrame:
-        self.transaction_data['hour'] = self.transaction_data['timestamp'].dt.hour
-        self.transaction_data['day_of_week'] = self.transaction_data['timestamp'].dt.dayofweek
-        self.transaction_data['is_weekend'] = self.transaction_data['day_of_week'].isin([5, 6]).astype(int)
-        return self.transaction_data
-
-    def calculate_rolling_statistics(self, column: str, windows: List[int]) -> pd.DataFrame:
-        for window in windows:
-            self.transaction_data[f'{column}_rolling_mean_{window}'] = self.transaction_data.groupby('from')[column].rolling(window=window).mean().reset_index(0, drop=True)
-            self.transaction_data[f'{column}_rolling_std_{window}'] = self.transaction_data.groupby('from')[column].rolling(window=window).std().reset_index(0, drop=True)
-        return self.transaction_data
-
-    def calculate_time_since_last_transaction(self) -> pd.DataFrame:
-        self.transaction_data['time_since_last_tx'] = self.transaction_data.groupby('from')['timestamp'].diff().dt.total_seconds()
-        return self.transaction_data
-    
-    def train_gnn(model: nn.Module, train_loader: DataLoader, epochs: int = 10, learning_rate: float = 0.001):
-        optimizer = optim.Adam(model.parameters(), lr=learning_rate)
-        criterion = nn.CrossEntropyLoss()
-
-        for epoch in range(epochs):
-            model.train()
-            total_loss = 0
-            for data in train_loader:
-                optimizer.zero_grad()
-                out = model(data.x, data.edge_index)
-                loss = criterion(out, data.y)
-                loss.backward()
-                optimizer.step()
-                total_loss += loss.item()
-
-            print(f"Epoch {epoch+1}/{epochs}, Loss: {total_loss:.4f}")
-        return model
+from typing import Optional, Sequence, Tuple
+from torch_geometric.data import Data
+from torch_geometric.loader import NeighborLoader
+from torch_geometric.nn import SAGEConv
+from src.features.transaction_graph import TransactionGraph
+
+
+class GraphContext:
+    """
+    The training graph kept for online scoring: normalized node features, an undirected
+    CSR adjacency and the address index, plus the normalization used for unseen addresses.
+    """
+
+    def __init__(self, x: np.ndarray, indptr: np.ndarray, indices: np.ndarray, addresses: np.ndarray,
+                 feature_mean: np.ndarray, feature_std: np.ndarray):
+        self.x = x
+        self.indptr = indptr
+        self.indices = indices
+        self.addresses = addresses
+        self.address_index = pd.Index(addresses)
+        self.feature_mean = feature_mean
+        self.feature_std = feature_std
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.addresses)
+
+    def neighbors(self, nodes: np.ndarray) -> np.ndarray:
+        """All neighbor ids of `nodes`, gathered from CSR ranges without a Python loop."""
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        counts = ends - starts
+        if counts.sum() == 0:
+            return np.empty(0, dtype=self.indices.dtype)
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.indices[offsets + np.arange(counts.sum())]
+
+    def sample_neighbors(self, nodes: np.ndarray, limit: Optional[int],
+                         rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (node, neighbor) pairs with at most `limit` neighbors per node, drawn without
+        replacement; all neighbors if limit is None. Only nodes above the limit are
+        sampled, so the cost is bounded by len(nodes) * limit, not by hub degrees.
+        """
+        counts = self.indptr[nodes + 1] - self.indptr[nodes]
+        full = counts <= limit if limit is not None else np.ones(len(nodes), dtype=bool)
+        src = [np.repeat(nodes[full], counts[full])]
+        dst = [self.neighbors(nodes[full])]
+        for node, start, count in zip(nodes[~full], self.indptr[nodes[~full]], counts[~full]):
+            src.append(np.full(limit, node, dtype=nodes.dtype))
+            dst.append(self.indices[start + rng.choice(count, limit, replace=False)])
+        return np.concatenate(src), np.concatenate(dst)
+
+    def k_hop_subgraph(self, seeds: np.ndarray, num_hops: int, max_neighbors: Optional[Sequence[int]] = None,
+                       rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param max_neighbors: Neighbors sampled per node at each hop, as in NeighborLoader.
+            Edges are then the sampled ones only. None expands every neighbor and keeps
+            the whole induced subgraph, which a single hub can make as large as the graph.
+        :return: (sorted node ids within num_hops of the seeds, edge_index relabelled to
+            positions in that node array)
+        """
+        if max_neighbors is not None:
+            return self._sampled_subgraph(seeds, num_hops, max_neighbors, rng or np.random.default_rng(0))
+
+        nodes = np.unique(seeds)
+        frontier = nodes
+        for _ in range(num_hops):
+            reached = np.unique(self.neighbors(frontier))
+            frontier = np.setdiff1d(reached, nodes, assume_unique=True)
+            if len(frontier) == 0:
+                break
+            nodes = np.union1d(nodes, frontier)
+
+        counts = self.indptr[nodes + 1] - self.indptr[nodes]
+        src = np.repeat(np.arange(len(nodes)), counts)
+        dst_ids = self.neighbors(nodes)
+        dst = np.searchsorted(nodes, dst_ids)
+        inside = (dst < len(nodes)) & (nodes[np.minimum(dst, len(nodes) - 1)] == dst_ids)
+        return nodes, np.vstack([src[inside], dst[inside]])
+
+    def _sampled_subgraph(self, seeds: np.ndarray, num_hops: int, max_neighbors: Sequence[int],
+                          rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        nodes = np.unique(seeds)
+        frontier = nodes
+        sources, targets = [], []
+        for hop in range(num_hops):
+            if len(frontier) == 0:
+                break
+            src, dst = self.sample_neighbors(frontier, max_neighbors[min(hop, len(max_neighbors) - 1)], rng)
+            sources.append(src)
+            targets.append(dst)
+            frontier = np.setdiff1d(np.unique(dst), nodes, assume_unique=True)
+            nodes = np.union1d(nodes, frontier)
+
+        # Sampled edges carry messages both ways, like the stored undirected adjacency
+        src = np.concatenate(sources + [np.empty(0, dtype=nodes.dtype)])
+        dst = np.concatenate(targets + [np.empty(0, dtype=nodes.dtype)])
+        pairs = np.unique(np.vstack([np.concatenate([src, dst]), np.concatenate([dst, src])]), axis=1)
+        return nodes, np.searchsorted(nodes, pairs)
+
+
+def build_graph_data(transaction_data: pd.DataFrame, node_features: Optional[pd.DataFrame] = None,
+                     label_col: str = 'is_fraud', source_col: str = 'from', target_col: str = 'to',
+                     amount_col: str = 'amount') -> Tuple[Data, GraphContext]:
+    """
+    Convert transactions to a PyG graph with one node per address.
+    Node features are log-scaled in/out degree, transaction count and amount, followed by
+    any columns of `node_features` (indexed by address, e.g. GraphFeatureExtractor or
+    BehavioralFeatureExtractor output), standardized. An address is labelled fraudulent
+    if it sent any transaction flagged in `label_col`.
+    :return: (Data with x, edge_index and y, GraphContext for online scoring)
+    """
+    graph = TransactionGraph.from_transactions(transaction_data, source_col, target_col, amount_col)
+    n = graph.num_nodes
+    src = graph.edges['src'].to_numpy()
+    dst = graph.edges['dst'].to_numpy()
+    amount = graph.edges['total_amount'].to_numpy()
+    count = graph.edges['tx_count'].to_numpy()
+
+    features = np.column_stack([
+        np.bincount(src, minlength=n), np.bincount(dst, minlength=n),
+        np.bincount(src, weights=count, minlength=n), np.bincount(dst, weights=count, minlength=n),
+        np.bincount(src, weights=amount, minlength=n), np.bincount(dst, weights=amount, minlength=n)
+    ])
+    features = np.log1p(np.maximum(features, 0))
+    if node_features is not None:
+        extra = node_features.reindex(graph.addresses).fillna(0).to_numpy(dtype=np.float64)
+        features = np.hstack([features, extra])
+
+    feature_mean = features.mean(axis=0)
+    feature_std = features.std(axis=0)
+    feature_std[feature_std == 0] = 1.0
+    x = ((features - feature_mean) / feature_std).astype(np.float32)
+
+    # Undirected structure; each neighbor pair is stored once per direction
+    rows = np.concatenate([src, dst]).astype(np.int64)
+    cols = np.concatenate([dst, src]).astype(np.int64)
+    adjacency = sp.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    adjacency.sort_indices()
+    indptr, indices = adjacency.indptr.astype(np.int64), adjacency.indices.astype(np.int64)
+    edge_index = np.vstack([np.repeat(np.arange(n), np.diff(indptr)), indices])
+
+    data = Data(x=torch.from_numpy(x), edge_index=torch.from_numpy(edge_index))
+    if label_col in transaction_data.columns:
+        y = np.zeros(n, dtype=np.int64)
+        np.maximum.at(y, graph.node_ids(transaction_data[source_col]),
+                      transaction_data[label_col].to_numpy(dtype=np.int64))
+        data.y = torch.from_numpy(y)
+
+    context = GraphContext(x, indptr, indices, graph.addresses, feature_mean, feature_std)
+    return data, context
+
+
+class GraphNeuralNetwork(nn.Module):
+    """
+    GraphSAGE node classifier. Trained on neighbor-sampled mini-batches, and at serving
+    time scores new transactions from the k-hop neighborhood of their addresses only.
+    """
+
+    def __init__(self, num_node_features: int, hidden_channels: int = 64, num_classes: int = 2,
+                 num_layers: int = 2, dropout: float = 0.5, num_neighbors: Optional[Sequence[int]] = (15, 10)):
+        """
+        :param num_neighbors: Neighbors sampled per node at each hop when scoring new
+            transactions, normally the training fan-out; None uses full neighborhoods.
+        """
+        super(GraphNeuralNetwork, self).__init__()
+        num_neighbors = None if num_neighbors is None else [int(k) for k in num_neighbors]
+        self.hyperparameters = {'num_node_features': num_node_features, 'hidden_channels': hidden_channels,
+                                'num_classes': num_classes, 'num_layers': num_layers, 'dropout': dropout,
+                                'num_neighbors': num_neighbors}
+        self.num_layers = num_layers
+        self.dropout = dropout
+        self.num_neighbors = num_neighbors
+        channels = [num_node_features] + [hidden_channels] * (num_layers - 1) + [num_classes]
+        self.convs = nn.ModuleList(SAGEConv(channels[i], channels[i + 1]) for i in range(num_layers))
+        self.context: Optional[GraphContext] = None
+
+    def forward(self, x, edge_index):
+        for i, conv in enumerate(self.convs):
+            x = conv(x, edge_index)
+            if i < self.num_layers - 1:
+                x = F.relu(x)
+                x = F.dropout(x, p=self.dropout, training=self.training)
+        return x
+
+    def attach_graph(self, context: GraphContext) -> 'GraphNeuralNetwork':
+        self.context = context
+        return self
+
+    def predict_transactions(self, senders: Sequence[str], receivers: Sequence[str]) -> np.ndarray:
+        """
+        Fraud probability of new transactions, scored on the num_layers-hop subgraph
+        around their addresses, sampled with num_neighbors per hop, with the new edges
+        added. Addresses not in the training
+        graph enter as nodes with zero raw activity. A missing address (None/NaN) enters
+        the same way, as its own node, so it is never shared between transactions.
+        :return: Per transaction, the higher of the sender and receiver probabilities.
+        """
+        context = self.context
+        if context is None:
+            raise ValueError("No graph attached; train with train_gnn or load a saved model")
+
+        endpoints = np.concatenate([np.asarray(senders, dtype=object), np.asarray(receivers, dtype=object)])
+        missing = pd.isna(endpoints)
+        ids = np.full(len(endpoints), -1, dtype=np.int64)
+        ids[~missing] = context.address_index.get_indexer(endpoints[~missing])
+        known = ids >= 0
+        unknown = ~known & ~missing
+        # A fixed seed keeps repeated requests for the same transactions reproducible
+        nodes, edge_index = context.k_hop_subgraph(ids[known], self.num_layers, self.num_neighbors,
+                                                   np.random.default_rng(0))
+
+        # Unseen addresses, then missing ones, are appended after the subgraph nodes
+        unknown_codes, unknown_addresses = pd.factorize(endpoints[unknown])
+        n_missing = int(missing.sum())
+        positions = np.empty(len(endpoints), dtype=np.int64)
+        positions[known] = np.searchsorted(nodes, ids[known])
+        positions[unknown] = len(nodes) + unknown_codes
+        positions[missing] = len(nodes) + len(unknown_addresses) + np.arange(n_missing)
+        unseen_x = np.tile(((0 - context.feature_mean) / context.feature_std).astype(np.float32),
+                           (len(unknown_addresses) + n_missing, 1))
+        x = np.vstack([context.x[nodes], unseen_x])
+
+        n_tx = len(senders)
+        new_edges = np.vstack([np.concatenate([positions[:n_tx], positions[n_tx:]]),
+                               np.concatenate([positions[n_tx:], positions[:n_tx]])])
+        edge_index = np.hstack([edge_index, new_edges])
+
+        self.eval()
+        with torch.no_grad():
+            logits = self(torch.from_numpy(x), torch.from_numpy(edge_index))
+            probabilities = F.softmax(logits, dim=1)[:, 1].numpy()
+        return np.maximum(probabilities[positions[:n_tx]], probabilities[positions[n_tx:]])
+
+    def save(self, path: str):
+        # Only tensors and plain containers, so torch.load works with weights_only
+        context = self.context
+        torch.save({
+            'hyperparameters': self.hyperparameters,
+            'state_dict': self.state_dict(),
+            'context': None if context is None else {
+                'x': torch.from_numpy(context.x), 'indptr': torch.from_numpy(context.indptr),
+                'indices': torch.from_numpy(context.indices),
+                'addresses': np.asarray(context.addresses).tolist(),
+                'feature_mean': torch.from_numpy(context.feature_mean),
+                'feature_std': torch.from_numpy(context.feature_std)}
+        }, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'GraphNeuralNetwork':
+        checkpoint = torch.load(path, map_location='cpu')
+        model = cls(**checkpoint['hyperparameters'])
+        model.load_state_dict(checkpoint['state_dict'])
+        if checkpoint['context'] is not None:
+            context = {name: value.numpy() if torch.is_tensor(value) else np.asarray(value, dtype=object)
+                       for name, value in checkpoint['context'].items()}
+            model.attach_graph(GraphContext(**context))
+        return model.eval()
+
+
+def _has_neighbor_sampler() -> bool:
+    """NeighborLoader samples through pyg-lib or torch-sparse; PyG has no sampler of its own."""
+    for module in ('pyg_lib', 'torch_sparse'):
+        try:
+            importlib.import_module(module)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def train_gnn(model: GraphNeuralNetwork, data: Data, epochs: int = 10, batch_size: int = 1024,
+              num_neighbors: Sequence[int] = (15, 10), learning_rate: float = 0.005,
+              train_nodes: Optional[torch.Tensor] = None, num_workers: int = 0) -> GraphNeuralNetwork:
+    """
+    Train on mini-batches of seed nodes, each with a sampled neighborhood of at most
+    num_neighbors[i] neighbors per node at hop i, so memory depends on the batch and
+    fan-out rather than on the size of the graph. Without a sampler backend installed
+    (pyg-lib or torch-sparse), falls back to full-batch training on the whole graph.
+    :param train_nodes: Seed node ids or boolean mask; all nodes by default.
+    """
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    criterion = nn.CrossEntropyLoss()
+    if not _has_neighbor_sampler():
+        print("Neither pyg-lib nor torch-sparse is installed; training full-batch")
+        return _train_full_batch(model, data, epochs, optimizer, criterion, train_nodes)
+
+    train_loader = NeighborLoader(data, num_neighbors=list(num_neighbors), batch_size=batch_size,
+                                  input_nodes=train_nodes, shuffle=True, num_workers=num_workers)
+
+    for epoch in range(epochs):
+        model.train()
+        total_loss = 0
+        for batch in train_loader:
+            optimizer.zero_grad()
+            out = model(batch.x, batch.edge_index)
+            # Only the seed nodes, which come first, have their full sampled neighborhood
+            loss = criterion(out[:batch.batch_size], batch.y[:batch.batch_size])
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item()
+
+        print(f"Epoch {epoch+1}/{epochs}, Loss: {total_loss:.4f}")
+    return model
+
+
+def _train_full_batch(model: GraphNeuralNetwork, data: Data, epochs: int, optimizer, criterion,
+                      train_nodes: Optional[torch.Tensor]) -> GraphNeuralNetwork:
+    seeds = slice(None) if train_nodes is None else train_nodes
+    for epoch in range(epochs):
+        model.train()
+        optimizer.zero_grad()
+        out = model(data.x, data.edge_index)
+        loss = criterion(out[seeds], data.y[seeds])
+        loss.backward()
+        optimizer.step()
+        print(f"Epoch {epoch+1}/{epochs}, Loss: {loss.item():.4f}")
+    return model
+
 
 if __name__ == "__main__":
-    # Load preprocessed transaction data
-    transaction_data = pd.read_csv("data/processed/preprocessed_blockchain_data.csv")
-    
-    extractor = TemporalFeatureExtractor(transaction_data)
-    transaction_data = extractor.extract_time_based_features()
-    transaction_data = extractor.calculate_rolling_statistics('amount', [10, 50, 100])
-    transaction_data = extractor.calculate_time_since_last_transaction()
-    
-    # Save extracted features
-    transaction_data.to_csv("data/processed/temporal_features.csv", index=False)
\ No newline at end of file
+    from src.data.storage import read_table
+
+    # Train on preprocessed transactions and save the model with its graph for serving
+    transaction_data = read_table("data/processed/preprocessed_blockchain_data.parquet")
+    data, context = build_graph_data(transaction_data)
+    model = GraphNeuralNetwork(data.num_node_features)
+    train_gnn(model, data)
+    model.attach_graph(context).save("models/gnn_model.pt")
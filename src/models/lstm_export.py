@@ -0,0 +1,114 @@
+import json
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Dict, Optional, Sequence
+
+METADATA_FILE = 'metadata.json'
+
+class ExportedLSTM:
+    """
+    A TorchScript LSTMModel loaded for CPU inference. It exposes the same
+    `__call__(x)`, `step(x, state)`, `num_layers` and `hidden_dim` as the eager model,
+    so it can be used with predict_lstm (unpadded input) and IncrementalLSTMScorer.
+    """
+
+    def __init__(self, module, metadata: Dict):
+        self.module = module
+        self.metadata = metadata
+        self.num_layers = metadata['num_layers']
+        self.hidden_dim = metadata['hidden_dim']
+
+    def eval(self) -> 'ExportedLSTM':
+        self.module.eval()
+        return self
+
+    def __call__(self, x):
+        return self.module(x)
+
+    def step(self, x, state):
+        return self.module.step(x, state)
+
+
+def export_lstm(model, path: str, quantize: bool = False):
+    """
+    Trace `forward` (full-length sequences) and `step` of an LSTMModel to TorchScript.
+    :param quantize: Apply dynamic int8 quantization to the LSTM and Linear layers first.
+    """
+    model = model.eval()
+    input_dim = model.lstm.input_size
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+    sequence = torch.zeros(1, 1, input_dim)
+    state = (torch.zeros(model.num_layers, 1, model.hidden_dim),
+             torch.zeros(model.num_layers, 1, model.hidden_dim))
+    with torch.no_grad():
+        traced = torch.jit.trace_module(model, {'forward': (sequence,),
+                                                'step': (sequence[:, 0], state)})
+
+    metadata = {'input_dim': input_dim, 'hidden_dim': model.hidden_dim,
+                'num_layers': model.num_layers, 'quantized': quantize}
+    torch.jit.save(traced, path, _extra_files={METADATA_FILE: json.dumps(metadata)})
+
+
+def load_lstm(path: str, num_threads: Optional[int] = None) -> ExportedLSTM:
+    """
+    :param num_threads: Intra-op threads for this process. Pin this low (e.g. 1) when
+        several workers share the machine, so they do not oversubscribe the cores.
+    """
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    extra_files = {METADATA_FILE: ''}
+    module = torch.jit.load(path, map_location='cpu', _extra_files=extra_files)
+    return ExportedLSTM(module, json.loads(extra_files[METADATA_FILE])).eval()
+
+
+def benchmark_lstm(model, exported, X: np.ndarray, batch_sizes: Sequence[int] = (1, 64, 1024),
+                   repeats: int = 50) -> Dict:
+    """
+    Compare latency and outputs of the eager model and an exported model.
+    :param X: (n_rows, input_dim) or (n_rows, seq_len, input_dim) inputs.
+    :return: Median milliseconds per call for each batch size, plus the maximum absolute
+        difference and the label agreement at 0.5 over all of X.
+    """
+    X = torch.as_tensor(np.asarray(X, dtype=np.float32))
+    if X.dim() == 2:
+        X = X.unsqueeze(1)
+    model.eval()
+
+    def median_ms(fn, batch):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn(batch)
+            times.append((time.perf_counter() - start) * 1000)
+        return float(np.median(times))
+
+    results = {'latency_ms': {}}
+    with torch.no_grad():
+        for batch_size in batch_sizes:
+            batch = X[:batch_size]
+            results['latency_ms'][batch_size] = {'eager': median_ms(model, batch),
+                                                 'exported': median_ms(exported, batch)}
+        eager_output = model(X).numpy()
+        exported_output = exported(X).numpy()
+    results['max_abs_diff'] = float(np.abs(eager_output - exported_output).max())
+    results['label_agreement'] = float(np.mean((eager_output > 0.5) == (exported_output > 0.5)))
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage
+    import os
+    import tempfile
+    from .deep_learning_model import LSTMModel
+
+    model = LSTMModel(input_dim=20, hidden_dim=64, num_layers=2, output_dim=1)
+    X = np.random.randn(2048, 20).astype(np.float32)
+    directory = tempfile.mkdtemp()
+    for quantize in (False, True):
+        path = os.path.join(directory, f'lstm_{"int8" if quantize else "fp32"}.pt')
+        export_lstm(model, path, quantize=quantize)
+        print(f"quantize={quantize}:", benchmark_lstm(model, load_lstm(path, num_threads=1), X))
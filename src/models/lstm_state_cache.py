@@ -0,0 +1,119 @@
+import hashlib
+import os
+import numpy as np
+import torch
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+class LSTMStateCache:
+    """
+    Per-address LSTM (h, c) states with LRU eviction. Each state is kept as one
+    float32 array of shape (2, num_layers, hidden_dim). When `spill_dir` is set,
+    evicted states are written there and read back on the next access, so inactive
+    addresses keep their history without holding memory.
+    """
+
+    def __init__(self, capacity: int = 100_000, spill_dir: Optional[str] = None):
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self._states = OrderedDict()
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._states or (self.spill_dir is not None and os.path.exists(self._spill_path(address)))
+
+    def _spill_path(self, address: str) -> str:
+        digest = hashlib.sha1(str(address).encode()).hexdigest()
+        return os.path.join(self.spill_dir, f'{digest}.npy')
+
+    def get(self, address: str) -> Optional[np.ndarray]:
+        state = self._states.get(address)
+        if state is not None:
+            self._states.move_to_end(address)
+            return state
+        if self.spill_dir is not None:
+            path = self._spill_path(address)
+            if os.path.exists(path):
+                state = np.load(path)
+                self.put(address, state)
+                return state
+        return None
+
+    def put(self, address: str, state: np.ndarray):
+        self._states[address] = state
+        self._states.move_to_end(address)
+        while len(self._states) > self.capacity:
+            evicted, evicted_state = self._states.popitem(last=False)
+            if self.spill_dir is not None:
+                np.save(self._spill_path(evicted), evicted_state)
+
+    def reset(self, address: str):
+        self._states.pop(address, None)
+        if self.spill_dir is not None and os.path.exists(self._spill_path(address)):
+            os.remove(self._spill_path(address))
+
+    def flush(self):
+        """Write every in-memory state to the spill directory, e.g. before shutdown."""
+        if self.spill_dir is None:
+            raise ValueError("flush requires a spill_dir")
+        for address, state in self._states.items():
+            np.save(self._spill_path(address), state)
+
+
+class IncrementalLSTMScorer:
+    """
+    Scores each new transaction of an address with one LSTM cell step from that
+    address's cached state, instead of replaying its history through
+    LSTMModel.forward. The cost per transaction is constant however active the
+    address is. The state carries the address's full history seen by this scorer,
+    not a fixed-length window.
+    """
+
+    def __init__(self, model, capacity: int = 100_000, spill_dir: Optional[str] = None):
+        self.model = model.eval()
+        self.cache = LSTMStateCache(capacity, spill_dir)
+        self._zero_state = np.zeros((2, model.num_layers, model.hidden_dim), dtype=np.float32)
+
+    def score(self, address: str, features: np.ndarray) -> float:
+        return float(self.score_batch([address], np.asarray(features, dtype=np.float32).reshape(1, -1))[0])
+
+    def score_batch(self, addresses: Sequence[str], features: np.ndarray) -> np.ndarray:
+        """
+        Advance each address by its transaction in `features`, in order.
+        An address appearing several times is stepped once per occurrence; distinct
+        addresses are stepped together in one batched cell update.
+        :return: Fraud probability per transaction.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        probabilities = np.empty(len(addresses), dtype=np.float32)
+
+        # Round r holds the r-th occurrence of each address, so rounds run in order
+        occurrence = {}
+        rounds: List[List[int]] = []
+        for i, address in enumerate(addresses):
+            r = occurrence.get(address, 0)
+            occurrence[address] = r + 1
+            if r == len(rounds):
+                rounds.append([])
+            rounds[r].append(i)
+
+        with torch.no_grad():
+            for rows in rounds:
+                states = np.stack([self._state(addresses[i]) for i in rows], axis=2)
+                h = torch.from_numpy(states[0])
+                c = torch.from_numpy(states[1])
+                output, (h, c) = self.model.step(torch.from_numpy(features[rows]), (h, c))
+                probabilities[rows] = output[:, 0].numpy()
+
+                new_states = torch.stack((h, c)).numpy()
+                for j, i in enumerate(rows):
+                    self.cache.put(addresses[i], np.ascontiguousarray(new_states[:, :, j]))
+        return probabilities
+
+    def _state(self, address: str) -> np.ndarray:
+        state = self.cache.get(address)
+        return self._zero_state if state is None else state
@@ -1,67 +1,246 @@
+import os
+import time
 import joblib
-from sklearn.model_selection import train_test_split
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from threadpoolctl import threadpool_limits
 from .deep_learning_model import train_lstm_model
+from .lstm_export import export_lstm
+from .sequence_dataset import TransactionSequenceDataset
 from .ensemble_model import EnsembleModel
-from .graph_neural_network import TemporalFeatureExtractor
+from .compiled_ensemble import CompiledEnsemble
+from .dataset_splits import DatasetSplits
+from .graph_neural_network import GraphNeuralNetwork, build_graph_data, train_gnn
+from src.utils.file_utils import atomic_path
+
+
+def _run_training_job(trainer: 'ModelTrainer', name: str, cpu_budget: int, kwargs: Dict):
+    """
+    Train one model inside a worker process, limited to cpu_budget cores.
+    :return: (name, trained model, wall-clock seconds)
+    """
+    import torch
+    torch.set_num_threads(cpu_budget)
+    start = time.perf_counter()
+    with threadpool_limits(limits=cpu_budget):
+        model = getattr(trainer, f'train_{name}')(**kwargs)
+    return name, model, time.perf_counter() - start
 
 
 class ModelTrainer:
-    def __init__(self, data, graph_data=None):
+    def __init__(self, data, graph_data=None, cache_dir: Optional[str] = None,
+                 sequence_window: Optional[int] = None, sender_col: str = 'from',
+                 timestamp_col: str = 'timestamp'):
+        """
+        :param data: DataFrame of features plus the 'is_fraud' label.
+        :param graph_data: Transactions DataFrame ('from', 'to', 'amount', 'is_fraud')
+            to build the GNN's address graph from, if any.
+        :param cache_dir: If set, the train/val/test arrays are stored here and reopened
+            memory-mapped, and worker processes load them from disk instead of
+            receiving a pickled copy of the data.
+        :param sequence_window: If set, the LSTM trains on each sender's last
+            `sequence_window` transactions instead of single rows. `data` must then
+            carry sender_col (and optionally timestamp_col), which are not used as features.
+        """
         self.data = data
         self.graph_data = graph_data
+        self.cache_dir = cache_dir
+        self.sequence_window = sequence_window
+        self.sender_col = sender_col
+        self.timestamp_col = timestamp_col
+        self._splits = None
+        self._data_fingerprint = None
+        self._sequences = None
         self.lstm_model = None
         self.ensemble_model = None
         self.gnn_model = None
+        self.training_times = {}
+
+    def __getstate__(self):
+        # Workers cannot fingerprint the data once it is dropped, so they get it precomputed
+        fingerprint = self.data_fingerprint
+        state = self.__dict__.copy()
+        if self.cache_dir is not None and DatasetSplits.exists(self.cache_dir, fingerprint):
+            # Workers reopen the memory-mapped splits rather than unpickling the data
+            state['data'] = None
+            state['_splits'] = None
+        return state
+
+    @property
+    def data_fingerprint(self) -> Optional[str]:
+        """Fingerprint of `data` as split, used to tell whether cached splits still match it."""
+        if self._data_fingerprint is None and self.data is not None:
+            self._data_fingerprint = DatasetSplits.fingerprint_of(self.data, exclude=self._key_columns)
+        return self._data_fingerprint
+
+    @property
+    def splits(self) -> DatasetSplits:
+        """
+        Train/val/test arrays, built once and shared by every model. Cached splits are
+        reused only if they were built from the same data; otherwise they are rebuilt.
+        """
+        if self._splits is None:
+            if self.cache_dir is not None and DatasetSplits.exists(self.cache_dir, self.data_fingerprint):
+                self._splits = DatasetSplits.load(self.cache_dir)
+            else:
+                splits = DatasetSplits.from_frame(self.data, exclude=self._key_columns)
+                if self.cache_dir is not None:
+                    splits.save(self.cache_dir)
+                    splits = DatasetSplits.load(self.cache_dir)
+                self._splits = splits
+        return self._splits
+
+    @property
+    def _key_columns(self):
+        if self.sequence_window is None or self.data is None:
+            return ()
+        return tuple(col for col in (self.sender_col, self.timestamp_col) if col in self.data.columns)
+
+    @property
+    def sequences(self) -> Dict[str, TransactionSequenceDataset]:
+        """Per-sender windows for the train/val/test rows, sharing one sorted feature array."""
+        if self._sequences is None:
+            splits = self.splits
+            timestamps = self.data[self.timestamp_col] if self.timestamp_col in self.data.columns else None
+            dataset = TransactionSequenceDataset(
+                self.data[splits.feature_names].to_numpy(dtype=np.float32),
+                self.data['is_fraud'].to_numpy(),
+                self.data[self.sender_col].to_numpy(),
+                timestamps,
+                window=self.sequence_window)
+            self._sequences = {'train': dataset.subset(splits.train_index),
+                               'val': dataset.subset(splits.val_index),
+                               'test': dataset.subset(splits.test_index)}
+        return self._sequences
 
     def prepare_data(self):
-        # Assume self.data is a pandas DataFrame
-        X = self.data.drop('is_fraud', axis=1)
-        y = self.data['is_fraud']
-        return train_test_split(X, y, test_size=0.2, random_state=42)
-
-    def train_lstm(self, input_dim, hidden_dim=64, num_layers=2, output_dim=1):
-        X_train, X_test, y_train, y_test = self.prepare_data()
-        self.lstm_model = train_lstm_model(X_train.values, y_train.values, input_dim, 
-                                           hidden_dim, num_layers, output_dim)
+        splits = self.splits
+        return splits.X_train, splits.X_test, splits.y_train, splits.y_test
+
+    def train_lstm(self, input_dim, hidden_dim=64, num_layers=2, output_dim=1, patience=None,
+                   batch_size=32, num_workers=0):
+        splits = self.splits
+        if self.sequence_window is not None:
+            sequences = self.sequences
+            self.lstm_model = train_lstm_model(sequences['train'], None, input_dim,
+                                               hidden_dim, num_layers, output_dim, batch_size=batch_size,
+                                               X_val=sequences['val'], patience=patience,
+                                               num_workers=num_workers)
+            return self.lstm_model
+        self.lstm_model = train_lstm_model(splits.X_train, splits.y_train, input_dim, 
+                                           hidden_dim, num_layers, output_dim, batch_size=batch_size,
+                                           X_val=splits.X_val, y_val=splits.y_val, patience=patience,
+                                           num_workers=num_workers)
         return self.lstm_model
 
-    def train_ensemble(self):
-        X_train, X_test, y_train, y_test = self.prepare_data()
-        self.ensemble_model = EnsembleModel()
-        self.ensemble_model.train(X_train, y_train)
+    def train_ensemble(self, n_jobs=-1, gb_estimator='gb', early_stopping=False):
+        splits = self.splits
+        self.ensemble_model = EnsembleModel(n_jobs=n_jobs, gb_estimator=gb_estimator, early_stopping=early_stopping)
+        self.ensemble_model.train(splits.X_train, splits.y_train, splits.X_val, splits.y_val)
         return self.ensemble_model
 
-    def train_gnn(self, num_node_features, num_classes):
+    def train_gnn(self, hidden_channels=64, num_layers=2, epochs=10, batch_size=1024, num_neighbors=(15, 10)):
         if self.graph_data is None:
             raise ValueError("Graph data is required to train GNN")
-        self.gnn_model = TemporalFeatureExtractor(num_node_features, num_classes)
-        TemporalFeatureExtractor(self.gnn_model, self.graph_data)
+        data, context = build_graph_data(self.graph_data)
+        num_neighbors = tuple(num_neighbors[:num_layers])
+        # Serving samples neighborhoods with the same fan-out the model was trained on
+        self.gnn_model = GraphNeuralNetwork(data.num_node_features, hidden_channels, num_layers=num_layers,
+                                            num_neighbors=num_neighbors)
+        train_gnn(self.gnn_model, data, epochs=epochs, batch_size=batch_size, num_neighbors=num_neighbors)
+        # Keep the graph with the model so the service can score k-hop neighborhoods
+        self.gnn_model.attach_graph(context)
         return self.gnn_model
 
-    def train_all_models(self):
-        print("Training LSTM model...")
-        self.train_lstm(input_dim=self.data.shape[1]-1)  # -1 to exclude the target variable
-        
-        print("Training Ensemble model...")
-        self.train_ensemble()
-        
+    def _training_jobs(self, early_stopping: bool, gb_estimator: str) -> Dict[str, Dict]:
+        n_features = self.splits.n_features
+        jobs = {
+            'lstm': {'input_dim': n_features,
+                     'patience': 10 if early_stopping else None},
+            'ensemble': {'gb_estimator': gb_estimator, 'early_stopping': early_stopping}
+        }
         if self.graph_data is not None:
-            print("Training GNN model...")
-            self.train_gnn(num_node_features=self.data.shape[1]-1, num_classes=2)
+            jobs['gnn'] = {}
+        return jobs
+
+    @staticmethod
+    def _cpu_budgets(jobs: Dict[str, Dict], cpu_budget: Optional[Dict[str, int]], parallel: bool) -> Dict[str, int]:
+        # Concurrent jobs split the machine evenly unless a per-model budget is given
+        total = os.cpu_count() or 1
+        default = max(1, total // len(jobs)) if parallel else total
+        cpu_budget = cpu_budget or {}
+        return {name: cpu_budget.get(name, default) for name in jobs}
+
+    def train_all_models(self, parallel: bool = True, cpu_budget: Optional[Dict[str, int]] = None,
+                         early_stopping: bool = False, gb_estimator: str = 'gb'):
+        """
+        Train the LSTM, the ensemble and (with graph data) the GNN.
+        :param parallel: Train the independent models concurrently in separate processes.
+        :param cpu_budget: Cores per model, e.g. {'lstm': 8, 'ensemble': 20, 'gnn': 4};
+            models not listed get an even share of the machine.
+        :param early_stopping: Stop LSTM epochs and boosting rounds on a validation split.
+        :param gb_estimator: 'gb' or 'hist' (HistGradientBoostingClassifier).
+        """
+        jobs = self._training_jobs(early_stopping, gb_estimator)
+        if self.sequence_window is not None:
+            # Build windows here so workers receive them even when the data is not pickled
+            self.sequences
+            jobs['lstm'].update(batch_size=256)
+        budgets = self._cpu_budgets(jobs, cpu_budget, parallel)
+        jobs['ensemble']['n_jobs'] = budgets['ensemble']
+
+        if parallel:
+            print(f"Training {', '.join(jobs)} in parallel with CPU budgets {budgets}...")
+            with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = [executor.submit(_run_training_job, self, name, budgets[name], kwargs)
+                           for name, kwargs in jobs.items()]
+                results = [future.result() for future in futures]
+        else:
+            results = []
+            for name, kwargs in jobs.items():
+                print(f"Training {name} model...")
+                results.append(_run_training_job(self, name, budgets[name], kwargs))
+
+        for name, model, seconds in results:
+            setattr(self, f'{name}_model', model)
+            self.training_times[name] = seconds
+            print(f"{name} trained in {seconds:.1f}s")
         
         print("All models trained successfully.")
 
-    def save_models(self, path):
-        joblib.dump(self.lstm_model, f"{path}/lstm_model.joblib")
-        joblib.dump(self.ensemble_model, f"{path}/ensemble_model.joblib")
+    def save_models(self, path, quantize_lstm=False):
+        """
+        Write every trained artifact to `path`. Each file is written under a temporary
+        name and renamed into place, so a service hot-reloading (and memory-mapping)
+        these files never reads one that is half written or rewritten in place.
+        """
+        if self.lstm_model is not None:
+            # TorchScript export is what the service loads; no pickled module needed
+            with atomic_path(f"{path}/lstm_model.pt") as lstm_path:
+                export_lstm(self.lstm_model, lstm_path, quantize=quantize_lstm)
+        if self.ensemble_model is not None:
+            with atomic_path(f"{path}/ensemble_model.joblib") as ensemble_path:
+                joblib.dump(self.ensemble_model, ensemble_path)
+            compiled_path = f"{path}/ensemble_compiled.npz"
+            try:
+                compiled = CompiledEnsemble.from_ensemble(self.ensemble_model)
+            except ValueError as e:
+                print(f"Skipping compiled ensemble export: {e}")
+                # The service prefers the compiled file, so an older one would shadow this ensemble
+                if os.path.exists(compiled_path):
+                    os.remove(compiled_path)
+            else:
+                with atomic_path(compiled_path) as temp_path:
+                    compiled.save(temp_path)
         if self.gnn_model:
-            joblib.dump(self.gnn_model, f"{path}/gnn_model.joblib")
+            with atomic_path(f"{path}/gnn_model.pt") as gnn_path:
+                self.gnn_model.save(gnn_path)
         print(f"All models saved to {path}")
 
 if __name__ == "__main__":
     # Example usage
     import pandas as pd
-    import numpy as np
 
     # Generate dummy data
     data = pd.DataFrame(np.random.randn(1000, 20), columns=[f'feature_{i}' for i in range(20)])
@@ -69,4 +248,4 @@ if __name__ == "__main__":
 
     trainer = ModelTrainer(data)
     trainer.train_all_models()
-    trainer.save_models('./models')
\ No newline at end of file
+    trainer.save_models('./models')
@@ -0,0 +1,82 @@
+import copy
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Dataset
+from typing import List, Optional, Tuple
+
+class TransactionSequenceDataset(Dataset):
+    """
+    Per-sender sliding windows over transaction features for the LSTM.
+    Rows are sorted once by (sender, timestamp) into a single float32 array. Sample i
+    is the window of up to `window` transactions ending at sorted row i, within the
+    same sender. It is returned as a slice of that array, so no window is copied until
+    a batch is collated. The label is the label of the last transaction in the window.
+    """
+
+    def __init__(self, features: np.ndarray, labels: Optional[np.ndarray], senders,
+                 timestamps=None, window: int = 16, indices: Optional[np.ndarray] = None):
+        """
+        :param features: (n_rows, n_features) feature matrix in original row order.
+        :param labels: Per-row labels, or None for inference.
+        :param senders: Per-row sender address used to group histories.
+        :param timestamps: Per-row timestamps; rows keep their given order if None.
+        :param window: Maximum window length.
+        :param indices: Original row indices to expose as samples (e.g. one split);
+            all rows by default. Windows may still reach back into other rows.
+        """
+        codes, _ = pd.factorize(np.asarray(senders))
+        if timestamps is not None:
+            order = np.lexsort((pd.to_datetime(timestamps).to_numpy(), codes))
+        else:
+            order = np.argsort(codes, kind='stable')
+
+        self.features = np.ascontiguousarray(features[order], dtype=np.float32)
+        self.labels = None if labels is None else np.ascontiguousarray(np.asarray(labels)[order], dtype=np.float32)
+        self.window = window
+
+        n = len(order)
+        sorted_codes = codes[order]
+        is_start = np.ones(n, dtype=bool)
+        is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        group_start = np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+        self.starts = np.maximum(group_start, np.arange(n) - window + 1)
+
+        # Map requested original rows to their position in sorted order
+        position = np.empty(n, dtype=np.int64)
+        position[order] = np.arange(n)
+        self._position = position
+        self.samples = position if indices is None else position[np.asarray(indices)]
+
+    def subset(self, indices: np.ndarray) -> 'TransactionSequenceDataset':
+        """Samples for the given original rows, sharing this dataset's sorted arrays."""
+        subset = copy.copy(self)
+        subset.samples = self._position[np.asarray(indices)]
+        return subset
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __getitem__(self, idx: int) -> Tuple[np.ndarray, float]:
+        end = self.samples[idx]
+        sequence = self.features[self.starts[end]:end + 1]
+        label = self.labels[end] if self.labels is not None else 0.0
+        return sequence, label
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.samples - self.starts[self.samples] + 1
+
+
+def collate_sequences(batch: List[Tuple[np.ndarray, float]]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Pad a batch of windows to its longest member, left-aligned, for packing.
+    :return: (padded [batch, max_len, n_features], lengths, labels)
+    """
+    lengths = np.fromiter((len(sequence) for sequence, _ in batch), dtype=np.int64, count=len(batch))
+    n_features = batch[0][0].shape[1]
+    padded = np.zeros((len(batch), lengths.max(), n_features), dtype=np.float32)
+    for i, (sequence, _) in enumerate(batch):
+        padded[i, :len(sequence)] = sequence
+    labels = np.fromiter((label for _, label in batch), dtype=np.float32, count=len(batch))
+    return torch.from_numpy(padded), torch.from_numpy(lengths), torch.from_numpy(labels)
@@ -1 +1,2 @@
-from .crypto_utils import *
\ No newline at end of file
+from .crypto_utils import *
+from .file_utils import atomic_path
@@ -0,0 +1,25 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_path(path: str):
+    """
+    Yield a temporary path in the same directory as `path`, and rename it over `path`
+    in one step once the block succeeds. Readers never see a partly written file, and
+    processes that memory-mapped the previous file keep reading the old contents
+    instead of having the pages rewritten (or truncated) under them.
+    The temporary name keeps the suffix of `path`, since writers such as np.savez
+    append one otherwise.
+    """
+    directory, name = os.path.split(path)
+    root, ext = os.path.splitext(name)
+    temp_path = os.path.join(directory, f'.{root}.{uuid.uuid4().hex}.tmp{ext}')
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -33,7 +33,8 @@ def app():
             lstm_num_layers = st.number_input("LSTM Number of layers", min_value=1, max_value=5, value=2)
 
         if model_type in ["All", "GNN"]:
-            gnn_num_classes = st.number_input("GNN Number of classes", min_value=2, max_value=10, value=2)
+            gnn_hidden_channels = st.number_input("GNN Hidden channels", min_value=8, max_value=256, value=64)
+            gnn_num_layers = st.number_input("GNN Number of layers", min_value=1, max_value=2, value=2)
 
         # Training button
         if st.button("Train Model(s)"):
@@ -48,7 +49,7 @@ def app():
                     if trainer.graph_data is None:
                         st.error("Graph data is required to train GNN. Please upload graph data.")
                     else:
-                        trainer.train_gnn(num_node_features=data.shape[1]-1, num_classes=gnn_num_classes)
+                        trainer.train_gnn(hidden_channels=gnn_hidden_channels, num_layers=gnn_num_layers)
 
             st.success("Model(s) trained successfully!")
 
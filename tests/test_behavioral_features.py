@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.behavioral_features import BehavioralFeatureExtractor
+
+
+@pytest.fixture
+def transactions():
+    # Senders interleaved in time order; 'd' has a single transaction
+    return pd.DataFrame({
+        'from': ['a', 'b', 'a', 'c', 'b', 'a', 'd', 'c', 'b', 'a', 'c', 'b'],
+        'amount': [1.0, 5.0, 2.0, 100.0, 5.0, 3.0, 7.0, 0.5, 250.0, 4.0, 9.0, 6.0],
+        'timestamp': ['2024-01-01 00:00', '2024-01-01 00:05', '2024-01-01 00:10', '2024-01-01 00:20',
+                      '2024-01-01 00:30', '2024-01-01 01:00', '2024-01-01 01:15', '2024-01-01 01:20',
+                      '2024-01-01 02:00', '2024-01-01 02:30', '2024-01-01 03:00', '2024-01-01 04:00']
+    })
+
+
+def previous_features(transaction_data: pd.DataFrame) -> pd.DataFrame:
+    """The per-sender pandas loops the vectorized extractor replaced."""
+    data = transaction_data.copy()
+    frequency, time_based, abnormal = {}, {}, {}
+    for user, count in data.groupby('from').size().items():
+        total_amount = data[data['from'] == user]['amount'].sum()
+        frequency[user] = {'transaction_count': count, 'total_transaction_amount': total_amount,
+                           'avg_transaction_size': total_amount / count}
+
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    data['time_diff'] = data.groupby('from')['timestamp'].diff().dt.total_seconds()
+    for user, group in data.groupby('from'):
+        time_diffs = group['time_diff'].dropna()
+        if len(time_diffs) > 0:
+            time_based[user] = {'avg_time_between_transactions': time_diffs.mean(),
+                                'std_time_between_transactions': time_diffs.std()}
+        else:
+            time_based[user] = {'avg_time_between_transactions': 0, 'std_time_between_transactions': 0}
+
+    threshold = data['amount'].quantile(0.95)
+    for user, group in data.groupby('from'):
+        abnormal_count = group[group['amount'] > threshold].shape[0]
+        abnormal[user] = {'abnormal_transaction_count': abnormal_count,
+                          'abnormal_transaction_percentage': abnormal_count / group.shape[0]}
+
+    return pd.concat([pd.DataFrame.from_dict(features, orient='index')
+                      for features in (frequency, time_based, abnormal)], axis=1)
+
+
+def test_extract_all_features_matches_previous_implementation(transactions):
+    expected = previous_features(transactions)
+    result = BehavioralFeatureExtractor(transactions).extract_all_features().sort_index()
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_names=False)
+
+
+def test_separate_extractors_match_previous_implementation(transactions):
+    expected = previous_features(transactions)
+    extractor = BehavioralFeatureExtractor(transactions)
+    for features in (extractor.extract_frequency_features(),
+                     extractor.extract_time_based_behavioral_features(),
+                     extractor.extract_abnormal_transaction_features()):
+        pd.testing.assert_frame_equal(features.sort_index(), expected[features.columns],
+                                      check_dtype=False, check_names=False)
+
+
+def test_single_transaction_sender_has_zero_interval_features(transactions):
+    features = BehavioralFeatureExtractor(transactions).extract_all_features()
+    assert features.loc['d', 'avg_time_between_transactions'] == 0.0
+    assert features.loc['d', 'std_time_between_transactions'] == 0.0
+    # One interval has a mean but no sample standard deviation
+    two = transactions[transactions['from'] == 'a'].iloc[:2]
+    assert np.isnan(BehavioralFeatureExtractor(two).extract_all_features().loc['a', 'std_time_between_transactions'])
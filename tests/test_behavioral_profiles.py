@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.behavioral_features import BehavioralFeatureExtractor
+from src.features.behavioral_profiles import BehavioralProfileStore, P2Quantile
+
+STREAMED_COLUMNS = ['transaction_count', 'total_transaction_amount', 'avg_transaction_size',
+                    'avg_time_between_transactions', 'std_time_between_transactions']
+
+
+@pytest.fixture
+def transactions():
+    rng = np.random.default_rng(1)
+    n = 500
+    return pd.DataFrame({
+        'from': rng.integers(0, 30, n).astype(str),
+        'amount': rng.exponential(10.0, n),
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 10**6, n)), unit='s')
+    })
+
+
+def test_streamed_profiles_match_batch_extractor(transactions):
+    store = BehavioralProfileStore()
+    store.update_many(transactions)
+    streamed = store.to_frame().sort_index()[STREAMED_COLUMNS]
+    batch = BehavioralFeatureExtractor(transactions).extract_all_features().sort_index()[STREAMED_COLUMNS]
+    pd.testing.assert_frame_equal(streamed, batch, check_dtype=False)
+
+
+def test_numpy_epoch_seconds_are_seconds():
+    store = BehavioralProfileStore()
+    for ts in np.array([0, 60, 120], dtype=np.int64):
+        store.update('a', 1.0, ts)
+    assert store.get_features('a')['avg_time_between_transactions'] == pytest.approx(60.0)
+
+
+def test_out_of_order_transaction_adds_no_gap():
+    store = BehavioralProfileStore()
+    for ts in (0, 60, 30, 120):
+        store.update('a', 1.0, ts)
+    features = store.get_features('a')
+    # Gaps 60 and 60; the late transaction at 30 counts but records no negative gap
+    assert features['transaction_count'] == 4
+    assert features['avg_time_between_transactions'] == pytest.approx(60.0)
+    assert features['std_time_between_transactions'] == pytest.approx(0.0)
+    assert store.profiles['a'].gap_count == 2
+    assert store.profiles['a'].last_timestamp == 120.0
+
+
+def test_p2_quantile_tracks_numpy_quantile():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=20_000)
+    estimate = P2Quantile(0.95)
+    for value in values:
+        estimate.update(value)
+    assert estimate.value() == pytest.approx(np.quantile(values, 0.95), abs=0.05)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+
+compiled_ensemble = pytest.importorskip('src.models.compiled_ensemble', exc_type=ImportError)
+from src.models.ensemble_model import EnsembleModel
+
+
+@pytest.fixture(scope='module')
+def data():
+    return make_classification(n_samples=400, n_features=8, random_state=0)
+
+
+@pytest.mark.parametrize('combination', ['weighted', 'stacked'])
+def test_matches_sklearn_predict_proba(data, combination, tmp_path):
+    X, y = data
+    ensemble = EnsembleModel(combination=combination, weights={'rf': 2.0, 'gb': 1.0, 'lr': 0.5})
+    ensemble.rf_model.set_params(n_estimators=20)
+    ensemble.gb_model.set_params(n_estimators=20)
+    ensemble.train(X, y)
+
+    compiled = compiled_ensemble.CompiledEnsemble.from_ensemble(ensemble)
+    compiled.save(str(tmp_path / 'ensemble_compiled.npz'))
+    loaded = compiled_ensemble.CompiledEnsemble.load(str(tmp_path / 'ensemble_compiled.npz'))
+
+    expected = ensemble.score(X)
+    for model in (compiled, loaded):
+        result = model.score(X)
+        for name, member in ensemble.models.items():
+            np.testing.assert_allclose(result['contributions'][name], member.predict_proba(X)[:, 1],
+                                       rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(result['probabilities'], expected['probabilities'], rtol=1e-9, atol=1e-12)
+        np.testing.assert_array_equal(result['labels'], expected['labels'])
+
+
+def test_hist_gradient_boosting_is_rejected(data):
+    X, y = data
+    ensemble = EnsembleModel(gb_estimator='hist')
+    ensemble.train(X, y)
+    with pytest.raises(ValueError):
+        compiled_ensemble.CompiledEnsemble.from_ensemble(ensemble)
+
+
+def test_parallel_score_matches_single_threaded(data):
+    X, y = data
+    ensemble = EnsembleModel(weights={'rf': 2.0, 'gb': 1.0, 'lr': 0.5})
+    ensemble.rf_model.set_params(n_estimators=20)
+    ensemble.gb_model.set_params(n_estimators=20)
+    ensemble.train(X, y)
+    compiled = compiled_ensemble.CompiledEnsemble.from_ensemble(ensemble)
+
+    for model in (ensemble, compiled):
+        expected = model.score(X)
+        for n_jobs in (3, -1):
+            result = model.score(X, n_jobs=n_jobs)
+            for name, proba in expected['contributions'].items():
+                np.testing.assert_allclose(result['contributions'][name], proba, rtol=1e-9, atol=1e-12)
+            np.testing.assert_allclose(result['probabilities'], expected['probabilities'], rtol=1e-9, atol=1e-12)
+    # Parallel scoring leaves the shared forest single-threaded for per-request calls
+    assert ensemble.rf_model.n_jobs == 1
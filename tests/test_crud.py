@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+crud = pytest.importorskip('app.db.crud', exc_type=ImportError)
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.database import Transaction, create_tables
+
+INDEXES = {
+    'ix_transactions_sender_timestamp': ['sender', 'timestamp'],
+    'ix_transactions_receiver_timestamp': ['receiver', 'timestamp'],
+}
+
+
+def transactions(n):
+    return [{'amount': float(i), 'sender': f's{i % 7}', 'receiver': f'r{i % 5}',
+             'timestamp': f'2024-01-01 {i % 24:02d}:00', 'is_fraud': i % 2} for i in range(n)]
+
+
+def transaction_indexes(connection):
+    return {index['name']: index['column_names'] for index in inspect(connection).get_indexes('transactions')}
+
+
+def run(url, coroutine):
+    async def main():
+        engine = create_async_engine(url)
+        try:
+            return await coroutine(engine)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def test_async_bulk_insert_writes_all_chunks(tmp_path):
+    async def insert_and_count(engine):
+        async with engine.begin() as connection:
+            await connection.run_sync(create_tables)
+        async with AsyncSession(engine) as db:
+            inserted = await crud.bulk_insert_transactions_async(db, transactions(2500), chunk_size=1000)
+            count = (await db.execute(select(func.count()).select_from(Transaction))).scalar_one()
+            first = await crud.get_transaction_async(db, 1)
+        async with engine.connect() as connection:
+            indexes = await connection.run_sync(transaction_indexes)
+        return inserted, count, first, indexes
+
+    inserted, count, first, indexes = run(f'sqlite+aiosqlite:///{tmp_path / "crud.db"}', insert_and_count)
+    assert inserted == count == 2500
+    assert (first.sender, first.receiver, first.amount) == ('s0', 'r0', 0.0)
+    for name, columns in INDEXES.items():
+        assert indexes[name] == columns
+
+
+def test_create_tables_adds_indexes_to_existing_table(tmp_path):
+    async def upgrade(engine):
+        # A transactions table created before the composite indexes existed
+        legacy = MetaData()
+        Table('transactions', legacy, Column('id', Integer, primary_key=True), Column('amount', Float),
+              Column('sender', String), Column('receiver', String), Column('timestamp', DateTime),
+              Column('is_fraud', Integer))
+        async with engine.begin() as connection:
+            await connection.run_sync(legacy.create_all)
+            await connection.run_sync(create_tables)
+        async with engine.connect() as connection:
+            return await connection.run_sync(transaction_indexes)
+
+    indexes = run(f'sqlite+aiosqlite:///{tmp_path / "legacy.db"}', upgrade)
+    for name, columns in INDEXES.items():
+        assert indexes[name] == columns
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+DatasetSplits = pytest.importorskip('src.models.dataset_splits', exc_type=ImportError).DatasetSplits
+
+
+def frame(seed):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(size=(50, 3)), columns=['a', 'b', 'c'])
+    data['is_fraud'] = rng.integers(0, 2, 50)
+    return data
+
+
+def test_cache_matches_only_the_data_it_was_built_from(tmp_path):
+    data = frame(0)
+    DatasetSplits.from_frame(data).save(str(tmp_path))
+
+    assert DatasetSplits.exists(str(tmp_path), DatasetSplits.fingerprint_of(data))
+    assert DatasetSplits.load(str(tmp_path)).fingerprint == DatasetSplits.fingerprint_of(data)
+    assert not DatasetSplits.exists(str(tmp_path), DatasetSplits.fingerprint_of(frame(1)))
+    assert not DatasetSplits.exists(str(tmp_path), DatasetSplits.fingerprint_of(data.drop(columns='c')))
+    assert not DatasetSplits.exists(str(tmp_path), DatasetSplits.fingerprint_of(data, exclude=['c']))
+
+
+def test_fingerprint_sees_single_value_changes():
+    data = frame(0)
+    changed = data.copy()
+    changed.iloc[7, 1] += 1e-6
+    assert DatasetSplits.fingerprint_of(changed) != DatasetSplits.fingerprint_of(data)
@@ -0,0 +1,58 @@
+import os
+import threading
+
+import joblib
+import numpy as np
+import pytest
+
+file_utils = pytest.importorskip('src.utils.file_utils', exc_type=ImportError)
+
+
+def test_failed_write_leaves_the_original_in_place(tmp_path):
+    path = str(tmp_path / 'model.joblib')
+    joblib.dump(np.arange(3), path)
+    with pytest.raises(RuntimeError):
+        with file_utils.atomic_path(path) as temp_path:
+            joblib.dump(np.arange(5), temp_path)
+            raise RuntimeError("export failed")
+    np.testing.assert_array_equal(joblib.load(path), np.arange(3))
+    assert os.listdir(tmp_path) == ['model.joblib']
+
+
+def test_npz_suffix_is_kept(tmp_path):
+    path = str(tmp_path / 'ensemble_compiled.npz')
+    with file_utils.atomic_path(path) as temp_path:
+        np.savez(temp_path, value=np.arange(4))
+    with np.load(path) as arrays:
+        np.testing.assert_array_equal(arrays['value'], np.arange(4))
+    assert os.listdir(tmp_path) == ['ensemble_compiled.npz']
+
+
+def test_reload_while_artifact_is_rewritten(tmp_path):
+    """Every load during concurrent rewrites sees one complete version of the file."""
+    path = str(tmp_path / 'ensemble_model.joblib')
+    joblib.dump({'version': 0, 'weights': np.zeros(200_000)}, path)
+    stop = threading.Event()
+
+    def rewrite():
+        version = 0
+        while not stop.is_set():
+            version += 1
+            # Alternate large and small files, which truncates the old one when done in place
+            size = 200_000 if version % 2 else 1_000
+            with file_utils.atomic_path(path) as temp_path:
+                joblib.dump({'version': version, 'weights': np.full(size, float(version))}, temp_path)
+
+    writer = threading.Thread(target=rewrite)
+    writer.start()
+    try:
+        versions = set()
+        for _ in range(200):
+            artifact = joblib.load(path)
+            assert np.all(artifact['weights'] == artifact['version'])
+            versions.add(artifact['version'])
+    finally:
+        stop.set()
+        writer.join()
+    assert len(versions) > 1
+    assert not [name for name in os.listdir(tmp_path) if name != 'ensemble_model.joblib']
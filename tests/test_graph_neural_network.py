@@ -0,0 +1,79 @@
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('torch_geometric')
+from src.models.graph_neural_network import GraphNeuralNetwork, build_graph_data
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    transactions = pd.DataFrame({
+        'from': ['a', 'b', 'c', 'a', 'd'],
+        'to': ['b', 'c', 'a', 'd', 'e'],
+        'amount': [1.0, 2.0, 3.0, 4.0, 5.0],
+        'is_fraud': [0, 1, 0, 0, 1],
+    })
+    data, context = build_graph_data(transactions)
+    return GraphNeuralNetwork(data.num_node_features).attach_graph(context)
+
+
+def test_missing_address_scores_like_an_unseen_one(model):
+    with_missing = model.predict_transactions(['a', None, 'b'], ['b', 'c', np.nan])
+    with_unseen = model.predict_transactions(['a', 'new-1', 'b'], ['b', 'c', 'new-2'])
+    np.testing.assert_allclose(with_missing, with_unseen, rtol=1e-6)
+
+
+def test_missing_addresses_are_not_shared_between_transactions(model):
+    # Two transactions with missing senders must not be linked through one node
+    apart = model.predict_transactions([None, None], ['a', 'e'])
+    alone = np.concatenate([model.predict_transactions([None], ['a']), model.predict_transactions([None], ['e'])])
+    np.testing.assert_allclose(apart, alone, rtol=1e-6)
+
+
+def test_checkpoint_loads_with_weights_only(model, tmp_path):
+    path = str(tmp_path / 'gnn_model.pt')
+    model.save(path)
+    # torch>=2.6 defaults to weights_only=True; numpy arrays in the checkpoint would be refused
+    if 'weights_only' in inspect.signature(torch.load).parameters:
+        checkpoint = torch.load(path, map_location='cpu', weights_only=True)
+        assert checkpoint['context'] is not None
+
+    loaded = GraphNeuralNetwork.load(path)
+    senders, receivers = ['a', 'new', None], ['b', 'c', 'e']
+    np.testing.assert_allclose(loaded.predict_transactions(senders, receivers),
+                               model.predict_transactions(senders, receivers), rtol=1e-6)
+
+
+def test_hub_neighborhood_is_capped_per_hop():
+    hub = pd.DataFrame({'from': ['hub'] * 500, 'to': [f'leaf{i}' for i in range(500)],
+                        'amount': 1.0, 'is_fraud': 0})
+    _, context = build_graph_data(hub)
+    leaf = context.address_index.get_indexer(['leaf0'])
+
+    full_nodes, _ = context.k_hop_subgraph(leaf, 2)
+    nodes, edge_index = context.k_hop_subgraph(leaf, 2, max_neighbors=[15, 10])
+    assert len(full_nodes) == 501
+    # The leaf, the hub, and at most 10 of the hub's neighbors
+    assert len(nodes) <= 12
+    assert edge_index.max() < len(nodes)
+
+    # Limits above every degree give the full neighborhood
+    uncapped_nodes, _ = context.k_hop_subgraph(leaf, 2, max_neighbors=[1000, 1000])
+    np.testing.assert_array_equal(uncapped_nodes, full_nodes)
+
+
+def test_full_batch_fallback_without_sampler(monkeypatch):
+    from src.models import graph_neural_network
+
+    monkeypatch.setattr(graph_neural_network, '_has_neighbor_sampler', lambda: False)
+    transactions = pd.DataFrame({'from': ['a', 'b', 'c'], 'to': ['b', 'c', 'a'],
+                                 'amount': [1.0, 2.0, 3.0], 'is_fraud': [0, 1, 0]})
+    data, context = build_graph_data(transactions)
+    model = GraphNeuralNetwork(data.num_node_features)
+    graph_neural_network.train_gnn(model, data, epochs=2)
+    assert model.attach_graph(context).predict_transactions(['a'], ['b']).shape == (1,)
@@ -0,0 +1,66 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.incremental_graph import IncrementalGraphFeatures
+
+
+def batch(edges, amount=1.0):
+    return pd.DataFrame({'from': [u for u, _ in edges], 'to': [v for _, v in edges],
+                         'amount': [amount] * len(edges)})
+
+
+def assert_matches_networkx(state, G):
+    features = state.node_features()
+    assert set(features.index) == set(G.nodes)
+    degree = dict(G.degree())
+    clustering = nx.clustering(G)
+    for address, row in features.iterrows():
+        assert row['degree'] == degree[address]
+        assert row['clustering_coefficient'] == pytest.approx(clustering[address])
+
+
+def test_update_tracks_degree_and_clustering_batch_by_batch():
+    batches = [
+        [('a', 'b'), ('b', 'c')],
+        # Closes the triangle a-b-c and repeats an existing edge in the other direction
+        [('c', 'a'), ('b', 'a')],
+        # New node joining two existing ones, and a self-loop
+        [('d', 'a'), ('d', 'b'), ('e', 'e')],
+        [('e', 'a'), ('c', 'd')],
+    ]
+    state = IncrementalGraphFeatures.from_transactions(batch(batches[0]))
+    G = nx.Graph(batches[0])
+    assert_matches_networkx(state, G)
+    for edges in batches[1:]:
+        state.update(batch(edges))
+        G.add_edges_from(edges)
+        assert_matches_networkx(state, G)
+
+
+def test_update_returns_nodes_whose_clustering_changed():
+    state = IncrementalGraphFeatures.from_transactions(batch([('a', 'b'), ('b', 'c'), ('x', 'y')]))
+    touched = state.update(batch([('a', 'c')]))
+    # b is a common neighbor of the new edge, so its triangle count changed too
+    assert sorted(state.addresses[i] for i in touched) == ['a', 'b', 'c']
+    assert state.node_features(['b'])['clustering_coefficient'].iloc[0] == pytest.approx(1.0)
+
+
+def test_repeated_edges_update_flows_without_marking_stale():
+    state = IncrementalGraphFeatures.from_transactions(batch([('a', 'b')], amount=2.0))
+    state.recompute_global_metrics()
+    assert not state.is_stale
+
+    state.update(batch([('a', 'b')], amount=3.0))
+    assert not state.is_stale
+    features = state.node_features()
+    assert features.loc['a', 'out_flow'] == pytest.approx(5.0)
+    assert features.loc['b', 'in_count'] == 2
+    assert features.loc['a', 'degree'] == 1
+
+    state.update(batch([('b', 'c')]))
+    assert state.is_stale
+    state.recompute_global_metrics()
+    betweenness = nx.betweenness_centrality(state.to_networkx())
+    np.testing.assert_allclose(state.node_features()['betweenness_centrality'],
+                               [betweenness[address] for address in state.addresses])
@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip('httpx')
+main = pytest.importorskip('app.main', exc_type=ImportError)
+from fastapi.testclient import TestClient
+from app.services import fraud_detection_service as service_module
+from app.services.inference_executor import InferenceExecutor
+from app.services.model_registry import ModelArtifacts
+
+TRANSACTIONS = [
+    {'amount': 20.0, 'sender': 'a', 'receiver': 'b', 'timestamp': '2024-01-01 10:00'},
+    {'amount': 60.0, 'sender': 'b', 'receiver': 'c', 'timestamp': '2024-01-01 11:00'},
+]
+
+
+class StubScaler:
+    def transform(self, df):
+        return df[['amount']].to_numpy(dtype=float)
+
+
+class StubEnsemble:
+    def score(self, X, n_jobs=None):
+        return {'probabilities': X[:, 0] / 100}
+
+
+class StubGNN:
+    def predict_transactions(self, senders, receivers):
+        return np.zeros(len(senders))
+
+
+class StubRegistry:
+    artifacts = ModelArtifacts(ensemble_model=StubEnsemble(), scaler=StubScaler(), gnn_model=StubGNN(), version={})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(service_module.fraud_detection_service, 'registry', StubRegistry())
+    executor = InferenceExecutor(kind='thread', max_workers=1)
+    monkeypatch.setattr(main, 'inference_executor', executor)
+    # Not used as a context manager, so the startup hooks do not load real artifacts
+    yield TestClient(main.app)
+    executor.shutdown()
+
+
+def test_predict_batch_json(client):
+    # Average of the stub GNN (0) and ensemble (amount / 100)
+    expected = [pytest.approx(0.1), pytest.approx(0.3)]
+    assert client.post('/predict/batch', json=TRANSACTIONS).json() == {'predictions': expected}
+    assert client.post('/predict/batch', json={'transactions': TRANSACTIONS}).json() == {'predictions': expected}
+
+
+def test_predict_batch_ndjson(client):
+    body = '\n'.join(json.dumps(transaction) for transaction in TRANSACTIONS) + '\n\n'
+    response = client.post('/predict/batch', content=body, headers={'content-type': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.json() == {'predictions': [pytest.approx(0.1), pytest.approx(0.3)]}
+
+
+def test_predict_batch_rejects_non_list(client):
+    response = client.post('/predict/batch', json={'amount': 1.0})
+    assert response.status_code == 400
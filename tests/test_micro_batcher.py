@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+micro_batcher = pytest.importorskip('app.services.micro_batcher', exc_type=ImportError)
+
+
+def score(items):
+    if any(item < 0 for item in items):
+        raise ValueError(f"negative item in {items}")
+    return [item * 2 for item in items]
+
+
+async def submit_all(batcher, items):
+    batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+def test_batch_results_are_returned_in_order():
+    batcher = micro_batcher.MicroBatcher(score, max_batch_size=8, max_wait_ms=50)
+    assert asyncio.run(submit_all(batcher, [1, 2, 3])) == [2, 4, 6]
+
+
+def test_failing_item_fails_only_its_own_caller():
+    calls = []
+
+    def recording_score(items):
+        calls.append(list(items))
+        return score(items)
+
+    batcher = micro_batcher.MicroBatcher(recording_score, max_batch_size=8, max_wait_ms=50)
+    results = asyncio.run(submit_all(batcher, [1, -1, 3]))
+
+    assert results[0] == 2 and results[2] == 6
+    assert isinstance(results[1], ValueError)
+    # One batched call, then each item rescored on its own
+    assert calls[0] == [1, -1, 3]
+    assert sorted(calls[1:]) == [[-1], [1], [3]]
+
+
+def test_queued_items_count_toward_executor_pending_limit():
+    from app.services.inference_executor import InferenceExecutor, InferenceOverloaded
+
+    async def run():
+        executor = InferenceExecutor(kind="thread", max_workers=1, max_pending=2)
+        batcher = micro_batcher.MicroBatcher(score, max_batch_size=8, max_wait_ms=50, executor=executor)
+        batcher.start()
+        try:
+            first = asyncio.ensure_future(batcher.submit(1))
+            second = asyncio.ensure_future(batcher.submit(2))
+            await asyncio.sleep(0)
+            assert executor.pending == 2
+            with pytest.raises(InferenceOverloaded):
+                await batcher.submit(3)
+            assert await asyncio.gather(first, second) == [2, 4]
+            assert executor.pending == 0
+        finally:
+            await batcher.stop()
+            executor.shutdown()
+
+    asyncio.run(run())
+
+
+def test_stop_fails_in_flight_and_queued_requests():
+    scoring = threading.Event()
+    release = threading.Event()
+
+    def blocking_score(items):
+        scoring.set()
+        release.wait(5)
+        return score(items)
+
+    async def run():
+        batcher = micro_batcher.MicroBatcher(blocking_score, max_batch_size=1, max_wait_ms=50)
+        batcher.start()
+        try:
+            in_flight = asyncio.ensure_future(batcher.submit(1))
+            queued = asyncio.ensure_future(batcher.submit(2))
+            while not scoring.is_set():
+                await asyncio.sleep(0.01)
+            await batcher.stop()
+            results = await asyncio.wait_for(asyncio.gather(in_flight, queued, return_exceptions=True), 1)
+        finally:
+            release.set()
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(run())
@@ -0,0 +1,97 @@
+import os
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.neighborhood_index import NeighborhoodIndex
+
+
+@pytest.fixture
+def transactions():
+    rng = np.random.default_rng(3)
+    n = 400
+    # A few hubs plus a sparse tail, with self-transfers and repeated pairs
+    senders = np.where(rng.random(n) < 0.3, rng.integers(0, 3, n), rng.integers(0, 80, n))
+    receivers = rng.integers(0, 80, n)
+    return pd.DataFrame({'from': [f'addr{i}' for i in senders], 'to': [f'addr{i}' for i in receivers],
+                         'amount': rng.exponential(10.0, n)})
+
+
+def undirected_graph(transactions):
+    graph = nx.Graph()
+    graph.add_edges_from((u, v) for u, v in zip(transactions['from'], transactions['to']) if u != v)
+    graph.add_nodes_from(transactions['from'])
+    graph.add_nodes_from(transactions['to'])
+    return graph
+
+
+def expected_two_hop(graph, address, limit=None):
+    lengths = nx.single_source_shortest_path_length(graph, address, cutoff=2)
+    reached = {node: len(list(nx.common_neighbors(graph, address, node)))
+               for node, length in lengths.items() if length == 2}
+    ranked = sorted(reached, key=lambda node: (-reached[node], node))
+    return set(ranked[:limit] if limit is not None else ranked), reached
+
+
+@pytest.mark.parametrize('block_paths', [None, 50])
+def test_neighborhoods_match_networkx(transactions, block_paths, monkeypatch):
+    if block_paths is not None:
+        monkeypatch.setattr(NeighborhoodIndex, 'TWO_HOP_BLOCK_PATHS', block_paths)
+    index = NeighborhoodIndex.from_transactions(transactions)
+    graph = undirected_graph(transactions)
+
+    for address in graph.nodes:
+        node = index.node_id(address)
+        assert {index.address(i) for i in index.neighbors(node)[0]} == set(graph.neighbors(address))
+        expected, paths = expected_two_hop(graph, address)
+        span = slice(index.two_hop_indptr[node], index.two_hop_indptr[node + 1])
+        found = {index.address(i): p for i, p in zip(index.two_hop_indices[span], index.two_hop_paths[span])}
+        assert found == paths
+
+
+@pytest.mark.parametrize('block_paths', [None, 50])
+def test_truncation_keeps_most_shared_neighbors(transactions, block_paths, monkeypatch):
+    if block_paths is not None:
+        monkeypatch.setattr(NeighborhoodIndex, 'TWO_HOP_BLOCK_PATHS', block_paths)
+    index = NeighborhoodIndex.from_transactions(transactions, max_two_hop=5)
+    full = NeighborhoodIndex.from_transactions(transactions)
+
+    for node in range(index.num_nodes):
+        kept = index.two_hop(node)
+        assert len(kept) == min(5, len(full.two_hop(node)))
+        span = slice(full.two_hop_indptr[node], full.two_hop_indptr[node + 1])
+        ranked = np.lexsort((full.two_hop_indices[span], -full.two_hop_paths[span]))[:5]
+        np.testing.assert_array_equal(kept, np.sort(full.two_hop_indices[span][ranked]))
+
+
+def test_save_does_not_touch_arrays_a_reader_has_mapped(transactions, tmp_path):
+    directory = str(tmp_path / 'neighborhood_index')
+    NeighborhoodIndex.from_transactions(transactions).save(directory)
+    mapped = NeighborhoodIndex.load(directory)
+    before = {name: np.array(getattr(mapped, name)) for name in NeighborhoodIndex.ARRAY_NAMES}
+
+    # A smaller index saved in place would truncate the mapped files under the reader
+    for _ in range(3):
+        NeighborhoodIndex.from_transactions(transactions.iloc[:20]).save(directory)
+
+    for name, values in before.items():
+        np.testing.assert_array_equal(getattr(mapped, name), values)
+    reloaded = NeighborhoodIndex.load(directory)
+    assert reloaded.num_nodes == NeighborhoodIndex.from_transactions(transactions.iloc[:20]).num_nodes
+    # The current and the previous version are kept
+    assert len([name for name in os.listdir(directory) if name.startswith('v')]) == 2
+
+
+def test_flat_layout_still_loads(transactions, tmp_path):
+    index = NeighborhoodIndex.from_transactions(transactions)
+    directory = tmp_path / 'flat'
+    directory.mkdir()
+    for name in NeighborhoodIndex.ARRAY_NAMES:
+        np.save(directory / f'{name}.npy', getattr(index, name))
+    (directory / 'metadata.json').write_text('{"num_nodes": %d, "max_two_hop": null}' % index.num_nodes)
+
+    loaded = NeighborhoodIndex.load(str(directory))
+    np.testing.assert_array_equal(loaded.two_hop_indices, index.two_hop_indices)
+    assert NeighborhoodIndex.version_file(str(directory)) == str(directory / 'metadata.json')
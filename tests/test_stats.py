@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+stats = pytest.importorskip('app.db.stats', exc_type=ImportError)
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from app.db.crud import bulk_insert_transactions, bulk_insert_transactions_async
+from app.db.database import Base
+
+TRANSACTIONS = [
+    {'amount': 10.0, 'sender': 'a', 'receiver': 'b', 'timestamp': '2024-01-01 10:05', 'is_fraud': 1},
+    {'amount': 20.0, 'sender': 'a', 'receiver': 'c', 'timestamp': '2024-01-01 10:55', 'is_fraud': 1},
+    {'amount': 5.0, 'sender': 'b', 'receiver': 'c', 'timestamp': '2024-01-01 11:30', 'is_fraud': 0},
+    {'amount': 7.0, 'sender': 'c', 'receiver': 'a', 'timestamp': '2024-01-01 12:00', 'is_fraud': 1},
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / 'stats.db'
+    engine = create_engine(f'sqlite:///{path}')
+    Base.metadata.create_all(engine)
+    yield engine, f'sqlite+aiosqlite:///{path}'
+    engine.dispose()
+
+
+def read(url, **kwargs):
+    async def run():
+        engine = create_async_engine(url)
+        try:
+            async with AsyncSession(engine) as db:
+                return await stats.read_statistics(db, **kwargs)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def insert_async(url, transactions, chunk_size):
+    async def run():
+        engine = create_async_engine(url)
+        try:
+            async with AsyncSession(engine) as db:
+                return await bulk_insert_transactions_async(db, transactions, chunk_size=chunk_size)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def assert_full_statistics(result):
+    assert result['total_transactions'] == 4
+    assert result['fraud_transactions'] == 3
+    assert result['fraud_rate'] == pytest.approx(0.75)
+    assert result['total_amount'] == pytest.approx(42.0)
+    assert result['fraud_amount'] == pytest.approx(37.0)
+    assert [(bucket['hour'], bucket['transactions'], bucket['fraud_transactions'], bucket['amount'])
+            for bucket in result['hourly_volume']] == [
+        (datetime(2024, 1, 1, 10), 2, 2, pytest.approx(30.0)),
+        (datetime(2024, 1, 1, 11), 1, 0, pytest.approx(5.0)),
+        (datetime(2024, 1, 1, 12), 1, 1, pytest.approx(7.0)),
+    ]
+    assert result['top_flagged_senders'] == [
+        {'sender': 'a', 'flagged_transactions': 2, 'transactions': 2},
+        {'sender': 'c', 'flagged_transactions': 1, 'transactions': 1},
+    ]
+
+
+def test_async_inserts_increment_statistics(database):
+    _, url = database
+    # Two chunks, so the second increments rows the first created
+    assert insert_async(url, TRANSACTIONS, chunk_size=2) == 4
+    assert_full_statistics(read(url))
+
+
+def test_generic_fallback_matches_upsert(database, monkeypatch):
+    _, url = database
+    monkeypatch.setattr(stats, 'UPSERT_DIALECTS', {})
+    insert_async(url, TRANSACTIONS, chunk_size=2)
+    assert_full_statistics(read(url))
+
+
+def test_rebuild_statistics_recomputes_from_transactions(database):
+    engine, url = database
+    with Session(engine) as db:
+        bulk_insert_transactions(db, TRANSACTIONS)
+        # Drift the summary tables, as if they had been deployed onto existing data
+        db.execute(stats.TransactionStatsHourly.__table__.delete())
+        db.commit()
+        stats.rebuild_statistics(db, batch_size=3)
+    assert_full_statistics(read(url))
+
+
+def test_range_resolves_to_whole_hours(database):
+    _, url = database
+    insert_async(url, TRANSACTIONS, chunk_size=1000)
+
+    # 10:30 falls in the 10:00 bucket, which is included whole; 12:00 is excluded
+    result = read(url, start=datetime(2024, 1, 1, 10, 30), end=datetime(2024, 1, 1, 12))
+    assert result['total_transactions'] == 3
+    assert result['fraud_transactions'] == 2
+    assert result['total_amount'] == pytest.approx(35.0)
+    assert [bucket['hour'] for bucket in result['hourly_volume']] == [
+        datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)]
+    # Top flagged senders stay all-time
+    assert [sender['sender'] for sender in result['top_flagged_senders']] == ['a', 'c']
+
+    empty = read(url, start=datetime(2024, 2, 1))
+    assert empty['total_transactions'] == 0
+    assert empty['fraud_rate'] == 0.0
+    assert empty['hourly_volume'] == []
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.storage import read_table, write_table, write_table_chunks
+
+
+@pytest.fixture
+def transactions():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=100, freq='37min'),
+        'amount': np.arange(100, dtype=np.float64),
+        'from': pd.Categorical(rng.choice(list('abc'), 100)),
+    })
+
+
+@pytest.mark.parametrize('name', ['transactions.parquet', 'transactions.arrow', 'transactions.csv'])
+def test_chunks_of_one_date_do_not_overwrite_each_other(tmp_path, transactions, name):
+    path = str(tmp_path / name)
+    chunks = [transactions.iloc[i:i + 30] for i in range(0, len(transactions), 30)]
+    write_table_chunks(chunks, path)
+    # A second run replaces the table rather than adding to it
+    assert write_table_chunks(chunks, path) == len(transactions)
+
+    result = read_table(path).sort_values('amount').reset_index(drop=True)
+    assert result['amount'].tolist() == transactions['amount'].tolist()
+
+
+@pytest.mark.parametrize('name', ['transactions.parquet', 'transactions.arrow', 'transactions.csv'])
+def test_rewrite_replaces_partitions_the_new_frame_does_not_cover(tmp_path, transactions, name):
+    path = str(tmp_path / name)
+    write_table(transactions, path)
+    # The second write covers only the first day
+    first_day = transactions[transactions['timestamp'] < '2024-01-02']
+    write_table(first_day, path)
+
+    result = read_table(path).sort_values('amount').reset_index(drop=True)
+    assert result['amount'].tolist() == first_day['amount'].tolist()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.temporal_features import TemporalFeatureExtractor
+
+
+@pytest.fixture
+def transactions():
+    rng = np.random.default_rng(3)
+    n = 600
+    amount = rng.exponential(100.0, n)
+    amount[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'from': rng.integers(0, 20, n).astype(str),
+        'amount': amount,
+        # Shuffled, with repeated timestamps, to exercise sorting and window edges
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 3 * 86400, n) // 60 * 60, unit='s')
+    })
+
+
+def pandas_rolling(df: pd.DataFrame, window, stat: str) -> pd.Series:
+    ordered = df.sort_values(['from', 'timestamp'], kind='mergesort')
+    grouped = ordered.groupby('from', sort=False)
+    if isinstance(window, int):
+        rolled = grouped['amount'].rolling(window=window)
+    else:
+        rolled = grouped.rolling(window, on='timestamp')['amount']
+    result = getattr(rolled, stat)()
+    return pd.Series(result.to_numpy(), index=ordered.index).reindex(df.index)
+
+
+@pytest.mark.parametrize('window', [3, 10])
+@pytest.mark.parametrize('stat', ['mean', 'std', 'min', 'max'])
+def test_count_windows_match_pandas(transactions, window, stat):
+    result = TemporalFeatureExtractor(transactions.copy()).calculate_rolling_statistics('amount', [window], [stat])
+    expected = pandas_rolling(transactions, window, stat)
+    np.testing.assert_allclose(result[f'amount_rolling_{stat}_{window}'], expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('window', ['1h', '24h'])
+@pytest.mark.parametrize('stat', ['mean', 'std', 'min', 'max', 'count'])
+def test_time_windows_match_pandas(transactions, window, stat):
+    result = TemporalFeatureExtractor(transactions.copy()).calculate_rolling_statistics('amount', [window], [stat])
+    expected = pandas_rolling(transactions, window, stat)
+    np.testing.assert_allclose(result[f'amount_rolling_{stat}_{window}'], expected, rtol=1e-9, atol=1e-9)
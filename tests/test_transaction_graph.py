@@ -0,0 +1,76 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.graph_features import GraphFeatureExtractor
+from src.features.incremental_graph import IncrementalGraphFeatures
+from src.features.transaction_graph import TransactionGraph
+
+
+def reference_graph(df: pd.DataFrame) -> nx.Graph:
+    G = nx.Graph()
+    G.add_edges_from(zip(df['from'], df['to']))
+    return G
+
+
+@pytest.fixture
+def zero_amount_transactions():
+    # Zero-value transfers and a self-loop must still count as edges
+    return pd.DataFrame({
+        'from': ['a', 'b', 'c', 'a', 'd'],
+        'to': ['b', 'c', 'a', 'e', 'd'],
+        'amount': [0.0, 1.0, 2.0, 0.0, 3.0],
+        'timestamp': pd.date_range('2024-01-01', periods=5, freq='h')
+    })
+
+
+@pytest.fixture
+def random_transactions():
+    rng = np.random.default_rng(0)
+    n = 400
+    return pd.DataFrame({
+        'from': rng.integers(0, 60, n).astype(str),
+        'to': rng.integers(0, 60, n).astype(str),
+        'amount': np.where(rng.random(n) < 0.2, 0.0, rng.random(n)),
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='min')
+    })
+
+
+def test_binary_adjacency_keeps_zero_amount_edges(zero_amount_transactions):
+    graph = TransactionGraph.from_transactions(zero_amount_transactions)
+    adjacency = graph.undirected_adjacency(binary=True)
+    G = reference_graph(zero_amount_transactions)
+    expected = nx.to_scipy_sparse_array(G, nodelist=list(graph.addresses), weight=None)
+    assert (adjacency != (expected != 0)).nnz == 0
+
+
+@pytest.mark.parametrize('fixture', ['zero_amount_transactions', 'random_transactions'])
+def test_jaccard_matches_networkx(fixture, request):
+    df = request.getfixturevalue(fixture)
+    features = GraphFeatureExtractor(df).extract_edge_features()
+    G = reference_graph(df)
+    expected = {(u, v): p for u, v, p in nx.jaccard_coefficient(G, list(features.index))}
+    for edge, value in features['jaccard_coefficient'].items():
+        assert value == pytest.approx(expected[edge])
+
+
+@pytest.mark.parametrize('fixture', ['zero_amount_transactions', 'random_transactions'])
+def test_incremental_features_match_networkx(fixture, request):
+    df = request.getfixturevalue(fixture)
+    features = IncrementalGraphFeatures.from_transactions(df).node_features()
+    G = reference_graph(df)
+    degree = dict(G.degree())
+    clustering = nx.clustering(G)
+    for address, row in features.iterrows():
+        assert row['degree'] == degree[address]
+        assert row['clustering_coefficient'] == pytest.approx(clustering[address])
+
+
+def test_incremental_update_matches_full_build(random_transactions):
+    first, second = random_transactions.iloc[:250], random_transactions.iloc[250:]
+    state = IncrementalGraphFeatures.from_transactions(first)
+    state.update(second)
+    full = IncrementalGraphFeatures.from_transactions(random_transactions).node_features()
+    updated = state.node_features().loc[full.index]
+    cols = ['degree', 'clustering_coefficient', 'in_flow', 'out_flow', 'in_count', 'out_count']
+    pd.testing.assert_frame_equal(updated[cols], full[cols], check_dtype=False)